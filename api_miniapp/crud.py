@@ -1,6 +1,6 @@
 from typing import Sequence, List
 
-from sqlalchemy import select, literal, func, case, RowMapping
+from sqlalchemy import select, literal, RowMapping
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import aliased
 
@@ -10,8 +10,8 @@ from api_v3.schemas import HubLevelSchemeV3
 from api_v3.slug import slugify
 
 from config import settings
-from models import HUbMenuLevel, HUbStock, ProductOrigin, ProductImage, ProductFeaturesGlobal, ProductFeaturesLink, \
-    ServiceImage, ProductType, ProductBrand
+from models import HUbMenuLevel, HUbStock, ProductFeaturesGlobal, ProductFeaturesLink, \
+    ServiceImage, ProductType, ProductBrand, CatalogItem
 
 
 async def fetch_hub_levels(session: AsyncSession) -> List[HubLevelSchemeV3]:
@@ -67,25 +67,17 @@ async def fetch_hub_levels(session: AsyncSession) -> List[HubLevelSchemeV3]:
 async def fetch_products_by_path(path_ids: list, session: AsyncSession) -> Sequence[RowMapping]:
     stmt = (
         select(
-            HUbStock.id,
-            HUbStock.origin,
-            HUbStock.warranty,
-            HUbStock.output_price,
-            ProductOrigin.title,
-            func.array_agg(ProductImage.key).filter(ProductImage.key.isnot(None)).label("pics"),
-            func.max(case((ProductImage.is_preview.is_(True), ProductImage.key))).label("preview"),
-            ProductFeaturesGlobal.title.label("model"),
+            CatalogItem.stock_id.label("id"),
+            CatalogItem.origin,
+            CatalogItem.warranty,
+            CatalogItem.output_price,
+            CatalogItem.title,
+            CatalogItem.pics,
+            CatalogItem.preview,
+            CatalogItem.model,
         )
-        .join(ProductOrigin, ProductOrigin.origin == HUbStock.origin)
-        .outerjoin(ProductImage, ProductImage.origin_id == ProductOrigin.origin)
-        .outerjoin(ProductFeaturesLink, ProductFeaturesLink.origin == ProductOrigin.origin)
-        .outerjoin(ProductFeaturesGlobal, ProductFeaturesGlobal.id == ProductFeaturesLink.feature_id)
-        .where(
-            HUbStock.path_id.in_(path_ids),
-            ProductOrigin.is_deleted.is_(False)
-        )
-        .group_by(HUbStock.id, ProductOrigin.title, ProductFeaturesGlobal.title)
-        .order_by(HUbStock.output_price)
+        .where(CatalogItem.path_id.in_(path_ids))
+        .order_by(CatalogItem.output_price)
     )
 
     execute = await session.execute(stmt)
@@ -9,6 +9,7 @@ from api_miniapp.schemas import HubLevelScheme, HubProductScheme, HubProductResp
 from api_miniapp.schemas.hub_prod_scheme import ProductFeaturesResponse
 from api_service.s3_helper import get_url_from_s3
 from cache import CacheManager, get_cache_manager
+from cache.keys.hub import products_by_path_key
 from cache.settings import cache_ttl
 
 from engine import db
@@ -17,23 +18,23 @@ hub_product = APIRouter()
 
 
 @hub_product.get("/hub_levels", response_model=List[HubLevelScheme])
-@cache(expire=180)
+@cache(expire=180, namespace="hub_levels")
 async def get_levels(session: AsyncSession = Depends(db.scoped_session_dependency)):
     return await fetch_hub_levels(session)
 
 
 @hub_product.get("/products_by_path_ids", response_model=HubProductResponse)
 async def products_by_path(ids: list[int] = Query(...),
-                           session: AsyncSession = Depends(db.scoped_session_dependency),
                            cache: CacheManager = Depends(get_cache_manager)):
-    start = time.monotonic()
-    ids_sorted = ",".join(map(str, sorted(ids)))
-    cache_key = f"products_by_path_miniAPP:{ids_sorted}"
-    cached = await cache.get(cache_key, model=HubProductResponse)
-    if cached is not None:
-        return cached
+    return await cache.get_or_compute(products_by_path_key(ids), lambda: build_products_by_path(ids),
+                                      ttl=cache_ttl.short, model=HubProductResponse, stale_ttl=cache_ttl.stale,
+                                      early_refresh=True)
+
 
-    products = await fetch_products_by_path(ids, session)
+async def build_products_by_path(ids: list[int]) -> HubProductResponse:
+    start = time.monotonic()
+    async with db.tg_session() as session:
+        products = await fetch_products_by_path(ids, session)
 
     result = list()
     for product in products:
@@ -51,14 +52,11 @@ async def products_by_path(ids: list[int] = Query(...),
 
     duration_ms = int((time.monotonic() - start) * 1000)
 
-    response = HubProductResponse(products=result, duration_ms=duration_ms)
-    await cache.set(cache_key, response, ttl=cache_ttl.short)
-
-    return response
+    return HubProductResponse(products=result, duration_ms=duration_ms)
 
 
 @hub_product.get("/get_product_features/{origin}", response_model=ProductFeaturesResponse)
-@cache(expire=180)
+@cache(expire=180, namespace="product_features")
 async def get_product_features(origin: int, session: AsyncSession = Depends(db.scoped_session_dependency)):
     feature = await get_feature_by_origin(session, origin)
     return ProductFeaturesResponse(features=feature)
@@ -1,242 +1,129 @@
 import asyncio
-from datetime import datetime, timedelta, timezone
-from typing import Literal
+import logging
+import time
+from typing import Optional, Any
 
 import jwt
-from aiohttp import ClientSession, ClientConnectorError, ContentTypeError, ClientResponseError, ClientTimeout
+from aiohttp import ClientSession, ClientError, ContentTypeError, ClientTimeout
 
 from api_service.schemas import UpdateProductFromDTPayload, CreateNewEntityRequest, CreateFeaturesGlobal
+from api_service.dtube_health import dtube_breaker
 from config import settings
 
 BASE_DTUBE_URL = settings.api.digitaltube_url
 
 
-def create_dtube_token() -> str:
-    now = datetime.now(timezone.utc)
-    payload = {"service": settings.api.api_service_name,
-               "iss": settings.api.api_service_name,
-               "sub": f"{settings.api.api_service_name}->digitaltube",
-               "iat": now,
-               "exp": now + timedelta(minutes=5)}
+class DTubeTokenProvider:
+    def __init__(self, lifetime: int = 300, margin: int = 30):
+        self.lifetime = lifetime
+        self.margin = margin
+        self.hits = 0
+        self.misses = 0
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
 
-    return jwt.encode(payload, settings.api.api_service_shared_secret, algorithm="HS256")
+    def mint(self) -> str:
+        now = int(time.time())
+        payload = {"service": settings.api.api_service_name,
+                   "iss": settings.api.api_service_name,
+                   "sub": f"{settings.api.api_service_name}->digitaltube",
+                   "iat": now,
+                   "exp": now + self.lifetime}
+        self._expires_at = payload["exp"]
+        return jwt.encode(payload, settings.api.api_service_shared_secret, algorithm="HS256")
 
+    def get(self) -> str:
+        if self._token and time.time() < self._expires_at - self.margin:
+            self.hits += 1
+            return self._token
+        self.misses += 1
+        self._token = self.mint()
+        return self._token
 
-async def get_one_by_dtube(session: ClientSession, title: str):
-    url = f"{BASE_DTUBE_URL}/get_one/"
-    token = create_dtube_token()
-    async with session.post(url, params={"data": title}, headers={"Accept": "application/json",
-                                                                  "Authorization": f"Bearer {token}"}) as response:
-        if response.status == 200:
-            data = await response.json()
-            if data:
-                return data
-    return None
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "expires_at": self._expires_at}
 
 
-async def get_items_by_params(session: ClientSession, item: str):
-    url = f"{BASE_DTUBE_URL}/get_dependency_list/"
-    token = create_dtube_token()
-    async with session.post(url, params={"item": item}, headers={"Accept": "application/json",
-                                                                 "Authorization": f"Bearer {token}"}) as response:
-        if response.status == 200:
-            data = await response.json()
-            if data:
-                return data
-    return None
+dtube_token_provider = DTubeTokenProvider()
 
 
-async def update_product_from_dtube(payload: UpdateProductFromDTPayload, session: ClientSession):
-    url = f"{BASE_DTUBE_URL}/refresh_item"
-    token = create_dtube_token()
-    async with session.post(url,
-                            json={"title": payload.title, "type": payload.type, "brand": payload.brand},
-                            headers={"Accept": "application/json", "Authorization": f"Bearer {token}"}) as response:
-        if response.status != 200:
+def create_dtube_token() -> str:
+    return dtube_token_provider.get()
+
+
+class DigitalTubeClient:
+    def __init__(self, session: ClientSession, base_url: str = BASE_DTUBE_URL):
+        self.session = session
+        self.base_url = base_url
+        self.last_status: Optional[int] = None
+
+    @staticmethod
+    def headers() -> dict[str, str]:
+        return {"Accept": "application/json", "Authorization": f"Bearer {create_dtube_token()}"}
+
+    async def request(self, method: str, path: str, *,
+                      params: Optional[dict] = None,
+                      json: Any = None,
+                      timeout: Optional[float] = None,
+                      headers: Optional[dict] = None) -> Optional[Any]:
+        url = f"{self.base_url}{path}"
+        kwargs = dict()
+        if timeout is not None:
+            kwargs["timeout"] = ClientTimeout(total=timeout)
+        self.last_status = None
+        try:
+            async with self.session.request(method, url, params=params, json=json,
+                                            headers={**self.headers(), **(headers or {})},
+                                            **kwargs) as response:
+                self.last_status = response.status
+                dtube_breaker.record_request(response.status < 500)
+                if response.status != 200:
+                    logging.warning(f"DigitalTube {method} {path} -> {response.status}")
+                    return None
+                return await response.json()
+        except (ClientError, ContentTypeError, asyncio.TimeoutError) as e:
+            if self.last_status is None:
+                dtube_breaker.record_request(False)
+            logging.warning(f"DigitalTube {method} {path} failed: {e!r}")
             return None
-        return await response.json()
-
-
-async def can_connect(session: ClientSession) -> bool:
-    url = f"{BASE_DTUBE_URL}/welcome"
-    try:
-        timeout = ClientTimeout(total=5)
-        async with session.get(url, timeout=timeout) as response:
-            if response.status != 200:
-                return False
 
-            data = await response.json()
-            return data.get("status") == "ok"
+    async def post(self, path: str, **kwargs) -> Optional[Any]:
+        return await self.request("POST", path, **kwargs)
 
-    except (ClientConnectorError, asyncio.TimeoutError, ClientResponseError, ContentTypeError, Exception):
-        return False
 
+FEATURE_MUTATION_PATHS = {"add_inner_row": "/add_new_features_inner_row/",
+                          "update_inner_row": "/update_features_inner_row/",
+                          "delete_inner_row": "/delete_features_inner_row/",
+                          "add_pros_cons": "/add_pros_cons_value/",
+                          "update_pros_cons": "/update_pros_cons_value/",
+                          "delete_pros_cons": "/delete_pros_cons_value/",
+                          "create_category": "/create_new_info_category/",
+                          "update_category": "/update_info_category/",
+                          "delete_category": "/delete_info_category/",
+                          "insert_bulk": "/insert_bulk_data_in_info/"}
 
-async def create_new_entity_in_server(payload: CreateNewEntityRequest, session: ClientSession):
-    url = f"{BASE_DTUBE_URL}/create_new_entity/"
-    token = create_dtube_token()
-    async with session.post(url,
-                            json=payload.model_dump(),
-                            headers={"Accept": "application/json", "Authorization": f"Bearer {token}"}) as response:
-        if response.status != 200:
-            return None
-        return await response.json()
 
-
-async def create_new_product_in_server(payload: CreateFeaturesGlobal, session: ClientSession):
-    url = f"{BASE_DTUBE_URL}/create_new_feature_global/"
-    token = create_dtube_token()
-    async with session.post(url,
-                            json={"title": payload.title,
-                                  "type_obj": payload.type_obj.type,
-                                  "brand_obj": payload.brand_obj.brand},
-                            headers={"Accept": "application/json", "Authorization": f"Bearer {token}"}) as response:
-        if response.status != 200:
-            return None
-        return await response.json()
-
-
-async def create_pros_cons_value_in_server(product_title: str,
-                                           attribute: Literal["advantage", "disadvantage"],
-                                           value: str,
-                                           session: ClientSession):
-    url = f"{BASE_DTUBE_URL}/add_pros_cons_value/"
-    token = create_dtube_token()
-    async with session.post(url,
-                            json={"product_title": product_title, "attribute": attribute, "value": value},
-                            headers={"Accept": "application/json", "Authorization": f"Bearer {token}"}) as response:
-        if response.status != 200:
-            return None
-        return await response.json()
-
-
-async def update_pros_cons_value_in_server(product_title: str,
-                                           attribute: Literal["advantage", "disadvantage"],
-                                           value: str,
-                                           new_value: str,
-                                           session: ClientSession):
-    url = f"{BASE_DTUBE_URL}/update_pros_cons_value/"
-    token = create_dtube_token()
-    async with session.post(url,
-                            json={"product_title": product_title, "attribute": attribute, "value": value,
-                                  "new_value": new_value},
-                            headers={"Accept": "application/json", "Authorization": f"Bearer {token}"}) as response:
-        if response.status != 200:
-            return None
-        return await response.json()
-
-
-async def delete_pros_cons_value_in_server(product_title: str,
-                                           attribute: Literal["advantage", "disadvantage"],
-                                           value: str,
-                                           session: ClientSession):
-    url = f"{BASE_DTUBE_URL}/delete_pros_cons_value/"
-    token = create_dtube_token()
-    async with session.post(url,
-                            json={"product_title": product_title, "attribute": attribute, "value": value},
-                            headers={"Accept": "application/json", "Authorization": f"Bearer {token}"}) as response:
-        if response.status != 200:
-            return None
-        return await response.json()
+async def get_one_by_dtube(session: ClientSession, title: str):
+    data = await DigitalTubeClient(session).post("/get_one/", params={"data": title})
+    return data or None
 
 
-async def insert_bulk_data_in_server(feature_title: str, bulk: list, session: ClientSession):
-    url = f"{BASE_DTUBE_URL}/insert_bulk_data_in_info/"
-    token = create_dtube_token()
-    async with session.post(url,
-                            json={"feature_title": feature_title, "bulk": bulk},
-                            headers={"Accept": "application/json", "Authorization": f"Bearer {token}"}) as response:
-        if response.status != 200:
-            return None
-        return await response.json()
+async def get_items_by_params(session: ClientSession, item: str):
+    data = await DigitalTubeClient(session).post("/get_dependency_list/", params={"item": item})
+    return data or None
 
 
-async def create_new_info_category_in_server(feature_title: str, category: str, session: ClientSession):
-    url = f"{BASE_DTUBE_URL}/create_new_info_category/"
-    token = create_dtube_token()
-    async with session.post(url,
-                            json={"feature_title": feature_title, "category": category},
-                            headers={"Accept": "application/json", "Authorization": f"Bearer {token}"}) as response:
-        if response.status != 200:
-            return None
-        return await response.json()
+async def update_product_from_dtube(payload: UpdateProductFromDTPayload, session: ClientSession):
+    return await DigitalTubeClient(session).post(
+        "/refresh_item", json={"title": payload.title, "type": payload.type, "brand": payload.brand})
 
 
-async def delete_info_category_in_server(feature_title: str, category: str, session: ClientSession):
-    url = f"{BASE_DTUBE_URL}/delete_info_category/"
-    token = create_dtube_token()
-    async with session.post(url,
-                            json={"feature_title": feature_title, "category": category},
-                            headers={"Accept": "application/json", "Authorization": f"Bearer {token}"}) as response:
-        if response.status != 200:
-            return None
-        return await response.json()
+async def create_new_entity_in_server(payload: CreateNewEntityRequest, session: ClientSession):
+    return await DigitalTubeClient(session).post("/create_new_entity/", json=payload.model_dump())
 
 
-async def update_info_category_in_server(feature_title: str, category: str, new_category: str, session: ClientSession):
-    url = f"{BASE_DTUBE_URL}/update_info_category/"
-    token = create_dtube_token()
-    async with session.post(url,
-                            json={"feature_title": feature_title, "category": category, "new_category": new_category},
-                            headers={"Accept": "application/json", "Authorization": f"Bearer {token}"}) as response:
-        if response.status != 200:
-            return None
-        return await response.json()
-
-
-async def create_features_inner_row_in_server(feature_title: str,
-                                              category_title: str,
-                                              new_param: str,
-                                              new_value: str,
-                                              session: ClientSession):
-    url = f"{BASE_DTUBE_URL}/add_new_features_inner_row/"
-    token = create_dtube_token()
-    async with session.post(url,
-                            json={"feature_title": feature_title,
-                                  "category_title": category_title,
-                                  "new_param": new_param,
-                                  "new_value": new_value},
-                            headers={"Accept": "application/json", "Authorization": f"Bearer {token}"}) as response:
-        if response.status != 200:
-            return None
-        return await response.json()
-
-
-async def update_features_inner_row_in_server(feature_title: str,
-                                              category_title: str,
-                                              new_param: str,
-                                              new_value: str,
-                                              old_param: str,
-                                              old_value: str,
-                                              session: ClientSession):
-    url = f"{BASE_DTUBE_URL}/update_features_inner_row/"
-    token = create_dtube_token()
-    async with session.post(url,
-                            json={"feature_title": feature_title,
-                                  "category_title": category_title,
-                                  "new_param": new_param,
-                                  "new_value": new_value,
-                                  "old_param": old_param,
-                                  "old_value": old_value},
-                            headers={"Accept": "application/json", "Authorization": f"Bearer {token}"}) as response:
-        if response.status != 200:
-            return None
-        return await response.json()
-
-
-async def delete_features_inner_row_in_server(feature_title: str,
-                                              category_title: str,
-                                              new_param: str,
-                                              new_value: str,
-                                              session: ClientSession):
-    url = f"{BASE_DTUBE_URL}/delete_features_inner_row/"
-    token = create_dtube_token()
-    async with session.post(url,
-                            json={"feature_title": feature_title,
-                                  "category_title": category_title,
-                                  "new_param": new_param,
-                                  "new_value": new_value},
-                            headers={"Accept": "application/json", "Authorization": f"Bearer {token}"}) as response:
-        if response.status != 200:
-            return None
-        return await response.json()
+async def create_new_product_in_server(payload: CreateFeaturesGlobal, session: ClientSession):
+    return await DigitalTubeClient(session).post("/create_new_feature_global/",
+                                                 json={"title": payload.title,
+                                                       "type_obj": payload.type_obj.type,
+                                                       "brand_obj": payload.brand_obj.brand})
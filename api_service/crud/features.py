@@ -1,4 +1,5 @@
 from collections import defaultdict
+from copy import deepcopy
 from typing import Dict
 
 from aiohttp import ClientSession
@@ -9,17 +10,19 @@ from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm.attributes import flag_modified
 
-from api_service.api_connect import can_connect, create_new_entity_in_server, create_new_product_in_server, \
-    create_pros_cons_value_in_server, update_pros_cons_value_in_server, delete_pros_cons_value_in_server, \
-    insert_bulk_data_in_server, create_new_info_category_in_server, delete_info_category_in_server, \
-    update_info_category_in_server, create_features_inner_row_in_server, update_features_inner_row_in_server, \
-    delete_features_inner_row_in_server
+from api_service.api_connect import create_new_entity_in_server, create_new_product_in_server
+from api_service.dtube_health import dtube_available
+from api_service.modulars.catalog.crud import catalog_origins_by_features, sync_catalog
+from api_service.modulars.outbox.crud import enqueue_feature_mutation
+from api_service.modulars.outbox.service import outbox_dispatcher
 from api_service.schemas import HubLevelPath, PathRoutes, OriginHubLevelMap, FeaturesDataSet, FeaturesElement, \
     SetFeaturesHubLevelRequest, SetLevelRoutesResponse, FeatureResponseScheme, ProsConsItem, ProsConsItemUpdate, \
     FeatureCategory, UpdateFeatureCategoryRequest, InnerRowRequest, UpdateInnerRowRequest, FeatureIds, TypesAndBrands, \
     CreateFeaturesGlobal, BrandModel, TypeModel, OriginsList, PathRoute, FormulaIdObj, \
     SetFeaturesFormulaRequest, SetFormulaResponse, FetchProductInfoRequest, ProductResponse, InsertBulkParams, \
-    CreateNewCriteria, CreateNewEntityRequest
+    CreateNewCriteria, CreateNewEntityRequest, FeatureRowOperation, FeatureRowsBatchRequest, FeatureRowOperationResult, \
+    FeatureRowsBatchResponse
+from cache.events import cache_events, feature_changed
 
 from models import ProductFeaturesGlobal, ProductBrand, ProductType, HUbMenuLevel, FormulaExpression, \
     ProductFeaturesFormulaLink, ProductFeaturesHubMenuLevelLink, ProductFeaturesLink
@@ -172,109 +175,88 @@ async def get_features_by_origin_db(feature_id: int, session: AsyncSession):
     return FeatureResponseScheme(id=row.id, title=row.title, info=info_list, pros_cons=pros_cons)
 
 
-async def delete_pros_cons_value_db(payload: ProsConsItem, session: AsyncSession, cl_session):
-    is_connected = await can_connect(cl_session)
-    if is_connected:
-        stmt = select(ProductFeaturesGlobal).where(ProductFeaturesGlobal.id == payload.id)
-        result = await session.execute(stmt)
-        feature: ProductFeaturesGlobal | None = result.scalar_one_or_none()
+async def delete_pros_cons_value_db(payload: ProsConsItem, session: AsyncSession):
+    stmt = select(ProductFeaturesGlobal).where(ProductFeaturesGlobal.id == payload.id)
+    result = await session.execute(stmt)
+    feature: ProductFeaturesGlobal | None = result.scalar_one_or_none()
 
-        if not feature:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Feature not found")
+    if not feature:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Feature not found")
 
-        if not feature.pros_cons:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="pros_cons is empty")
+    if not feature.pros_cons:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="pros_cons is empty")
 
-        if payload.attribute not in feature.pros_cons:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
-                                detail=f"Attribute '{payload.attribute}' not found in pros_cons")
-        result = await delete_pros_cons_value_in_server(product_title=feature.title,
-                                                        attribute=payload.attribute,
-                                                        value=payload.value, session=cl_session)
-        if result:
-            items = feature.pros_cons[payload.attribute]
+    if payload.attribute not in feature.pros_cons:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"Attribute '{payload.attribute}' not found in pros_cons")
+    items = feature.pros_cons[payload.attribute]
 
-            if payload.value not in items:
-                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Value not found in list")
+    if payload.value not in items:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Value not found in list")
 
-            updated_items = [v for v in items if v != payload.value]
-            new_pros_cons = {**feature.pros_cons, payload.attribute: updated_items}
-            feature.pros_cons = new_pros_cons
+    updated_items = [v for v in items if v != payload.value]
+    new_pros_cons = {**feature.pros_cons, payload.attribute: updated_items}
+    feature.pros_cons = new_pros_cons
+    enqueue_feature_mutation(session, feature.title, "delete_pros_cons",
+                             {"product_title": feature.title, "attribute": payload.attribute, "value": payload.value})
 
-            await session.commit()
-            await session.refresh(feature)
-
-            return {"status": "success", "id": feature.id, "updated": feature.pros_cons}
+    await commit_feature(session, feature)
 
-    raise HTTPException(status_code=503, detail="DigitalTube service Unavailable — сервер временно недоступен")
+    return {"status": "success", "id": feature.id, "updated": feature.pros_cons}
 
 
-async def add_pros_cons_value_db(payload: ProsConsItem, session: AsyncSession, cl_session: ClientSession):
-    is_connected = await can_connect(cl_session)
-    if is_connected:
-        stmt = select(ProductFeaturesGlobal).where(ProductFeaturesGlobal.id == payload.id)
-        result = await session.execute(stmt)
-        feature: ProductFeaturesGlobal | None = result.scalar_one_or_none()
+async def add_pros_cons_value_db(payload: ProsConsItem, session: AsyncSession):
+    stmt = select(ProductFeaturesGlobal).where(ProductFeaturesGlobal.id == payload.id)
+    result = await session.execute(stmt)
+    feature: ProductFeaturesGlobal | None = result.scalar_one_or_none()
 
-        if not feature:
-            raise HTTPException(status_code=404, detail="Feature not found")
+    if not feature:
+        raise HTTPException(status_code=404, detail="Feature not found")
 
-        if not feature.pros_cons:
-            feature.pros_cons = {"advantage": [], "disadvantage": []}
+    if not feature.pros_cons:
+        feature.pros_cons = {"advantage": [], "disadvantage": []}
 
-        if payload.attribute not in feature.pros_cons:
-            raise HTTPException(status_code=400, detail=f"Attribute '{payload.attribute}' not found in pros_cons")
+    if payload.attribute not in feature.pros_cons:
+        raise HTTPException(status_code=400, detail=f"Attribute '{payload.attribute}' not found in pros_cons")
 
-        update_dt_info = await create_pros_cons_value_in_server(product_title=feature.title,
-                                                                attribute=payload.attribute,
-                                                                value=payload.value, session=cl_session)
-        if update_dt_info:
-            items = feature.pros_cons[payload.attribute]
-            updated_items = items + [payload.value]
-            new_pros_cons = {**feature.pros_cons, payload.attribute: updated_items}
-            feature.pros_cons = new_pros_cons
+    items = feature.pros_cons[payload.attribute]
+    updated_items = items + [payload.value]
+    new_pros_cons = {**feature.pros_cons, payload.attribute: updated_items}
+    feature.pros_cons = new_pros_cons
+    enqueue_feature_mutation(session, feature.title, "add_pros_cons",
+                             {"product_title": feature.title, "attribute": payload.attribute, "value": payload.value})
 
-            await session.commit()
-            await session.refresh(feature)
+    await commit_feature(session, feature)
 
-            return {"status": "success", "id": feature.id, "updated": feature.pros_cons}
-    raise HTTPException(status_code=503, detail="DigitalTube service Unavailable — сервер временно недоступен")
+    return {"status": "success", "id": feature.id, "updated": feature.pros_cons}
 
 
-async def update_pros_cons_value_db(payload: ProsConsItemUpdate, session: AsyncSession, cl_session):
-    is_connected = await can_connect(cl_session)
-    if is_connected:
-
-        stmt = select(ProductFeaturesGlobal).where(ProductFeaturesGlobal.id == payload.id)
-        result = await session.execute(stmt)
-        feature: ProductFeaturesGlobal | None = result.scalar_one_or_none()
+async def update_pros_cons_value_db(payload: ProsConsItemUpdate, session: AsyncSession):
+    stmt = select(ProductFeaturesGlobal).where(ProductFeaturesGlobal.id == payload.id)
+    result = await session.execute(stmt)
+    feature: ProductFeaturesGlobal | None = result.scalar_one_or_none()
 
-        if not feature:
-            raise HTTPException(status_code=404, detail="Feature not found")
+    if not feature:
+        raise HTTPException(status_code=404, detail="Feature not found")
 
-        if not feature.pros_cons:
-            feature.pros_cons = {}
-        result = await update_pros_cons_value_in_server(product_title=feature.title,
-                                                        attribute=payload.attribute,
-                                                        value=payload.old_value,
-                                                        new_value=payload.new_value,
-                                                        session=cl_session)
-        if result:
-            items = feature.pros_cons.get(payload.attribute, [])
+    if not feature.pros_cons:
+        feature.pros_cons = {}
+    items = feature.pros_cons.get(payload.attribute, [])
 
-            if payload.old_value not in items:
-                raise HTTPException(status_code=400, detail="Old value not found in list")
+    if payload.old_value not in items:
+        raise HTTPException(status_code=400, detail="Old value not found in list")
 
-            updated_items = [payload.new_value if v == payload.old_value else v for v in items]
+    updated_items = [payload.new_value if v == payload.old_value else v for v in items]
 
-            new_pros_cons = {**feature.pros_cons, payload.attribute: updated_items}
-            feature.pros_cons = new_pros_cons
+    new_pros_cons = {**feature.pros_cons, payload.attribute: updated_items}
+    feature.pros_cons = new_pros_cons
+    enqueue_feature_mutation(session, feature.title, "update_pros_cons",
+                             {"product_title": feature.title, "attribute": payload.attribute,
+                              "value": payload.old_value, "new_value": payload.new_value})
 
-            await session.commit()
-            await session.refresh(feature)
+    await commit_feature(session, feature)
 
-            return {"status": "success", "id": feature.id, "updated": feature.pros_cons}
-    raise HTTPException(status_code=503, detail="DigitalTube service Unavailable — сервер временно недоступен")
+    return {"status": "success", "id": feature.id, "updated": feature.pros_cons}
 
 
 async def get_feature_or_404(session: AsyncSession, feature_id: int):
@@ -305,225 +287,200 @@ def find_category_index(info: list, category_title: str):
 
 
 async def save_feature(session: AsyncSession, feature: ProductFeaturesGlobal):
-    await session.commit()
-    await session.refresh(feature)
+    await commit_feature(session, feature)
     return feature.info
 
 
-async def create_new_info_category_db(payload: FeatureCategory, session: AsyncSession, cl_session: ClientSession):
-    is_connected = await can_connect(cl_session)
-    if is_connected:
-        feature = await get_feature_or_404(session, payload.id)
-
-        info = normalize_category_info(feature)
-        new_title = payload.category_title.strip()
-
-        if not new_title:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Category title cannot be empty"
-            )
-        result = await create_new_info_category_in_server(feature_title=feature.title, category=new_title,
-                                                          session=cl_session)
-        if result:
-            index = find_category_index(info, new_title)
-            if index is not None:
-                return {"status": "exists", "info": info}
-
-            info.append({new_title: {}})
-            feature.info = info
-
-            updated_info = await save_feature(session, feature)
-            return {"status": "created", "info": updated_info}
-
-    raise HTTPException(status_code=503, detail="DigitalTube service Unavailable — сервер временно недоступен")
-
-
-async def delete_info_category_db(payload: FeatureCategory, session: AsyncSession, cl_session):
-    is_connected = await can_connect(cl_session)
-    if is_connected:
-        feature = await get_feature_or_404(session, payload.id)
-
-        info = normalize_category_info(feature)
-        category_title = payload.category_title.strip()
-
-        if not category_title:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Category title cannot be empty"
-            )
-
-        index = find_category_index(info, category_title)
-        if index is None:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Category not found"
-            )
-
-        result = await delete_info_category_in_server(feature_title=feature.title,
-                                                      category=category_title,
-                                                      session=cl_session)
-        if result:
-            del info[index]
-            feature.info = info
-
-            updated_info = await save_feature(session, feature)
-            return {"status": "deleted", "info": updated_info}
-
-    raise HTTPException(status_code=503, detail="DigitalTube service Unavailable — сервер временно недоступен")
-
-
-async def update_info_category_db(payload: UpdateFeatureCategoryRequest, session: AsyncSession, cl_session):
-    is_connected = await can_connect(cl_session)
-    if is_connected:
-        old_title = payload.old_category_title.strip()
-        new_title = payload.new_category_title.strip()
-
-        if old_title == new_title:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Old and new category titles are identical"
-            )
-
-        if not new_title:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="New category title cannot be empty"
-            )
-        feature = await get_feature_or_404(session, payload.id)
-        info = normalize_category_info(feature)
-        index = find_category_index(info, old_title)
-        if index is None:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Old category not found"
-            )
-        existing_index = find_category_index(info, new_title)
-        if existing_index is not None:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="New category title already exists"
-            )
-        result = await update_info_category_in_server(feature_title=feature.title,
-                                                      category=old_title,
-                                                      new_category=new_title,
-                                                      session=cl_session)
-        if result:
-            old_block = info[index]
-            old_values = old_block[old_title]
-            new_block = {new_title: old_values}
-            info[index] = new_block
-            feature.info = info
-            updated_info = await save_feature(session, feature)
-
-            return {"status": "updated", "info": updated_info}
-
-    raise HTTPException(status_code=503, detail="DigitalTube service Unavailable — сервер временно недоступен")
+async def commit_feature(session: AsyncSession, feature: ProductFeaturesGlobal):
+    await session.commit()
+    await session.refresh(feature)
+    outbox_dispatcher.notify()
+    await cache_events.emit(session, feature_changed(feature.id))
 
 
-async def add_new_features_inner_row_db(payload: InnerRowRequest, session: AsyncSession, cl_session):
-    is_connected = await can_connect(cl_session)
-    if is_connected:
-        feature = await get_feature_or_404(session, payload.id)
-        info = normalize_category_info(feature)
-        result = await create_features_inner_row_in_server(feature_title=feature.title,
-                                                           category_title=payload.category_title,
-                                                           new_param=payload.new_param,
-                                                           new_value=payload.new_value,
-                                                           session=cl_session)
-        if result:
-            category_block = None
-            for block in info:
-                if payload.category_title in block:
-                    category_block = block
-                    break
-            if not category_block:
-                return {"status": "error", "message": "Category not found"}
-            category_block[payload.category_title][payload.new_param] = payload.new_value
-            flag_modified(feature, "info")
+async def create_new_info_category_db(payload: FeatureCategory, session: AsyncSession):
+    feature = await get_feature_or_404(session, payload.id)
 
-            await session.commit()
-            await session.refresh(feature)
-
-            return {"status": "created", "info": feature.info}
-    raise HTTPException(status_code=503, detail="DigitalTube service Unavailable — сервер временно недоступен")
+    info = normalize_category_info(feature)
+    new_title = payload.category_title.strip()
 
+    if not new_title:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Category title cannot be empty"
+        )
+    index = find_category_index(info, new_title)
+    if index is not None:
+        return {"status": "exists", "info": info}
 
-async def delete_features_inner_row_db(payload: InnerRowRequest, session: AsyncSession, cl_session):
-    is_connected = await can_connect(cl_session)
-    if is_connected:
-        feature = await get_feature_or_404(session, payload.id)
-        info = normalize_category_info(feature)
+    info.append({new_title: {}})
+    feature.info = info
+    enqueue_feature_mutation(session, feature.title, "create_category",
+                             {"feature_title": feature.title, "category": new_title})
 
-        category_block = None
-        for block in info:
-            if payload.category_title in block:
-                category_block = block
-                break
+    updated_info = await save_feature(session, feature)
+    return {"status": "created", "info": updated_info}
 
-        if not category_block:
-            raise HTTPException(status_code=404, detail="Category not found")
 
-        category_data = category_block[payload.category_title]
+async def delete_info_category_db(payload: FeatureCategory, session: AsyncSession):
+    feature = await get_feature_or_404(session, payload.id)
 
-        if payload.new_param not in category_data:
-            raise HTTPException(status_code=404, detail="Param not found")
-        result = await delete_features_inner_row_in_server(feature_title=feature.title,
-                                                           category_title=payload.category_title,
-                                                           new_param=payload.new_param,
-                                                           new_value=payload.new_value,
-                                                           session=cl_session)
-        if result:
-            del category_data[payload.new_param]
-            flag_modified(feature, "info")
-            await session.commit()
-            await session.refresh(feature)
-            return {"status": "deleted", "info": feature.info}
+    info = normalize_category_info(feature)
+    category_title = payload.category_title.strip()
 
-    raise HTTPException(status_code=503, detail="DigitalTube service Unavailable — сервер временно недоступен")
+    if not category_title:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Category title cannot be empty"
+        )
 
+    index = find_category_index(info, category_title)
+    if index is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Category not found"
+        )
 
-async def update_features_inner_row_db(payload: UpdateInnerRowRequest, session: AsyncSession, cl_session):
-    is_connected = await can_connect(cl_session)
-    if is_connected:
-        feature = await get_feature_or_404(session, payload.id)
-        info = normalize_category_info(feature)
-        category_block = None
-        for block in info:
-            if payload.category_title in block:
-                category_block = block
-                break
+    del info[index]
+    feature.info = info
+    enqueue_feature_mutation(session, feature.title, "delete_category",
+                             {"feature_title": feature.title, "category": category_title})
 
-        if not category_block:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Category not found")
+    updated_info = await save_feature(session, feature)
+    return {"status": "deleted", "info": updated_info}
 
-        category_data = category_block[payload.category_title]
-        result = await update_features_inner_row_in_server(feature_title=feature.title,
-                                                           category_title=payload.category_title,
-                                                           new_param=payload.new_param,
-                                                           new_value=payload.new_value,
-                                                           old_param=payload.old_param,
-                                                           old_value=payload.old_value,
-                                                           session=cl_session)
 
-        if payload.old_param not in category_data:
-            raise HTTPException(status_code=404, detail="Old param not found")
-        if result:
-            del category_data[payload.old_param]
-            category_data[payload.new_param] = payload.new_value
-            flag_modified(feature, "info")
+async def update_info_category_db(payload: UpdateFeatureCategoryRequest, session: AsyncSession):
+    old_title = payload.old_category_title.strip()
+    new_title = payload.new_category_title.strip()
 
-            await session.commit()
-            await session.refresh(feature)
+    if old_title == new_title:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Old and new category titles are identical"
+        )
 
-            return {"status": "updated", "info": feature.info}
-    raise HTTPException(status_code=503, detail="DigitalTube service Unavailable — сервер временно недоступен")
+    if not new_title:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="New category title cannot be empty"
+        )
+    feature = await get_feature_or_404(session, payload.id)
+    info = normalize_category_info(feature)
+    index = find_category_index(info, old_title)
+    if index is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Old category not found"
+        )
+    existing_index = find_category_index(info, new_title)
+    if existing_index is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="New category title already exists"
+        )
+    old_block = info[index]
+    old_values = old_block[old_title]
+    new_block = {new_title: old_values}
+    info[index] = new_block
+    feature.info = info
+    enqueue_feature_mutation(session, feature.title, "update_category",
+                             {"feature_title": feature.title, "category": old_title, "new_category": new_title})
+    updated_info = await save_feature(session, feature)
+
+    return {"status": "updated", "info": updated_info}
+
+
+async def add_new_features_inner_row_db(payload: InnerRowRequest, session: AsyncSession):
+    feature = await get_feature_or_404(session, payload.id)
+    info = normalize_category_info(feature)
+    category_block = None
+    for block in info:
+        if payload.category_title in block:
+            category_block = block
+            break
+    if not category_block:
+        return {"status": "error", "message": "Category not found"}
+    category_block[payload.category_title][payload.new_param] = payload.new_value
+    flag_modified(feature, "info")
+    enqueue_feature_mutation(session, feature.title, "add_inner_row",
+                             {"feature_title": feature.title,
+                              "category_title": payload.category_title,
+                              "new_param": payload.new_param,
+                              "new_value": payload.new_value})
+
+    await commit_feature(session, feature)
+
+    return {"status": "created", "info": feature.info}
+
+
+async def delete_features_inner_row_db(payload: InnerRowRequest, session: AsyncSession):
+    feature = await get_feature_or_404(session, payload.id)
+    info = normalize_category_info(feature)
+
+    category_block = None
+    for block in info:
+        if payload.category_title in block:
+            category_block = block
+            break
+
+    if not category_block:
+        raise HTTPException(status_code=404, detail="Category not found")
+
+    category_data = category_block[payload.category_title]
+
+    if payload.new_param not in category_data:
+        raise HTTPException(status_code=404, detail="Param not found")
+    del category_data[payload.new_param]
+    flag_modified(feature, "info")
+    enqueue_feature_mutation(session, feature.title, "delete_inner_row",
+                             {"feature_title": feature.title,
+                              "category_title": payload.category_title,
+                              "new_param": payload.new_param,
+                              "new_value": payload.new_value})
+    await commit_feature(session, feature)
+    return {"status": "deleted", "info": feature.info}
+
+
+async def update_features_inner_row_db(payload: UpdateInnerRowRequest, session: AsyncSession):
+    feature = await get_feature_or_404(session, payload.id)
+    info = normalize_category_info(feature)
+    category_block = None
+    for block in info:
+        if payload.category_title in block:
+            category_block = block
+            break
+
+    if not category_block:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Category not found")
+
+    category_data = category_block[payload.category_title]
+
+    if payload.old_param not in category_data:
+        raise HTTPException(status_code=404, detail="Old param not found")
+    del category_data[payload.old_param]
+    category_data[payload.new_param] = payload.new_value
+    flag_modified(feature, "info")
+    enqueue_feature_mutation(session, feature.title, "update_inner_row",
+                             {"feature_title": feature.title,
+                              "category_title": payload.category_title,
+                              "new_param": payload.new_param,
+                              "new_value": payload.new_value,
+                              "old_param": payload.old_param,
+                              "old_value": payload.old_value})
+
+    await commit_feature(session, feature)
+
+    return {"status": "updated", "info": feature.info}
 
 
 async def delete_feature_db(feature_ids: FeatureIds, session: AsyncSession):
+    origins = await catalog_origins_by_features(session, feature_ids.feature_ids)
     stmt = delete(ProductFeaturesGlobal).where(ProductFeaturesGlobal.id.in_(feature_ids.feature_ids))
     await session.execute(stmt)
     await session.commit()
+    await sync_catalog(session, origins=origins)
+    await cache_events.emit(session, feature_changed(*feature_ids.feature_ids))
 
     return {"status": "deleted", "ids": feature_ids.feature_ids}
 
@@ -540,7 +497,7 @@ async def types_brands_request_db(session: AsyncSession):
 
 
 async def add_new_type_request_db(payload: CreateNewCriteria, session: AsyncSession, cl_session: ClientSession):
-    is_connected = await can_connect(cl_session)
+    is_connected = dtube_available()
     if is_connected:
         result = await create_new_entity_in_server(CreateNewEntityRequest(type=payload.title, kind=payload.kind),
                                                    cl_session)
@@ -560,7 +517,7 @@ async def add_new_type_request_db(payload: CreateNewCriteria, session: AsyncSess
 
 
 async def add_new_brand_request_db(payload: CreateNewCriteria, session: AsyncSession, cl_session: ClientSession):
-    is_connected = await can_connect(cl_session)
+    is_connected = dtube_available()
     if is_connected:
         await create_new_entity_in_server(CreateNewEntityRequest(brand=payload.title, kind=payload.kind), cl_session)
         try:
@@ -577,7 +534,7 @@ async def add_new_brand_request_db(payload: CreateNewCriteria, session: AsyncSes
 
 
 async def create_new_feature_global_db(payload: CreateFeaturesGlobal, session: AsyncSession, cl_session):
-    is_connected = await can_connect(cl_session)
+    is_connected = dtube_available()
     if is_connected:
         result = await create_new_product_in_server(payload, cl_session)
         if result.get('status') == 'ok':
@@ -664,65 +621,139 @@ async def fetch_product_information_db(payload: FetchProductInfoRequest, session
         await session.close()
 
 
-async def insert_bulk_params_db(payload: InsertBulkParams, session: AsyncSession,
-                                cl_session: ClientSession) -> FeatureResponseScheme:
-    is_connected = await can_connect(cl_session)
-    if is_connected:
-        stmt = select(ProductFeaturesGlobal).where(ProductFeaturesGlobal.id == payload.feature_id)
-        result = await session.execute(stmt)
-        feature = result.scalar_one_or_none()
+async def insert_bulk_params_db(payload: InsertBulkParams, session: AsyncSession) -> FeatureResponseScheme:
+    stmt = select(ProductFeaturesGlobal).where(ProductFeaturesGlobal.id == payload.feature_id)
+    result = await session.execute(stmt)
+    feature = result.scalar_one_or_none()
 
-        if feature is None:
-            raise HTTPException(status_code=404, detail=f"Feature id={payload.feature_id} не найден.")
+    if feature is None:
+        raise HTTPException(status_code=404, detail=f"Feature id={payload.feature_id} не найден.")
 
-        info = feature.info or []
+    info = feature.info or []
 
-        if not isinstance(info, list):
-            raise HTTPException(status_code=500, detail="Поле info должно быть списком.")
+    if not isinstance(info, list):
+        raise HTTPException(status_code=500, detail="Поле info должно быть списком.")
 
-        await insert_bulk_data_in_server(
-            feature_title=feature.title,
-            bulk=[{"param": b.param, "bulk": b.bulk} for b in payload.bulk],
-            session=cl_session
-        )
+    info = list(info)
 
-        info = list(info)
+    for block in payload.bulk:
+        block_name = block.param.strip()
+        block_text = block.bulk.strip()
 
-        for block in payload.bulk:
-            block_name = block.param.strip()
-            block_text = block.bulk.strip()
+        if not block_name:
+            raise HTTPException(status_code=400, detail="Поле 'param' не может быть пустым.")
 
-            if not block_name:
-                raise HTTPException(status_code=400, detail="Поле 'param' не может быть пустым.")
+        parsed = dict()
 
-            parsed = dict()
+        for line in block_text.splitlines():
+            line = line.strip()
+            if not line:
+                continue
 
-            for line in block_text.splitlines():
-                line = line.strip()
-                if not line:
-                    continue
+            if ":" not in line:
+                raise HTTPException(status_code=400,
+                                    detail=f"Неверный формат строки: '{line}'. Ожидается 'параметр: значение'.")
 
-                if ":" not in line:
-                    raise HTTPException(status_code=400,
-                                        detail=f"Неверный формат строки: '{line}'. Ожидается 'параметр: значение'.")
+            key, value = line.split(":", 1)
+            key = key.strip()
+            value = value.strip()
 
-                key, value = line.split(":", 1)
-                key = key.strip()
-                value = value.strip()
+            if not key or not value:
+                raise HTTPException(status_code=400, detail=f"Неверный формат строки: '{line}'.")
 
-                if not key or not value:
-                    raise HTTPException(status_code=400, detail=f"Неверный формат строки: '{line}'.")
+            parsed[key] = value
 
-                parsed[key] = value
+        info.append({block_name: parsed})
 
-            info.append({block_name: parsed})
+    feature.info = info
+    flag_modified(feature, "info")
+    enqueue_feature_mutation(session, feature.title, "insert_bulk",
+                             {"feature_title": feature.title,
+                              "bulk": [{"param": b.param, "bulk": b.bulk} for b in payload.bulk]})
 
-        feature.info = info
-        flag_modified(feature, "info")
+    await commit_feature(session, feature)
 
-        await session.commit()
-        await session.refresh(feature)
+    return FeatureResponseScheme(id=feature.id, title=feature.title, info=info, pros_cons=feature.pros_cons or {})
 
-        return FeatureResponseScheme(id=feature.id, title=feature.title, info=info, pros_cons=feature.pros_cons or {})
 
-    raise HTTPException(status_code=503, detail="DigitalTube service Unavailable — сервер временно недоступен")
+def apply_feature_row_operation(info: list, pros_cons: dict, operation: FeatureRowOperation):
+    if operation.op.endswith("pros_cons"):
+        if not operation.attribute or operation.value is None:
+            raise ValueError("attribute and value are required")
+        items = list(pros_cons.get(operation.attribute, []))
+        if operation.op == "add_pros_cons":
+            items.append(operation.value)
+        elif operation.value not in items:
+            raise ValueError("Value not found in list")
+        elif operation.op == "update_pros_cons":
+            if operation.new_value is None:
+                raise ValueError("new_value is required")
+            items = [operation.new_value if v == operation.value else v for v in items]
+        else:
+            items = [v for v in items if v != operation.value]
+        pros_cons[operation.attribute] = items
+        return
+
+    if not operation.category_title or not operation.new_param:
+        raise ValueError("category_title and new_param are required")
+    category_data = None
+    for block in info:
+        if operation.category_title in block:
+            category_data = block[operation.category_title]
+            break
+    if category_data is None:
+        raise ValueError("Category not found")
+
+    if operation.op == "add_inner_row":
+        category_data[operation.new_param] = operation.new_value
+    elif operation.op == "delete_inner_row":
+        if operation.new_param not in category_data:
+            raise ValueError("Param not found")
+        del category_data[operation.new_param]
+    else:
+        if operation.old_param not in category_data:
+            raise ValueError("Old param not found")
+        del category_data[operation.old_param]
+        category_data[operation.new_param] = operation.new_value
+
+
+def feature_row_operation_body(feature_title: str, operation: FeatureRowOperation) -> dict:
+    if operation.op.endswith("pros_cons"):
+        body = {"product_title": feature_title, "attribute": operation.attribute, "value": operation.value}
+        if operation.op == "update_pros_cons":
+            body["new_value"] = operation.new_value
+        return body
+    body = {"feature_title": feature_title,
+            "category_title": operation.category_title,
+            "new_param": operation.new_param,
+            "new_value": operation.new_value}
+    if operation.op == "update_inner_row":
+        body["old_param"] = operation.old_param
+        body["old_value"] = operation.old_value
+    return body
+
+
+async def batch_feature_rows_db(payload: FeatureRowsBatchRequest, session: AsyncSession):
+    feature = await get_feature_or_404(session, payload.id)
+    results: list[FeatureRowOperationResult] = list()
+
+    info = deepcopy(normalize_category_info(feature))
+    pros_cons = deepcopy(feature.pros_cons or {"advantage": [], "disadvantage": []})
+    for index, operation in enumerate(payload.operations):
+        try:
+            apply_feature_row_operation(info, pros_cons, operation)
+        except ValueError as e:
+            results.append(FeatureRowOperationResult(index=index, op=operation.op, status=False, detail=str(e)))
+            continue
+        enqueue_feature_mutation(session, feature.title, operation.op,
+                                 feature_row_operation_body(feature.title, operation))
+        results.append(FeatureRowOperationResult(index=index, op=operation.op, status=True))
+
+    feature.info = info
+    feature.pros_cons = pros_cons
+    flag_modified(feature, "info")
+    flag_modified(feature, "pros_cons")
+    await commit_feature(session, feature)
+
+    return FeatureRowsBatchResponse(id=feature.id, results=results, info=feature.info or [],
+                                    pros_cons=feature.pros_cons)
@@ -3,7 +3,6 @@ from collections import defaultdict
 from datetime import datetime
 from typing import List, Optional, Dict, Union, Any
 
-from aiohttp import ClientSession
 from botocore.exceptions import ClientError, BotoCoreError
 from fastapi import HTTPException
 from redis.asyncio import Redis
@@ -13,11 +12,13 @@ from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload, InstrumentedAttribute
 
-from api_service.api_connect import get_one_by_dtube
+from api_service.modulars.catalog.crud import sync_catalog
+from api_service.modulars.enrichment.service import DTubeEnricher
 from api_service.s3_helper import generate_presigned_image_urls
 
 from api_service.utils import normalize_origin, update_feature_if_changed
 from config import settings
+from http_pool import http_pool
 from models import Vendor, VendorSearchLine, ProductOrigin, ParsingLine, RewardRange, RewardRangeLine, \
     ProductFeaturesLink, ProductFeaturesGlobal, ProductType, ProductBrand, HUbStock, HUbMenuLevel, StockTableDependency, \
     StockTable, ServiceImage, AttributeOriginValue, ProductImage, AttributeValue, AttributeKey
@@ -153,32 +154,19 @@ async def append_info(session: AsyncSession,
                       sync_features: bool,
                       redis: Redis = None,
                       channel: str = None) -> list[ParsingLinesIn]:
-    async with ClientSession() as client_session:
-        origins = [item.origin for item in data_lines]
-        cached: dict[int, list[str]] = await get_info_by_caching(session, origins)
-        missing = set(origins) - set(cached.keys())
-        if sync_features and missing:
-            if redis and channel:
-                await redis.publish(channel, f"data: COUNT={len(missing)}")
-            for line in data_lines:
-                origin = line.origin
-                if origin not in missing:
-                    continue
-                one_item = await get_one_by_dtube(session=client_session, title=line.title)
-                if one_item:
-                    feature_id = await store_one_item(session=session, data=one_item)
-                    await add_dependencies_link(session=session, origin=origin, feature_id=feature_id)
-                    cached[origin] = [one_item.get('title')]
-                    if redis and channel:
-                        await redis.publish(channel, f"Добавление {one_item.get('title')}")
-                else:
-                    cached[origin] = []
-        if not sync_features:
-            for origin in missing:
-                cached[origin] = []
-        for line in data_lines:
-            origin = line.origin
-            line.features_title = cached.get(origin, [])
+    origins = [item.origin for item in data_lines]
+    cached: dict[int, list[str]] = await get_info_by_caching(session, origins)
+    missing = set(origins) - set(cached.keys())
+    if sync_features and missing:
+        titles = {line.origin: line.title for line in data_lines if line.origin in missing}
+        enricher = DTubeEnricher(client_session=http_pool.session("dtube"), redis=redis, channel=channel)
+        cached.update(await enricher.enrich(session=session, titles=titles))
+    if not sync_features:
+        for origin in missing:
+            cached[origin] = []
+    for line in data_lines:
+        origin = line.origin
+        line.features_title = cached.get(origin, [])
     return data_lines
 
 
@@ -221,53 +209,6 @@ async def get_info_by_caching(session: AsyncSession, origins: list[int]) -> dict
     return dict(result)
 
 
-async def store_one_item(session: AsyncSession, data: dict):
-    stmt_type = select(ProductType).where(ProductType.type == data["product_type"])
-    product_type = (await session.execute(stmt_type)).scalar()
-
-    if not product_type:
-        stmt_type_insert = (
-            insert(ProductType).values(type=data["product_type"]).on_conflict_do_nothing(index_elements=["type"]))
-        await session.execute(stmt_type_insert)
-        product_type = (await session.execute(stmt_type)).scalar()
-
-    stmt_brand = select(ProductBrand).where(ProductBrand.brand == data["brand"])
-    product_brand = (await session.execute(stmt_brand)).scalar()
-
-    if not product_brand:
-        stmt_brand_insert = (
-            insert(ProductBrand).values(brand=data["brand"]).on_conflict_do_nothing(index_elements=["brand"]))
-        await session.execute(stmt_brand_insert)
-        product_brand = (await session.execute(stmt_brand)).scalar()
-
-    stmt_existing_feature = select(ProductFeaturesGlobal.id).where(ProductFeaturesGlobal.title == data["title"])
-    existing_feature_row = await session.execute(stmt_existing_feature)
-    feature_id = existing_feature_row.scalar()
-
-    if not feature_id:
-        stmt_features = (insert(ProductFeaturesGlobal).values(
-            title=data["title"],
-            type_id=product_type.id,
-            brand_id=product_brand.id,
-            source=data["source"],
-            info=data["info"],
-            pros_cons=data["pros_cons"]
-        ).on_conflict_do_nothing(index_elements=["title"]).returning(ProductFeaturesGlobal.id))
-
-        feature_row = await session.execute(stmt_features)
-        feature_id = feature_row.scalar()
-
-    await session.commit()
-    return feature_id
-
-
-async def add_dependencies_link(session: AsyncSession, origin: int, feature_id: int):
-    stmt_feature_link = (insert(ProductFeaturesLink).values(origin=origin, feature_id=feature_id)
-                         .on_conflict_do_nothing(index_elements=["origin", "feature_id"]))
-    await session.execute(stmt_feature_link)
-    await session.commit()
-
-
 async def delete_product_stock_items(session: AsyncSession, origins: List[int]) -> List[int]:
     if not origins:
         return []
@@ -854,6 +795,7 @@ async def implement_dependency_images_logic(
                                      is_preview=img.is_preview,
                                      checksum=img.checksum))
         await session.commit()
+        await sync_catalog(session, origins=[payload.target_origin])
 
         async def copy_one(img: ProductImage):
             filename = img.key
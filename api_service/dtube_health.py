@@ -0,0 +1,182 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Optional
+
+from aiohttp import ClientSession, ClientError, ContentTypeError, ClientTimeout
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from config import settings
+
+HEALTH_REDIS_KEY = "dtube:health"
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitBreaker:
+    def __init__(self, threshold: int, reset_timeout: float):
+        self.threshold = max(1, threshold)
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.changed_at = time.time()
+        self.transitions: dict[str, int] = dict()
+        self.probes = 0
+        self.probe_failures = 0
+        self.requests = 0
+        self.request_failures = 0
+        self.latency_last = 0.0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    def _move(self, state: str):
+        if state == self.state:
+            return
+        key = f"{self.state}->{state}"
+        self.transitions[key] = self.transitions.get(key, 0) + 1
+        logging.warning(f"DigitalTube circuit {key}")
+        self.state = state
+        self.changed_at = time.time()
+        if state == OPEN:
+            self.opened_at = time.monotonic()
+
+    def allow(self) -> bool:
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self._move(HALF_OPEN)
+        return self.state != OPEN
+
+    def record_success(self, latency: float):
+        self.probes += 1
+        self._latency(latency)
+        self.failures = 0
+        self._move(CLOSED)
+
+    def record_failure(self, latency: float):
+        self.probes += 1
+        self.probe_failures += 1
+        self._latency(latency)
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.threshold:
+            self._move(OPEN)
+
+    def record_request(self, ok: bool):
+        self.requests += 1
+        if ok:
+            self.failures = 0
+            if self.state == HALF_OPEN:
+                self._move(CLOSED)
+            return
+        self.request_failures += 1
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.threshold:
+            self._move(OPEN)
+
+    def _latency(self, latency: float):
+        self.latency_last = latency
+        self.latency_total += latency
+        self.latency_max = max(self.latency_max, latency)
+
+    def restore(self, state: str):
+        if state in (CLOSED, OPEN, HALF_OPEN) and state != self.state:
+            self._move(state)
+
+    def stats(self) -> dict:
+        return {"state": self.state,
+                "failures": self.failures,
+                "changed_at": self.changed_at,
+                "transitions": dict(self.transitions),
+                "probes": self.probes,
+                "probe_failures": self.probe_failures,
+                "requests": self.requests,
+                "request_failures": self.request_failures,
+                "latency_last_ms": round(self.latency_last * 1000, 2),
+                "latency_avg_ms": round(self.latency_total / self.probes * 1000, 2) if self.probes else 0.0,
+                "latency_max_ms": round(self.latency_max * 1000, 2)}
+
+
+async def can_connect(session: ClientSession) -> bool:
+    url = f"{settings.api.digitaltube_url}/welcome"
+    try:
+        timeout = ClientTimeout(total=5)
+        async with session.get(url, timeout=timeout) as response:
+            if response.status != 200:
+                return False
+
+            data = await response.json()
+            return isinstance(data, dict) and data.get("status") == "ok"
+
+    except (ClientError, ContentTypeError, asyncio.TimeoutError):
+        return False
+
+
+class DTubeHealthMonitor:
+    def __init__(self, breaker: CircuitBreaker, interval: float):
+        self.breaker = breaker
+        self.interval = interval
+        self.session: Optional[ClientSession] = None
+        self.redis: Optional[Redis] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, session: ClientSession, redis: Optional[Redis] = None):
+        self.session, self.redis = session, redis
+        await self.load()
+        await self.probe()
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.probe()
+            except Exception as e:
+                logging.error(f"DigitalTube health probe failed: {e!r}")
+
+    async def probe(self):
+        started = time.perf_counter()
+        ok = await can_connect(self.session)
+        latency = time.perf_counter() - started
+        if ok:
+            self.breaker.record_success(latency)
+        else:
+            self.breaker.record_failure(latency)
+        await self.save()
+
+    async def load(self):
+        if self.redis is None:
+            return
+        try:
+            raw = await self.redis.get(HEALTH_REDIS_KEY)
+        except RedisError as e:
+            logging.warning(f"DigitalTube health state read failed: {e!r}")
+            return
+        if raw:
+            self.breaker.restore(json.loads(raw).get("state"))
+
+    async def save(self):
+        if self.redis is None:
+            return
+        try:
+            await self.redis.set(HEALTH_REDIS_KEY, json.dumps(self.breaker.stats()), ex=int(self.interval * 6))
+        except RedisError as e:
+            logging.warning(f"DigitalTube health state write failed: {e!r}")
+
+
+dtube_breaker = CircuitBreaker(threshold=settings.api.dtube_breaker_threshold,
+                               reset_timeout=settings.api.dtube_breaker_reset)
+dtube_health_monitor = DTubeHealthMonitor(dtube_breaker, interval=settings.api.dtube_health_interval)
+
+
+def dtube_available() -> bool:
+    return dtube_breaker.allow()
@@ -14,7 +14,7 @@ from api_service.schemas import AnalyzeItem, ProductMarketSettingsSchema
 from cache.builder import cache_key_builder
 
 
-@cache(expire=1000, key_builder=cache_key_builder)
+@cache(expire=1000, key_builder=cache_key_builder, namespace="analyzer")
 async def load_analyzer_cache(session: AsyncSession):
     return {"rules": await load_weight_rules(session),
             "value_maps": await load_value_maps(session),
@@ -1,4 +1,16 @@
-from aiohttp import ClientSession, ClientResponseError
+import asyncio
+import random
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+from aiohttp import ClientSession, ClientResponseError, ClientConnectionError
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+PAGE_CONCURRENCY = 4
+PAGE_RETRIES = 4
+RETRY_BACKOFF = 0.5
+RETRY_BACKOFF_MAX = 10.0
+
+PageCallback = Callable[[int, int, int, int, int], Awaitable[None]]
 
 
 class MicrolineClient:
@@ -12,8 +24,6 @@ class MicrolineClient:
                 "Content-Type": "application/json"}
 
     async def _request(self, vendor, method: str, path: str, **kwargs):
-
-
         url = f"{vendor.source}/api/v1{path}"
         headers = await self._auth_headers(vendor)
 
@@ -22,7 +32,8 @@ class MicrolineClient:
                 raise ClientResponseError(request_info=resp.request_info,
                                           history=resp.history,
                                           status=resp.status,
-                                          message=await resp.text())
+                                          message=await resp.text(),
+                                          headers=resp.headers)
             return await resp.json()
 
     async def get_categories(self, vendor, parent_id=None):
@@ -37,6 +48,90 @@ class MicrolineClient:
                   "limit": limit}
         return await self._request(vendor, "GET", "/products", params=params)
 
+    @staticmethod
+    def _retry_delay(attempt: int, error: Exception) -> float:
+        headers = getattr(error, "headers", None)
+        retry_after = headers.get("Retry-After") if headers else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), RETRY_BACKOFF_MAX)
+        return random.uniform(0, min(RETRY_BACKOFF_MAX, RETRY_BACKOFF * 2 ** attempt))
+
+    async def _request_with_retry(self, vendor, method: str, path: str, retries: int = PAGE_RETRIES, **kwargs):
+        attempt = 0
+        while True:
+            try:
+                return await self._request(vendor, method, path, **kwargs)
+            except ClientResponseError as e:
+                if e.status not in RETRY_STATUSES or attempt >= retries:
+                    raise
+                delay = self._retry_delay(attempt, e)
+            except (ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt >= retries:
+                    raise
+                delay = self._retry_delay(attempt, e)
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def get_products_page(self, vendor, contractor_id, delivery_location_id, category_id, page, limit):
+        params = {"contractorId": contractor_id,
+                  "deliveryLocationId": delivery_location_id,
+                  "categoryId": category_id,
+                  "page": page,
+                  "limit": limit}
+        return await self._request_with_retry(vendor, "GET", "/products", params=params)
+
+    async def iter_product_pages(self, vendor, contractor_id, delivery_location_id, category_id, limit,
+                                 concurrency: int = PAGE_CONCURRENCY) -> AsyncIterator[tuple[int, int, int, list]]:
+        first_page = await self.get_products_page(vendor, contractor_id, delivery_location_id, category_id, 1, limit)
+        first_items = first_page.get("items", [])
+        total = first_page.get("total", None) or len(first_items)
+        pages = (total + limit - 1) // limit
+        yield 1, pages, total, first_items
+
+        if pages < 2:
+            return
+
+        pending = iter(range(2, pages + 1))
+        results: asyncio.Queue = asyncio.Queue(maxsize=max(1, concurrency))
+
+        async def worker():
+            try:
+                for page in pending:
+                    data = await self.get_products_page(vendor, contractor_id, delivery_location_id, category_id,
+                                                        page, limit)
+                    await results.put((page, data.get("items", []), None))
+            except Exception as e:
+                await results.put((None, None, e))
+
+        workers = [asyncio.create_task(worker()) for _ in range(max(1, min(concurrency, pages - 1)))]
+        try:
+            for _ in range(pages - 1):
+                page, items, error = await results.get()
+                if error is not None:
+                    raise error
+                yield page, pages, total, items
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def get_all_products(self, vendor, contractor_id, delivery_location_id, category_id, limit,
+                               concurrency: int = PAGE_CONCURRENCY,
+                               on_page: Optional[PageCallback] = None) -> tuple[list, int]:
+        by_page: dict[int, list] = dict()
+        received, total = 0, 0
+        async for page, pages, total, items in self.iter_product_pages(vendor, contractor_id, delivery_location_id,
+                                                                       category_id, limit, concurrency):
+            by_page[page] = items
+            received += len(items)
+            if on_page:
+                await on_page(len(by_page), pages, len(items), received, total)
+
+        all_items = list()
+        for page in sorted(by_page):
+            all_items.extend(by_page[page])
+        return all_items, total
+
     async def get_links(self, vendor):
         return await self._request(vendor, "GET", "/links")
 
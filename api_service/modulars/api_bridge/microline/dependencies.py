@@ -1,19 +1,17 @@
 from fastapi import Depends
-from aiohttp import ClientSession, ClientTimeout
+from aiohttp import ClientSession
 
 from api_service.modulars.api_bridge.microline.client import MicrolineClient
 from api_service.modulars.api_bridge.microline.service import MicrolineService
+from http_pool import get_microline_session
 from api_service.modulars.api_bridge.token_services import (AuthService,
                                                                  TokenStateService,
                                                                  LoginService,
                                                                  RefreshService)
 
 
-async def get_http_client():
-    timeout = ClientTimeout(total=1000, connect=10, sock_read=1000)
-
-    async with ClientSession(timeout=timeout) as session:
-        yield session
+async def get_http_client() -> ClientSession:
+    return get_microline_session()
 
 
 async def get_login_service(http: ClientSession = Depends(get_http_client)):
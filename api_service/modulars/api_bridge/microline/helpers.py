@@ -8,7 +8,7 @@ from sqlalchemy.orm import selectinload
 
 from api_service.schemas import RewardRangeLineSchema
 from models import ProductBrand, ProductOrigin, RewardRange, ParsingLine, VendorSearchLine
-from parsing.utils import cost_process
+from parsing.utils import reward_engine
 
 
 def normalize_product_brands(products):
@@ -129,30 +129,64 @@ async def get_default_reward_lines(session):
     return reward_lines, reward_range.id
 
 
-async def rebuild_parsing_lines(session, linked_vsl, vsl_products, deleted_origins, reward_lines, reward_range_id):
-    total_inserted = 0
-
-    for vsl in linked_vsl:
-
-        await session.execute(delete(ParsingLine).where(ParsingLine.vsl_id == vsl.id))
-
-        rows = build_parsing_rows(products=vsl_products[vsl.id], vsl_id=vsl.id,
-                                  deleted_origins=deleted_origins, reward_lines=reward_lines,
-                                  reward_range_id=reward_range_id)
+PARSING_LINE_COLUMNS = ("vsl_id", "origin", "shipment", "warranty", "input_price", "output_price", "optional",
+                        "profit_range_id")
 
-        if rows:
-            await session.execute(insert(ParsingLine), rows)
-            total_inserted += len(rows)
 
-        await session.execute(update(VendorSearchLine).where(VendorSearchLine.id == vsl.id)
-                              .values(dt_parsed=datetime.now(timezone.utc)))
-
-    return total_inserted
+async def copy_parsing_rows(session: AsyncSession, rows: list[dict]):
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    driver_connection = getattr(raw_connection, "driver_connection", None)
+    if hasattr(driver_connection, "copy_records_to_table"):
+        records = [tuple(row[column] for column in PARSING_LINE_COLUMNS) for row in rows]
+        await driver_connection.copy_records_to_table(ParsingLine.__tablename__, records=records,
+                                                      columns=PARSING_LINE_COLUMNS)
+        return
+    for i in range(0, len(rows), 1000):
+        await session.execute(insert(ParsingLine), rows[i:i + 1000])
 
 
-def build_parsing_rows(products, vsl_id, deleted_origins, reward_lines, reward_range_id):
+async def rebuild_parsing_lines(session, linked_vsl, vsl_products, deleted_origins, reward_lines, reward_range_id):
+    vsl_ids = [vsl.id for vsl in linked_vsl]
+    price_cache: dict[float, float] = dict()
+    rows = list()
+    counts: dict[int, int] = dict()
+
+    for vsl_id in vsl_ids:
+        vsl_rows = build_parsing_rows(products=vsl_products[vsl_id], vsl_id=vsl_id,
+                                      deleted_origins=deleted_origins, reward_lines=reward_lines,
+                                      reward_range_id=reward_range_id, price_cache=price_cache)
+        counts[vsl_id] = len(vsl_rows)
+        rows.extend(vsl_rows)
+
+    await session.execute(delete(ParsingLine).where(ParsingLine.vsl_id.in_(vsl_ids)))
+    if rows:
+        await copy_parsing_rows(session, rows)
+    await session.execute(update(VendorSearchLine).where(VendorSearchLine.id.in_(vsl_ids))
+                          .values(dt_parsed=datetime.now(timezone.utc)))
+
+    return counts
+
+
+async def upsert_parsing_rows(session: AsyncSession, rows: list[dict], chunk_size: int = 1000) -> int:
+    for i in range(0, len(rows), chunk_size):
+        stmt = insert(ParsingLine).values(rows[i:i + chunk_size])
+        stmt = stmt.on_conflict_do_update(index_elements=[ParsingLine.vsl_id, ParsingLine.origin],
+                                          set_={"shipment": stmt.excluded.shipment,
+                                                "warranty": stmt.excluded.warranty,
+                                                "input_price": stmt.excluded.input_price,
+                                                "output_price": stmt.excluded.output_price,
+                                                "optional": stmt.excluded.optional,
+                                                "profit_range_id": stmt.excluded.profit_range_id})
+        await session.execute(stmt)
+    return len(rows)
+
+
+def build_parsing_rows(products, vsl_id, deleted_origins, reward_lines, reward_range_id, price_cache=None):
     rows = list()
     seen_origins = set()
+    price_cache = price_cache if price_cache is not None else dict()
+    engine = reward_engine(reward_lines)
 
     for product in products:
 
@@ -169,12 +203,15 @@ def build_parsing_rows(products, vsl_id, deleted_origins, reward_lines, reward_r
 
         seen_origins.add(origin)
 
+        if product.price not in price_cache:
+            price_cache[product.price] = engine.apply(product.price)
+
         rows.append({"vsl_id": vsl_id,
                      "origin": origin,
                      "shipment": product.delivery,
                      "warranty": None,
                      "input_price": product.price,
-                     "output_price": cost_process(product.price, reward_lines),
+                     "output_price": price_cache[product.price],
                      "optional": f"{int(product.amount)} шт",
                      "profit_range_id": reward_range_id})
 
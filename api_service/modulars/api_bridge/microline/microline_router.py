@@ -4,13 +4,15 @@ import time
 
 from aiohttp import ClientConnectorError, ClientConnectionError, ClientResponseError
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from api_service.modulars.api_bridge.microline.dependencies import get_microline_service
 from api_service.modulars.api_bridge.microline.schemas import LoginRequest, ProductsFromApiResponse, \
     ApiSearchAlreadyExists
-from api_service.modulars.api_bridge.microline.service import MicrolineService
+from api_service.modulars.api_bridge.microline.service import MicrolineService, ApiBridgeService
 from api_service.modulars.api_bridge.token_services import AuthService, AuthResult
 from config import redis_session
 from engine import db
@@ -145,43 +147,23 @@ async def get_products(vendor_id: int,
         return {"status": "auth_error"}
 
     start_time = time.perf_counter()
-    first_page = await service.client.get_products(vendor, contractor_id=contractorId,
-                                                   delivery_location_id=deliveryLocationId,
-                                                   category_id=categoryId,
-                                                   page=1,
-                                                   limit=limit)
-
-    items = first_page.get("items", [])
-    total = first_page.get("total", None)
-
-    if not total:
-        total = len(items)
-    pages = (total + limit - 1) // limit
-    percent = 0 if total == 0 else round((len(items) / total) * 100, 2)
-    await send_progress(redis, progress, {"page": 1,
-                                          "pages": pages,
-                                          "received": len(items),
-                                          "total_items": len(items),
-                                          "percent": percent,
-                                          "eta": None})
-
-    all_items = list(items)
-    for page in range(2, pages + 1):
-        data = await service.client.get_products(vendor, contractor_id=contractorId,
-                                                 delivery_location_id=deliveryLocationId,
-                                                 category_id=categoryId,
-                                                 page=page,
-                                                 limit=limit)
-        page_items = data.get("items", [])
-        all_items.extend(page_items)
+
+    async def on_page(done: int, pages: int, received: int, total_items: int, total: int):
         elapsed = time.perf_counter() - start_time
-        avg_page_time = elapsed / page
-        eta = avg_page_time * (pages - page)
-        percent = 0 if total == 0 else round((len(all_items) / total) * 100, 2)
-        await send_progress(redis, progress, {"page": page, "pages": pages, "received": len(page_items),
-                                              "total_items": len(all_items),
+        eta = None if done == 1 else round(elapsed / done * (pages - done), 1)
+        percent = 0 if total == 0 else round((total_items / total) * 100, 2)
+        await send_progress(redis, progress, {"page": done,
+                                              "pages": pages,
+                                              "received": received,
+                                              "total_items": total_items,
                                               "percent": percent,
-                                              "eta": round(eta, 1)})
+                                              "eta": eta})
+
+    all_items, _ = await service.client.get_all_products(vendor, contractor_id=contractorId,
+                                                         delivery_location_id=deliveryLocationId,
+                                                         category_id=categoryId,
+                                                         limit=limit,
+                                                         on_page=on_page)
     await send_progress(redis, progress, {"status": "END"})
     all_items.sort(key=lambda x: float(x.get("price", 0)))
     elapsed = time.perf_counter() - start_time
@@ -202,6 +184,49 @@ async def get_products(vendor_id: int,
                                    already_exists=already_exists, products=all_items)
 
 
+@microline_router.get("/vendors/{vendor_id}/products/ingest")
+async def ingest_products(vendor_id: int,
+                          apiSearchId: int,
+                          categoryId: int,
+                          contractorId: int,
+                          deliveryLocationId: int,
+                          limit: int = 120,
+                          session: AsyncSession = Depends(db.session_dependency),
+                          service: MicrolineService = Depends(get_microline_service)):
+    vendor, error = await ensure_vendor_ready(vendor_id, session, service)
+    if error:
+        return error
+
+    links = await ApiBridgeService.get_vendor_api_search_line_link(apiSearchId, session)
+    if not links.linked_VSL:
+        return {"status": "no_linked_vsl"}
+    linked_vsl = links.linked_VSL
+
+    async def ndjson():
+        start_time = time.perf_counter()
+        pages = service.client.iter_product_pages(vendor, contractor_id=contractorId,
+                                                  delivery_location_id=deliveryLocationId,
+                                                  category_id=categoryId,
+                                                  limit=limit)
+        async with db.tg_session() as stream_session:
+            try:
+                async for message in ApiBridgeService.stream_parsing_line_data_from_api(pages, linked_vsl,
+                                                                                        stream_session):
+                    message["exec_time"] = round(time.perf_counter() - start_time, 1)
+                    yield json.dumps(message, ensure_ascii=False) + "\n"
+            except (ClientConnectorError, ClientConnectionError, ClientResponseError, asyncio.TimeoutError) as e:
+                await stream_session.rollback()
+                yield json.dumps({"status": "error", "detail": str(e)}, ensure_ascii=False) + "\n"
+            except SQLAlchemyError as e:
+                await stream_session.rollback()
+                yield json.dumps({"status": "error", "error": "database", "detail": str(e)},
+                                 ensure_ascii=False) + "\n"
+            finally:
+                await pages.aclose()
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+
 @microline_router.get("/vendors/{vendor_id}/access-check")
 async def check_access(vendor_id: int,
                        session: AsyncSession = Depends(db.session_dependency),
@@ -1,5 +1,6 @@
 from collections import defaultdict
 from datetime import datetime, timezone
+from typing import AsyncIterator
 
 from fastapi import HTTPException
 from sqlalchemy import select, delete, update
@@ -10,15 +11,14 @@ from sqlalchemy.orm import selectinload
 from api_service.modulars.api_bridge.microline.client import MicrolineClient
 from api_service.modulars.api_bridge.microline.helpers import normalize_product_brands, sync_product_brands, \
     build_vsl_products, collect_needed_origins, build_vsl_brands_map, sync_product_origins, get_default_reward_lines, \
-    rebuild_parsing_lines
+    rebuild_parsing_lines, build_parsing_rows, upsert_parsing_rows
 from api_service.modulars.api_bridge.microline.schemas import AddVendorApiSearch, VendorApiSearchResponse, \
-    DeleteVendorApiSearch, VendorApiSearchDeleteResponse, ApiSearchVSLResponse, UpdateLinesFromApi
+    DeleteVendorApiSearch, VendorApiSearchDeleteResponse, ApiSearchVSLResponse, UpdateLinesFromApi, ProductFromApi
 from api_service.modulars.api_bridge.token_services import AuthResult
 from api_service.schemas import BrandModel, VSLScheme, VSLSchemeWithBrands, RewardRangeLineSchema
 from models import Vendor, VendorApiSearch, VendorSearchLine, VendorApiSearchLineLink, ProductBrand, ProductOrigin, \
     ParsingLine
 from models.vendor import VendorSearchLineBrandLink, RewardRange
-from parsing.utils import cost_process
 
 
 def normalize_dt(dt: datetime | None):
@@ -175,11 +175,52 @@ class ApiBridgeService:
 
         reward_lines, reward_range_id = await get_default_reward_lines(session)
 
-        total_inserted = await rebuild_parsing_lines(session=session,
-                                                     linked_vsl=payload.linked_VSL,
-                                                     vsl_products=vsl_products,
-                                                     deleted_origins=deleted_origins,
-                                                     reward_lines=reward_lines,
-                                                     reward_range_id=reward_range_id)
+        per_vsl = await rebuild_parsing_lines(session=session,
+                                              linked_vsl=payload.linked_VSL,
+                                              vsl_products=vsl_products,
+                                              deleted_origins=deleted_origins,
+                                              reward_lines=reward_lines,
+                                              reward_range_id=reward_range_id)
         await session.commit()
-        return {"status": "ok", "inserted": total_inserted}
+        return {"status": "ok", "inserted": sum(per_vsl.values()), "per_vsl": per_vsl}
+
+    @staticmethod
+    async def stream_parsing_line_data_from_api(pages: AsyncIterator[tuple[int, int, int, list]],
+                                                linked_vsl: list[VSLSchemeWithBrands],
+                                                session: AsyncSession) -> AsyncIterator[dict]:
+        vsl_ids = [vsl.id for vsl in linked_vsl]
+        vsl_brands_map = build_vsl_brands_map(linked_vsl)
+        reward_lines, reward_range_id = await get_default_reward_lines(session)
+        await session.execute(delete(ParsingLine).where(ParsingLine.vsl_id.in_(vsl_ids)))
+
+        seen: dict[int, set[int]] = {vsl_id: set() for vsl_id in vsl_ids}
+        done, received, inserted = 0, 0, 0
+        async for page, page_count, total, items in pages:
+            raw_products = [ProductFromApi.model_validate(item) for item in items]
+            normalize_product_brands(raw_products)
+            await sync_product_brands(session=session, raw_products=raw_products, vsl_brands_map=vsl_brands_map,
+                                      linked_vsl=linked_vsl)
+            vsl_products = build_vsl_products(raw_products, linked_vsl, vsl_brands_map)
+            needed_origins = collect_needed_origins(vsl_products)
+            if needed_origins:
+                deleted_origins = await sync_product_origins(session=session, needed_origins=needed_origins,
+                                                             raw_products=raw_products)
+                for vsl_id in vsl_ids:
+                    rows = build_parsing_rows(products=vsl_products[vsl_id], vsl_id=vsl_id,
+                                              deleted_origins=deleted_origins | seen[vsl_id],
+                                              reward_lines=reward_lines, reward_range_id=reward_range_id)
+                    seen[vsl_id].update(row["origin"] for row in rows)
+                    inserted += await upsert_parsing_rows(session, rows)
+            done += 1
+            received += len(raw_products)
+            yield {"page": done,
+                   "pages": page_count,
+                   "received": len(raw_products),
+                   "total_items": received,
+                   "percent": 0 if total == 0 else round((received / total) * 100, 2),
+                   "inserted": inserted}
+
+        await session.execute(update(VendorSearchLine).where(VendorSearchLine.id.in_(vsl_ids))
+                              .values(dt_parsed=datetime.now(timezone.utc)))
+        await session.commit()
+        yield {"status": "ok", "received": received, "inserted": inserted}
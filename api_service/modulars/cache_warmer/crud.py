@@ -0,0 +1,26 @@
+from typing import List, Optional
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import HUbStock, ProductFeaturesLink
+
+
+async def stock_feature_ids(session: AsyncSession, path_ids: Optional[List[int]] = None) -> List[int]:
+    stmt = (select(ProductFeaturesLink.feature_id)
+            .join(HUbStock, HUbStock.origin == ProductFeaturesLink.origin)
+            .distinct()
+            .order_by(ProductFeaturesLink.feature_id))
+    if path_ids:
+        stmt = stmt.where(HUbStock.path_id.in_(path_ids))
+    result = await session.execute(stmt)
+    return list(result.scalars().all())
+
+
+async def popular_path_ids(session: AsyncSession, limit: int) -> List[int]:
+    stmt = (select(HUbStock.path_id)
+            .group_by(HUbStock.path_id)
+            .order_by(func.count(HUbStock.id).desc())
+            .limit(limit))
+    result = await session.execute(stmt)
+    return list(result.scalars().all())
@@ -0,0 +1,193 @@
+import asyncio
+import logging
+import time
+from typing import Optional, List, Set
+
+from api_miniapp.routers.hub_product import build_products_by_path
+from api_service.modulars.cache_warmer.crud import stock_feature_ids, popular_path_ids
+from api_service.modulars.desc_builder.service import DescBuilder
+from api_v3.logic import load_menu_levels
+from api_v3.response_cache import cached_body
+from api_v3.routers import build_products_page, products_page_params, PRODUCTS_PAGE_LIMIT
+from cache import CacheManager, get_cache_manager, start_cache_manager, stop_cache_manager
+from cache.keys.features import short_specs_key
+from cache.keys.hub import menu_levels_key, products_by_path_key
+from cache.settings import cache_ttl, cache_warm
+from engine import db
+
+
+class CacheWarmer:
+    def __init__(self, cache: CacheManager, concurrency: int = cache_warm.concurrency,
+                 batch: int = cache_warm.batch, top_paths: int = cache_warm.top_paths):
+        self.cache = cache
+        self.semaphore = asyncio.Semaphore(max(1, concurrency))
+        self.batch = max(1, batch)
+        self.top_paths = top_paths
+        self.progress = {"stage": "idle", "done": 0, "total": 0, "errors": 0, "started_at": None,
+                         "finished_at": None, "stages": {}}
+
+    def _stage(self, name: str, total: int):
+        self.progress.update(stage=name, done=0, total=total)
+        logging.info(f"Cache warm-up: {name} ({total})")
+
+    def _step(self, count: int = 1):
+        self.progress["done"] += count
+
+    def _finish_stage(self, name: str, started: float):
+        self.progress["stages"][name] = {"done": self.progress["done"], "total": self.progress["total"],
+                                         "seconds": round(time.monotonic() - started, 2)}
+
+    async def warm_menu(self):
+        started = time.monotonic()
+        self._stage("menu", 1)
+        levels = await load_menu_levels()
+        await self.cache.set(menu_levels_key(), levels, ttl=cache_ttl.menu, stale_ttl=cache_ttl.stale)
+        self._step()
+        self._finish_stage("menu", started)
+
+    async def _short_specs_batch(self, feature_ids: List[int]):
+        async with self.semaphore:
+            try:
+                async with db.tg_session() as session:
+                    specs = await DescBuilder.generate_short_specs_for_feature_ids(feature_ids, session)
+                await self.cache.mset({short_specs_key(fid): desc for fid, desc in specs.items()},
+                                      ttl=cache_ttl.short_specs)
+            except Exception as e:
+                self.progress["errors"] += 1
+                logging.warning(f"Cache warm-up: short specs batch failed: {e!r}")
+            self._step(len(feature_ids))
+
+    async def warm_short_specs(self, path_ids: Optional[List[int]] = None):
+        started = time.monotonic()
+        async with db.tg_session() as session:
+            feature_ids = await stock_feature_ids(session, path_ids)
+        self._stage("short_specs", len(feature_ids))
+        batches = [feature_ids[i:i + self.batch] for i in range(0, len(feature_ids), self.batch)]
+        await asyncio.gather(*(self._short_specs_batch(batch) for batch in batches))
+        self._finish_stage("short_specs", started)
+
+    async def _category(self, path_id: int):
+        async with self.semaphore:
+            try:
+                response = await build_products_by_path([path_id])
+                await self.cache.set(products_by_path_key([path_id]), response,
+                                     ttl=cache_ttl.short, stale_ttl=cache_ttl.stale)
+            except Exception as e:
+                self.progress["errors"] += 1
+                logging.warning(f"Cache warm-up: category {path_id} failed: {e!r}")
+            self._step()
+
+    async def warm_categories(self, path_ids: Optional[List[int]] = None):
+        started = time.monotonic()
+        if path_ids is None:
+            async with db.tg_session() as session:
+                path_ids = await popular_path_ids(session, self.top_paths)
+        self._stage("categories", len(path_ids))
+        await asyncio.gather(*(self._category(path_id) for path_id in path_ids))
+        self._finish_stage("categories", started)
+
+    async def _listing(self, menu_levels: Optional[List[int]]):
+        params = products_page_params(None, PRODUCTS_PAGE_LIMIT, "price_asc", menu_levels)
+        async with self.semaphore:
+            try:
+                async with db.tg_session() as session:
+                    await cached_body(self.cache, "products", params,
+                                      lambda: build_products_page(None, PRODUCTS_PAGE_LIMIT, "price_asc",
+                                                                  menu_levels, session, self.cache))
+            except Exception as e:
+                self.progress["errors"] += 1
+                logging.warning(f"Cache warm-up: listing {menu_levels} failed: {e!r}")
+            self._step()
+
+    async def warm_listings(self, path_ids: Optional[List[int]] = None):
+        started = time.monotonic()
+        if path_ids is None:
+            async with db.tg_session() as session:
+                path_ids = await popular_path_ids(session, self.top_paths)
+        listings = [None] + [[path_id] for path_id in path_ids]
+        self._stage("listings", len(listings))
+        await asyncio.gather(*(self._listing(menu_levels) for menu_levels in listings))
+        self._finish_stage("listings", started)
+
+    async def run(self, path_ids: Optional[List[int]] = None) -> dict:
+        self.progress.update(started_at=time.time(), finished_at=None, errors=0, stages={})
+        await self.warm_menu()
+        await self.warm_categories(path_ids)
+        await self.warm_listings(path_ids)
+        await self.warm_short_specs(path_ids)
+        self.progress.update(stage="done", finished_at=time.time())
+        logging.info(f"Cache warm-up finished: {self.progress['stages']}")
+        return self.progress
+
+
+class CacheWarmupRunner:
+    def __init__(self):
+        self.warmer: Optional[CacheWarmer] = None
+        self._task: Optional[asyncio.Task] = None
+        self._queued: Optional[Set[int]] = None
+        self._queued_full = False
+
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def schedule(self, path_ids: Optional[List[int]] = None) -> bool:
+        if self.running():
+            self._enqueue(path_ids)
+            return False
+        self._task = asyncio.create_task(self._run(path_ids))
+        return True
+
+    def _enqueue(self, path_ids: Optional[List[int]]):
+        if path_ids is None:
+            self._queued_full = True
+            return
+        self._queued = (self._queued or set()) | set(path_ids)
+
+    def _dequeue(self) -> tuple[bool, Optional[List[int]]]:
+        if self._queued_full:
+            self._queued_full, self._queued = False, None
+            return True, None
+        if self._queued:
+            path_ids, self._queued = sorted(self._queued), None
+            return True, path_ids
+        return False, None
+
+    async def _run(self, path_ids: Optional[List[int]]):
+        pending = True
+        while pending:
+            self.warmer = CacheWarmer(get_cache_manager())
+            try:
+                await self.warmer.run(path_ids)
+            except Exception as e:
+                logging.error(f"Cache warm-up failed: {e!r}")
+            pending, path_ids = self._dequeue()
+
+    async def stop(self):
+        if self.running():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def status(self) -> dict:
+        return {"running": self.running(),
+                "queued": "all" if self._queued_full else sorted(self._queued or ()),
+                "progress": self.warmer.progress if self.warmer else None}
+
+
+cache_warmup = CacheWarmupRunner()
+
+
+async def main():
+    logging.basicConfig(level=logging.INFO)
+    cache = await start_cache_manager()
+    try:
+        report = await CacheWarmer(cache).run()
+    finally:
+        await stop_cache_manager()
+    logging.info(f"Cache warm-up report: {report}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
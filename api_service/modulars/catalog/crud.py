@@ -0,0 +1,104 @@
+import logging
+from typing import Iterable, Optional
+
+from sqlalchemy import select, delete, func, case, or_, true
+from sqlalchemy.dialects.postgresql import insert, aggregate_order_by
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from cache.events import cache_events, RESPONSES_CHANGED
+from models import CatalogItem, HUbStock, ProductOrigin, ProductImage, ProductFeaturesLink, ProductFeaturesGlobal
+
+CATALOG_COLUMNS = ("stock_id", "origin", "path_id", "warranty", "output_price", "title", "feature_id", "model",
+                   "preview", "pics")
+
+
+def catalog_scope(path_ids: Optional[Iterable[int]] = None, origins: Optional[Iterable[int]] = None,
+                  feature_ids: Optional[Iterable[int]] = None):
+    conditions = list()
+    if path_ids:
+        conditions.append(HUbStock.path_id.in_(list(path_ids)))
+    if origins:
+        conditions.append(HUbStock.origin.in_(list(origins)))
+    if feature_ids:
+        linked = select(ProductFeaturesLink.origin).where(ProductFeaturesLink.feature_id.in_(list(feature_ids)))
+        conditions.append(HUbStock.origin.in_(linked))
+    return or_(*conditions) if conditions else None
+
+
+async def project_catalog(session: AsyncSession, condition) -> int:
+    scoped_origins = select(HUbStock.origin).where(condition)
+    link = (select(ProductFeaturesLink.origin, func.min(ProductFeaturesLink.feature_id).label("feature_id"))
+            .where(ProductFeaturesLink.origin.in_(scoped_origins))
+            .group_by(ProductFeaturesLink.origin)
+            .subquery())
+    images = (select(ProductImage.origin_id,
+                     func.array_agg(aggregate_order_by(ProductImage.key, ProductImage.id)).label("pics"),
+                     func.max(case((ProductImage.is_preview.is_(True), ProductImage.key))).label("preview"))
+              .where(ProductImage.origin_id.in_(scoped_origins), ProductImage.key.isnot(None))
+              .group_by(ProductImage.origin_id)
+              .subquery())
+    rows = (select(HUbStock.id,
+                   HUbStock.origin,
+                   HUbStock.path_id,
+                   HUbStock.warranty,
+                   HUbStock.output_price,
+                   ProductOrigin.title,
+                   link.c.feature_id,
+                   ProductFeaturesGlobal.title,
+                   images.c.preview,
+                   images.c.pics)
+            .join(ProductOrigin, ProductOrigin.origin == HUbStock.origin)
+            .outerjoin(link, link.c.origin == HUbStock.origin)
+            .outerjoin(ProductFeaturesGlobal, ProductFeaturesGlobal.id == link.c.feature_id)
+            .outerjoin(images, images.c.origin_id == HUbStock.origin)
+            .where(condition, ProductOrigin.is_deleted.is_(False)))
+
+    await session.execute(delete(CatalogItem).where(CatalogItem.stock_id.in_(select(HUbStock.id).where(condition))))
+    stmt = insert(CatalogItem).from_select(CATALOG_COLUMNS, rows)
+    stmt = stmt.on_conflict_do_update(index_elements=[CatalogItem.stock_id],
+                                      set_={**{name: stmt.excluded[name] for name in CATALOG_COLUMNS[1:]},
+                                            "refreshed_at": func.now()})
+    result = await session.execute(stmt)
+    return result.rowcount or 0
+
+
+async def refresh_catalog_items(session: AsyncSession, *, path_ids: Optional[Iterable[int]] = None,
+                                origins: Optional[Iterable[int]] = None,
+                                feature_ids: Optional[Iterable[int]] = None) -> int:
+    condition = catalog_scope(path_ids, origins, feature_ids)
+    if condition is None:
+        return 0
+    return await project_catalog(session, condition)
+
+
+async def catalog_origins_by_features(session: AsyncSession, feature_ids: Iterable[int]) -> list[int]:
+    result = await session.execute(select(CatalogItem.origin).where(CatalogItem.feature_id.in_(list(feature_ids))))
+    return list(result.scalars().all())
+
+
+async def rebuild_catalog(session: AsyncSession) -> int:
+    await session.execute(delete(CatalogItem))
+    count = await project_catalog(session, true())
+    await session.commit()
+    return count
+
+
+async def ensure_catalog(session: AsyncSession) -> int:
+    if await session.scalar(select(CatalogItem.stock_id).limit(1)) is not None:
+        return 0
+    return await rebuild_catalog(session)
+
+
+async def sync_catalog(session: AsyncSession, *, path_ids: Optional[Iterable[int]] = None,
+                       origins: Optional[Iterable[int]] = None,
+                       feature_ids: Optional[Iterable[int]] = None) -> int:
+    try:
+        count = await refresh_catalog_items(session, path_ids=path_ids, origins=origins, feature_ids=feature_ids)
+        await session.commit()
+    except SQLAlchemyError as e:
+        await session.rollback()
+        logging.warning(f"Catalog projection refresh failed: {e!r}")
+        return 0
+    await cache_events.emit(session, RESPONSES_CHANGED)
+    return count
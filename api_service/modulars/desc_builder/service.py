@@ -1,4 +1,4 @@
-from typing import List, Dict, Tuple
+from typing import List, Dict
 
 from fastapi import HTTPException
 from redis.asyncio import Redis
@@ -15,6 +15,7 @@ from api_service.schemas.desc_builder import SpecsComposerExpandedScheme, SpecsP
     DescriptionResponse, BlockResponse, ProductDescription
 from api_service.s3_helper import get_url_from_s3
 from cache import CacheManager
+from cache.events import cache_events, ComposerChanged, SpecPathChanged
 from cache.keys.features import short_specs_key
 from cache.settings import cache_ttl
 from config import settings
@@ -107,6 +108,7 @@ class DescBuilder:
         session.add(new_obj)
         await session.commit()
         await session.refresh(new_obj)
+        await cache_events.emit(session, ComposerChanged(((new_obj.type_id, new_obj.source),)))
         return SpecsComposerResponse.model_validate(new_obj)
 
     @staticmethod
@@ -114,6 +116,7 @@ class DescBuilder:
         composer = await session.get(SpecsComposer, payload.id)
         if not composer:
             raise HTTPException(status_code=404, detail="Composer not found")
+        old_group = (composer.type_id, composer.source)
         changed = False
         for field in ("type_id", "source", "formula_id"):
             new_value = getattr(payload, field)
@@ -123,6 +126,7 @@ class DescBuilder:
         if changed:
             await session.commit()
             await session.refresh(composer)
+            await cache_events.emit(session, ComposerChanged((old_group, (composer.type_id, composer.source))))
         return SpecsComposerResponse.model_validate(composer)
 
     @staticmethod
@@ -130,8 +134,10 @@ class DescBuilder:
         composer = await session.get(SpecsComposer, composer_id)
         if not composer:
             raise HTTPException(status_code=404, detail="Composer not found")
+        group = (composer.type_id, composer.source)
         await session.delete(composer)
         await session.commit()
+        await cache_events.emit(session, ComposerChanged((group,)))
         return {"status": "deleted", "id": composer_id}
 
     @staticmethod
@@ -146,6 +152,7 @@ class DescBuilder:
         session.add(spec)
         await session.commit()
         await session.refresh(spec)
+        await cache_events.emit(session, SpecPathChanged(spec.formula_id, spec.source))
         return spec
 
     @staticmethod
@@ -170,6 +177,7 @@ class DescBuilder:
         if changed:
             await session.commit()
             await session.refresh(spec)
+            await cache_events.emit(session, SpecPathChanged(spec.formula_id, spec.source))
 
         return spec
 
@@ -178,8 +186,10 @@ class DescBuilder:
         spec = await session.get(SpecPath, spec_path_id)
         if not spec:
             raise HTTPException(404, "SpecPath not found")
+        formula_id, source = spec.formula_id, spec.source
         await session.delete(spec)
         await session.commit()
+        await cache_events.emit(session, SpecPathChanged(formula_id, source))
         return {"status": "deleted", "id": spec_path_id}
 
     @staticmethod
@@ -189,12 +199,14 @@ class DescBuilder:
         if not feature_ids:
             return {}
 
-        cached_map, missing_ids = await DescBuilder.fetch_short_specs_from_cache_bulk(feature_ids, cache)
-        if not missing_ids:
-            return DescBuilder._convert_to_block_response_bulk(cached_map)
-        new_map = await DescBuilder.generate_short_specs_for_feature_ids(missing_ids, session)
-        await DescBuilder.cache_short_specs_bulk(new_map, cache)
-        full_map = {**cached_map, **new_map}
+        key_map = {short_specs_key(fid): fid for fid in feature_ids}
+
+        async def load(keys: List[str]) -> Dict[str, ProductDescription]:
+            generated = await DescBuilder.generate_short_specs_for_feature_ids([key_map[k] for k in keys], session)
+            return {short_specs_key(fid): desc for fid, desc in generated.items()}
+
+        specs = await cache.mget_or_compute(key_map.keys(), load, ttl=cache_ttl.short_specs, model=ProductDescription)
+        full_map = {key_map[key]: desc for key, desc in specs.items()}
         return DescBuilder._convert_to_block_response_bulk(full_map)
 
     @staticmethod
@@ -226,31 +238,6 @@ class DescBuilder:
         rows = rows.all()
         return {origin: fid for origin, fid in rows}
 
-    @staticmethod
-    async def fetch_short_specs_from_cache_bulk(feature_ids: List[int],
-                                                cache: CacheManager) -> Tuple[Dict[int, ProductDescription], List[int]]:
-        keys = [short_specs_key(fid) for fid in feature_ids]
-        raw_map = await cache.mget(keys, model=ProductDescription)
-        cached: Dict[int, ProductDescription] = {}
-        missing: List[int] = list()
-
-        for fid, key in zip(feature_ids, keys):
-            obj = raw_map.get(key)
-            if obj is None:
-                missing.append(fid)
-            else:
-                cached[fid] = obj
-
-        return cached, missing
-
-    @staticmethod
-    async def cache_short_specs_bulk(specs_map: Dict[int, ProductDescription], cache: CacheManager) -> None:
-        if not specs_map:
-            return
-
-        mapping = {short_specs_key(fid): desc for fid, desc in specs_map.items()}
-        await cache.mset(mapping, ttl=cache_ttl.short_specs)
-
     @staticmethod
     async def generate_short_specs_for_feature_ids(feature_ids: List[int],
                                                    session: AsyncSession) -> Dict[int, ProductDescription]:
@@ -0,0 +1,71 @@
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import ProductType, ProductBrand, ProductFeaturesGlobal, ProductFeaturesLink
+
+BULK_CHUNK = 1000
+
+
+def chunked(rows: list, size: int = BULK_CHUNK):
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+async def upsert_types(session: AsyncSession, types: set[str]) -> dict[str, int]:
+    if not types:
+        return {}
+    await session.execute(insert(ProductType).values([{"type": t} for t in types])
+                          .on_conflict_do_nothing(index_elements=["type"]))
+    rows = await session.execute(select(ProductType.type, ProductType.id).where(ProductType.type.in_(types)))
+    return {type_: type_id for type_, type_id in rows.all()}
+
+
+async def upsert_brands(session: AsyncSession, brands: set[str]) -> dict[str, int]:
+    if not brands:
+        return {}
+    await session.execute(insert(ProductBrand).values([{"brand": b} for b in brands])
+                          .on_conflict_do_nothing(index_elements=["brand"]))
+    rows = await session.execute(select(ProductBrand.brand, ProductBrand.id).where(ProductBrand.brand.in_(brands)))
+    return {brand: brand_id for brand, brand_id in rows.all()}
+
+
+async def store_dtube_items_bulk(session: AsyncSession,
+                                 items: list[dict],
+                                 links: list[tuple[int, str]]) -> dict[str, int]:
+    if not items:
+        return {}
+
+    type_ids = await upsert_types(session, {item["product_type"] for item in items})
+    brand_ids = await upsert_brands(session, {item["brand"] for item in items})
+
+    feature_rows: dict[str, dict] = dict()
+    for item in items:
+        title = item["title"]
+        if title in feature_rows:
+            continue
+        feature_rows[title] = {"title": title,
+                               "type_id": type_ids[item["product_type"]],
+                               "brand_id": brand_ids[item["brand"]],
+                               "source": item["source"],
+                               "info": item["info"],
+                               "pros_cons": item["pros_cons"]}
+
+    for chunk in chunked(list(feature_rows.values())):
+        await session.execute(insert(ProductFeaturesGlobal).values(chunk)
+                              .on_conflict_do_nothing(index_elements=["title"]))
+
+    titles = list(feature_rows.keys())
+    feature_ids: dict[str, int] = dict()
+    for chunk in chunked(titles):
+        rows = await session.execute(select(ProductFeaturesGlobal.title, ProductFeaturesGlobal.id)
+                                     .where(ProductFeaturesGlobal.title.in_(chunk)))
+        feature_ids.update({title: feature_id for title, feature_id in rows.all()})
+
+    link_rows = [{"origin": origin, "feature_id": feature_ids[title]}
+                 for origin, title in links if title in feature_ids]
+    for chunk in chunked(link_rows):
+        await session.execute(insert(ProductFeaturesLink).values(chunk)
+                              .on_conflict_do_nothing(index_elements=["origin", "feature_id"]))
+
+    return feature_ids
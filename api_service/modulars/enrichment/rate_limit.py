@@ -0,0 +1,19 @@
+import asyncio
+from urllib.parse import urlparse
+
+
+class HostRateLimiter:
+    def __init__(self, rate: float):
+        self.interval = 1 / rate if rate and rate > 0 else 0.0
+        self._next_slot: dict[str, float] = dict()
+
+    async def acquire(self, url: str):
+        if not self.interval:
+            return
+        host = urlparse(url).netloc or url
+        now = asyncio.get_running_loop().time()
+        slot = max(now, self._next_slot.get(host, now))
+        self._next_slot[host] = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            await asyncio.sleep(delay)
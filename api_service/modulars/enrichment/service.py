@@ -0,0 +1,75 @@
+import asyncio
+from typing import Optional
+
+from aiohttp import ClientSession
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api_service.api_connect import get_one_by_dtube, BASE_DTUBE_URL
+from api_service.modulars.catalog.crud import sync_catalog
+from api_service.modulars.enrichment.crud import store_dtube_items_bulk
+from api_service.modulars.enrichment.rate_limit import HostRateLimiter
+from config import settings
+
+
+def normalize_title(title: str) -> str:
+    return " ".join((title or "").split()).lower()
+
+
+class DTubeEnricher:
+    def __init__(self,
+                 client_session: ClientSession,
+                 redis: Optional[Redis] = None,
+                 channel: Optional[str] = None,
+                 concurrency: Optional[int] = None,
+                 rate_limit: Optional[float] = None):
+        self.client_session = client_session
+        self.redis = redis
+        self.channel = channel
+        self.semaphore = asyncio.Semaphore(max(1, concurrency or settings.api.dtube_concurrency))
+        self.limiter = HostRateLimiter(rate_limit if rate_limit is not None else settings.api.dtube_rate_limit)
+
+    async def publish(self, message: str):
+        if self.redis and self.channel:
+            await self.redis.publish(self.channel, message)
+
+    async def fetch_one(self, title: str) -> Optional[dict]:
+        async with self.semaphore:
+            await self.limiter.acquire(BASE_DTUBE_URL)
+            data = await get_one_by_dtube(session=self.client_session, title=title)
+        if data:
+            await self.publish(f"Добавление {data.get('title')}")
+        return data
+
+    async def fetch(self, titles: dict[int, str]) -> dict[int, Optional[dict]]:
+        groups: dict[str, list[int]] = dict()
+        first_title: dict[str, str] = dict()
+        for origin, title in titles.items():
+            key = normalize_title(title)
+            if not key:
+                continue
+            groups.setdefault(key, []).append(origin)
+            first_title.setdefault(key, title)
+
+        await self.publish(f"data: COUNT={len(groups)}")
+        keys = list(groups.keys())
+        results = await asyncio.gather(*(self.fetch_one(first_title[key]) for key in keys))
+
+        resolved: dict[int, Optional[dict]] = dict()
+        for key, data in zip(keys, results):
+            for origin in groups[key]:
+                resolved[origin] = data
+        return resolved
+
+    async def enrich(self, session: AsyncSession, titles: dict[int, str]) -> dict[int, list[str]]:
+        resolved = await self.fetch(titles)
+        items = [data for data in resolved.values() if data]
+        links = [(origin, data["title"]) for origin, data in resolved.items() if data]
+        feature_ids = await store_dtube_items_bulk(session, items, links)
+        await session.commit()
+        await sync_catalog(session, origins=[origin for origin, _ in links])
+        result: dict[int, list[str]] = dict()
+        for origin in titles:
+            data = resolved.get(origin)
+            result[origin] = [data["title"]] if data and data["title"] in feature_ids else []
+        return result
@@ -4,6 +4,7 @@ from sqlalchemy.orm import selectinload
 
 from api_service.modulars.formula.environment import validate_formula, render_formula
 from api_service.schemas import FormulaEntityTypeScheme, CreateFormulaEntityType
+from cache.events import cache_events, FormulaChanged
 from models import FormulaExpression
 from models.formula import FormulaEntityType
 
@@ -93,6 +94,7 @@ class FormulaService:
 
         await session.commit()
         await session.refresh(formula)
+        await cache_events.emit(session, FormulaChanged(formula.id))
         return formula
 
     @staticmethod
@@ -103,6 +105,7 @@ class FormulaService:
 
         formula.is_active = False
         await session.commit()
+        await cache_events.emit(session, FormulaChanged(formula.id))
         return formula
 
     @staticmethod
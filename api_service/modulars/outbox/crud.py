@@ -0,0 +1,83 @@
+from datetime import timedelta
+from typing import Optional
+from uuid import uuid4
+
+from sqlalchemy import select, func, update, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import DTubeOutbox
+
+OUTBOX_LOCK_ID = 7310412
+
+
+def enqueue_feature_mutation(session: AsyncSession, feature_title: str, op: str, body: dict) -> DTubeOutbox:
+    row = DTubeOutbox(feature_title=feature_title, op=op, payload=body, idempotency_key=uuid4().hex)
+    session.add(row)
+    return row
+
+
+async def try_lock_outbox(session: AsyncSession) -> bool:
+    result = await session.execute(select(func.pg_try_advisory_xact_lock(OUTBOX_LOCK_ID)))
+    return bool(result.scalar())
+
+
+def blocked_titles():
+    return select(DTubeOutbox.feature_title).where(DTubeOutbox.status == "failed").distinct()
+
+
+def queued():
+    return DTubeOutbox.status.in_(("pending", "sending"))
+
+
+def ready_titles():
+    heads = (select(DTubeOutbox.feature_title, func.min(DTubeOutbox.id).label("head_id"))
+             .where(queued())
+             .group_by(DTubeOutbox.feature_title)
+             .subquery())
+    return (select(heads.c.feature_title)
+            .join(DTubeOutbox, DTubeOutbox.id == heads.c.head_id)
+            .where(DTubeOutbox.next_attempt_at <= func.now()))
+
+
+async def claim_pending(session: AsyncSession, limit: int, lease: float) -> list[DTubeOutbox]:
+    stmt = (select(DTubeOutbox, (DTubeOutbox.next_attempt_at <= func.now()).label("ready"))
+            .where(queued(),
+                   DTubeOutbox.feature_title.in_(ready_titles()),
+                   DTubeOutbox.feature_title.not_in(blocked_titles()))
+            .order_by(DTubeOutbox.id)
+            .limit(limit))
+    result = await session.execute(stmt)
+    claimed, stopped = list(), set()
+    for row, ready in result.all():
+        if row.feature_title in stopped:
+            continue
+        if not ready:
+            stopped.add(row.feature_title)
+            continue
+        claimed.append(row)
+    for row in claimed:
+        row.status = "sending"
+        row.next_attempt_at = func.now() + timedelta(seconds=lease)
+    return claimed
+
+
+async def outbox_counts(session: AsyncSession) -> dict[str, int]:
+    result = await session.execute(select(DTubeOutbox.status, func.count()).group_by(DTubeOutbox.status))
+    return {status: count for status, count in result.all()}
+
+
+async def requeue_failed(session: AsyncSession, feature_title: Optional[str] = None) -> int:
+    stmt = (update(DTubeOutbox)
+            .where(DTubeOutbox.status == "failed")
+            .values(status="pending", attempts=0, next_attempt_at=func.now()))
+    if feature_title is not None:
+        stmt = stmt.where(DTubeOutbox.feature_title == feature_title)
+    result = await session.execute(stmt)
+    return result.rowcount
+
+
+async def prune_sent(session: AsyncSession, retention: int) -> int:
+    stmt = delete(DTubeOutbox).where(DTubeOutbox.status == "sent",
+                                     DTubeOutbox.sent_at < func.now() - timedelta(seconds=retention))
+    result = await session.execute(stmt)
+    return result.rowcount
@@ -0,0 +1,145 @@
+import asyncio
+import logging
+from datetime import timedelta
+from typing import Optional
+
+from aiohttp import ClientSession
+from sqlalchemy import func
+
+from api_service.api_connect import DigitalTubeClient, FEATURE_MUTATION_PATHS
+from api_service.dtube_health import dtube_available
+from api_service.modulars.outbox.crud import try_lock_outbox, claim_pending, outbox_counts, requeue_failed, \
+    prune_sent
+from config import settings
+from engine import db
+from models import DTubeOutbox
+
+RETRY_BACKOFF = 2.0
+RETRY_BACKOFF_MAX = 600.0
+CLAIM_LEASE = 300.0
+
+
+class OutboxDispatcher:
+    def __init__(self, interval: float, batch: int, max_attempts: int, sent_retention: int):
+        self.interval = interval
+        self.batch = batch
+        self.max_attempts = max_attempts
+        self.sent_retention = sent_retention
+        self.session: Optional[ClientSession] = None
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self.pruned = 0
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def notify(self):
+        self._wake.set()
+
+    async def start(self, session: ClientSession):
+        self.session = session
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                while await self.drain() >= self.batch:
+                    pass
+            except Exception as e:
+                logging.error(f"DigitalTube outbox drain failed: {e!r}")
+
+    async def drain(self) -> int:
+        if not dtube_available():
+            return 0
+        async with db.tg_session() as session:
+            if not await try_lock_outbox(session):
+                return 0
+            self.pruned += await prune_sent(session, self.sent_retention)
+            rows = await claim_pending(session, self.batch, CLAIM_LEASE)
+            await session.commit()
+        if not rows:
+            return 0
+        queues: dict[str, list[DTubeOutbox]] = dict()
+        for row in rows:
+            queues.setdefault(row.feature_title, []).append(row)
+        sent_before = self.sent
+        await asyncio.gather(*(self.dispatch_title(queue) for queue in queues.values()))
+        async with db.tg_session() as session:
+            session.add_all(rows)
+            await session.commit()
+        return self.sent - sent_before
+
+    async def dispatch_title(self, queue: list[DTubeOutbox]):
+        client = DigitalTubeClient(self.session)
+        for i, row in enumerate(queue):
+            try:
+                result = await client.post(FEATURE_MUTATION_PATHS[row.op], json=row.payload,
+                                           headers={"Idempotency-Key": row.idempotency_key})
+                error = f"status={client.last_status}"
+            except Exception as e:
+                result, error = None, repr(e)
+            if not result:
+                self.mark_failed(row, error)
+                self.release(queue[i + 1:])
+                return
+            self.mark_sent(row)
+
+    @staticmethod
+    def release(rows: list[DTubeOutbox]):
+        for row in rows:
+            row.status = "pending"
+            row.next_attempt_at = func.now()
+
+    def mark_sent(self, row: DTubeOutbox):
+        row.status = "sent"
+        row.sent_at = func.now()
+        row.attempts = row.attempts + 1
+        self.sent += 1
+
+    def mark_failed(self, row: DTubeOutbox, error: str):
+        row.attempts = row.attempts + 1
+        row.last_error = error
+        row.status = "pending"
+        if row.attempts >= self.max_attempts:
+            row.status = "failed"
+            self.failed += 1
+            logging.error(f"DigitalTube outbox #{row.id} {row.op} for '{row.feature_title}' failed: {error}, "
+                          f"queue blocked until requeue")
+            return
+        self.retried += 1
+        delay = min(RETRY_BACKOFF * 2 ** row.attempts, RETRY_BACKOFF_MAX)
+        row.next_attempt_at = func.now() + timedelta(seconds=delay)
+
+    async def requeue(self, feature_title: Optional[str] = None) -> int:
+        async with db.tg_session() as session:
+            count = await requeue_failed(session, feature_title)
+            await session.commit()
+        self.notify()
+        return count
+
+    async def stats(self) -> dict:
+        async with db.tg_session() as session:
+            counts = await outbox_counts(session)
+        return {"sent": self.sent, "failed": self.failed, "retried": self.retried, "pruned": self.pruned,
+                "rows": counts}
+
+
+outbox_dispatcher = OutboxDispatcher(interval=settings.api.dtube_outbox_interval,
+                                     batch=settings.api.dtube_outbox_batch,
+                                     max_attempts=settings.api.dtube_outbox_max_attempts,
+                                     sent_retention=settings.api.dtube_outbox_sent_retention)
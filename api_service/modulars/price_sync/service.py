@@ -8,6 +8,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from api_service.modulars.analytics.crud import load_market_settings, update_market_setting
 from api_service.modulars.analytics.origin_analyzer import OriginAnalyzer
+from api_service.modulars.cache_warmer.service import cache_warmup
+from api_service.modulars.catalog.crud import refresh_catalog_items
+from cache.events import cache_events, CATALOG_CHANGED
 from api_service.modulars.price_sync.crud import fetch_raw_origins_db, fetch_leaf_routes, collect_price_sync_paths, \
     hubstock_origins_map_by_path_ids, load_parsing_origins_map, load_origin_feature_map, load_unique_models_by_origins, \
     load_origins_attrs_map
@@ -178,7 +181,10 @@ class PriceSync:
         if rows:
             await session.execute(insert(HUbStock), rows)
         try:
+            await refresh_catalog_items(session, path_ids=path_ids)
             await session.commit()
-            return True
         except SQLAlchemyError:
             return False
+        await cache_events.emit(session, CATALOG_CHANGED)
+        cache_warmup.schedule(path_ids)
+        return True
@@ -8,14 +8,15 @@ from api_service.crud.features import product_features_depps_db, features_hub_le
     delete_info_category_db, update_info_category_db, add_new_features_inner_row_db, delete_features_inner_row_db, \
     update_features_inner_row_db, delete_feature_db, types_brands_request_db, add_new_brand_request_db, \
     add_new_type_request_db, create_new_feature_global_db, set_feature_formula_dependency_db, \
-    fetch_product_information_db, insert_bulk_params_db
-from api_service.s3_helper import get_http_client_session
+    fetch_product_information_db, insert_bulk_params_db, batch_feature_rows_db
+from http_pool import get_dtube_session
 
 from api_service.schemas import FeaturesDataSet, PathRoutes, SetFeaturesHubLevelRequest, SetLevelRoutesResponse, \
     OriginsList, OriginHubLevelMap, FeatureResponseScheme, ProsConsItem, ProsConsItemUpdate, FeatureCategory, \
     UpdateFeatureCategoryRequest, InnerRowRequest, UpdateInnerRowRequest, FeatureIds, TypesAndBrands, \
     CreateFeaturesGlobal, SetFeaturesFormulaRequest, SetFormulaResponse, FetchProductInfoRequest, \
-    ProductResponse, InsertBulkParams, FeatureBulkResponseScheme, CreateNewCriteria
+    ProductResponse, InsertBulkParams, FeatureBulkResponseScheme, CreateNewCriteria, FeatureRowsBatchRequest, \
+    FeatureRowsBatchResponse
 
 from engine import db
 
@@ -51,65 +52,62 @@ async def get_features_by_origin(feature_id: int, session: AsyncSession = Depend
 
 @features_router.post("/add_pros_cons_value")
 async def add_pros_cons_value(payload: ProsConsItem,
-                              session: AsyncSession = Depends(db.scoped_session_dependency),
-                              cl_session: ClientSession = Depends(get_http_client_session)):
-    return await add_pros_cons_value_db(payload, session, cl_session)
+                              session: AsyncSession = Depends(db.scoped_session_dependency)):
+    return await add_pros_cons_value_db(payload, session)
 
 
 @features_router.post("/update_pros_cons_value")
 async def update_pros_cons_value(payload: ProsConsItemUpdate,
-                                 session: AsyncSession = Depends(db.scoped_session_dependency),
-                                 cl_session: ClientSession = Depends(get_http_client_session)):
-    return await update_pros_cons_value_db(payload, session, cl_session)
+                                 session: AsyncSession = Depends(db.scoped_session_dependency)):
+    return await update_pros_cons_value_db(payload, session)
 
 
 @features_router.post("/delete_pros_cons_value")
 async def delete_pros_cons_value(payload: ProsConsItem,
-                                 session: AsyncSession = Depends(db.scoped_session_dependency),
-                                 cl_session: ClientSession = Depends(get_http_client_session)):
-    return await delete_pros_cons_value_db(payload, session, cl_session)
+                                 session: AsyncSession = Depends(db.scoped_session_dependency)):
+    return await delete_pros_cons_value_db(payload, session)
 
 
 @features_router.post("/create_new_info_category")
 async def create_new_info_category(payload: FeatureCategory,
-                                   session: AsyncSession = Depends(db.scoped_session_dependency),
-                                   cl_session: ClientSession = Depends(get_http_client_session)):
-    return await create_new_info_category_db(payload, session, cl_session)
+                                   session: AsyncSession = Depends(db.scoped_session_dependency)):
+    return await create_new_info_category_db(payload, session)
 
 
 @features_router.post("/delete_info_category")
 async def delete_info_category(payload: FeatureCategory,
-                               session: AsyncSession = Depends(db.scoped_session_dependency),
-                               cl_session: ClientSession = Depends(get_http_client_session)):
-    return await delete_info_category_db(payload, session, cl_session)
+                               session: AsyncSession = Depends(db.scoped_session_dependency)):
+    return await delete_info_category_db(payload, session)
 
 
 @features_router.post("/update_info_category")
 async def update_info_category(payload: UpdateFeatureCategoryRequest,
-                               session: AsyncSession = Depends(db.scoped_session_dependency),
-                               cl_session: ClientSession = Depends(get_http_client_session)):
-    return await update_info_category_db(payload, session, cl_session)
+                               session: AsyncSession = Depends(db.scoped_session_dependency)):
+    return await update_info_category_db(payload, session)
 
 
 @features_router.post("/add_new_inner_row")
 async def add_new_features_inner_row(payload: InnerRowRequest,
-                                     session: AsyncSession = Depends(db.scoped_session_dependency),
-                                     cl_session: ClientSession = Depends(get_http_client_session)):
-    return await add_new_features_inner_row_db(payload, session, cl_session)
+                                     session: AsyncSession = Depends(db.scoped_session_dependency)):
+    return await add_new_features_inner_row_db(payload, session)
 
 
 @features_router.post("/delete_inner_row")
 async def delete_features_inner_row(payload: InnerRowRequest,
-                                    session: AsyncSession = Depends(db.scoped_session_dependency),
-                                    cl_session: ClientSession = Depends(get_http_client_session)):
-    return await delete_features_inner_row_db(payload, session, cl_session)
+                                    session: AsyncSession = Depends(db.scoped_session_dependency)):
+    return await delete_features_inner_row_db(payload, session)
 
 
 @features_router.post("/update_inner_row")
 async def update_features_inner_row(payload: UpdateInnerRowRequest,
-                                    session: AsyncSession = Depends(db.scoped_session_dependency),
-                                    cl_session: ClientSession = Depends(get_http_client_session)):
-    return await update_features_inner_row_db(payload, session, cl_session)
+                                    session: AsyncSession = Depends(db.scoped_session_dependency)):
+    return await update_features_inner_row_db(payload, session)
+
+
+@features_router.post("/batch_rows", response_model=FeatureRowsBatchResponse)
+async def batch_feature_rows(payload: FeatureRowsBatchRequest,
+                             session: AsyncSession = Depends(db.scoped_session_dependency)):
+    return await batch_feature_rows_db(payload, session)
 
 
 @features_router.post("/delete_features")
@@ -126,21 +124,21 @@ async def types_brands_request(session: AsyncSession = Depends(db.scoped_session
 @features_router.post("/add_new_brand")
 async def add_new_brand_request(payload: CreateNewCriteria,
                                 session: AsyncSession = Depends(db.scoped_session_dependency),
-                                cl_session: ClientSession = Depends(get_http_client_session)):
+                                cl_session: ClientSession = Depends(get_dtube_session)):
     return await add_new_brand_request_db(payload, session, cl_session)
 
 
 @features_router.post("/add_new_type")
 async def add_new_type_request(payload: CreateNewCriteria,
                                session: AsyncSession = Depends(db.scoped_session_dependency),
-                               cl_session: ClientSession = Depends(get_http_client_session)):
+                               cl_session: ClientSession = Depends(get_dtube_session)):
     return await add_new_type_request_db(payload, session, cl_session)
 
 
 @features_router.post("/create_new_feature_global")
 async def create_new_feature_global(payload: CreateFeaturesGlobal,
                                     session: AsyncSession = Depends(db.scoped_session_dependency),
-                                    cl_session: ClientSession = Depends(get_http_client_session)):
+                                    cl_session: ClientSession = Depends(get_dtube_session)):
     return await create_new_feature_global_db(payload, session, cl_session)
 
 
@@ -158,6 +156,5 @@ async def fetch_product_information(payload: FetchProductInfoRequest,
 
 @features_router.post("/insert_bulk_params", response_model=FeatureBulkResponseScheme)
 async def insert_bulk_params(payload: InsertBulkParams,
-                             session: AsyncSession = Depends(db.scoped_session_dependency),
-                             cl_session: ClientSession = Depends(get_http_client_session)):
-    return await insert_bulk_params_db(payload, session, cl_session)
+                             session: AsyncSession = Depends(db.scoped_session_dependency)):
+    return await insert_bulk_params_db(payload, session)
@@ -12,6 +12,7 @@ from api_service.func import process_image_upload, process_image_update
 from api_service.schemas import RenameRequest, HubMenuLevelSchema, HubPositionPatchOut, AddHubLevelScheme, \
     AddHubLevelOutScheme, HubPositionPatch, UpdateDeleteImageScheme, UpdatedImageScheme, HubMenuLevelSchemaWUpdated
 
+from cache.events import cache_events, MENU_CHANGED
 from config import settings
 from engine import db
 from models import HUbMenuLevel
@@ -68,6 +69,7 @@ async def rename_hub_level_item(payload: RenameRequest, session: AsyncSession =
         return {"status": False}
     item.label = payload.new_label
     await session.commit()
+    await cache_events.emit(session, MENU_CHANGED)
     await session.refresh(item)
     return {"status": True, "id": item.id, "new_label": item.label}
 
@@ -105,6 +107,7 @@ async def change_hub_item_position(patch: HubPositionPatch,
         index_counter += 1
 
     await session.commit()
+    await cache_events.emit(session, MENU_CHANGED)
     await session.refresh(moved)
 
     return HubPositionPatchOut(status=True, id=moved.id, parent_id=moved.parent_id, sort_order=moved.sort_order)
@@ -120,6 +123,7 @@ async def add_hub_level(payload: AddHubLevelScheme, session: AsyncSession = Depe
     new_level = HUbMenuLevel(parent_id=payload.parent_id, label=payload.label, sort_order=max_order + 1)
     session.add(new_level)
     await session.commit()
+    await cache_events.emit(session, MENU_CHANGED)
     return AddHubLevelOutScheme(status=True, id=new_level.id, label=new_level.label,
                                 parent_id=new_level.parent_id, sort_order=new_level.sort_order)
 
@@ -145,6 +149,7 @@ async def delete_hub_level(level_id: int, session: AsyncSession = Depends(db.sco
         .values(sort_order=HUbMenuLevel.sort_order - 1)
     )
     await session.commit()
+    await cache_events.emit(session, MENU_CHANGED)
     return {"status": True}
 
 
@@ -163,6 +168,7 @@ async def upload_image_utils_image_to_hub(code: int = Form(...), file: UploadFil
         old_filename = item.icon
         item.icon = filename
         await async_session.commit()
+        await cache_events.emit(async_session, MENU_CHANGED)
         return old_filename
 
     return await process_image_upload(code=code,
@@ -209,6 +215,7 @@ async def update_or_delete_hub_image(payload: UpdateDeleteImageScheme,
     async def update_db_icon(new_icon: str | None):
         menu_level.icon = new_icon
         await session.commit()
+        await cache_events.emit(session, MENU_CHANGED)
 
     return await process_image_update(code=menu_level.id,
                                       current_icon=menu_level.icon,
@@ -12,6 +12,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from api_service.crud.main import get_info_by_caching, delete_product_stock_items, get_rr_obj, fetch_hubstock_items, \
     update_parsing_line_prices, fetch_parsing_input_price_map
+from api_service.modulars.catalog.crud import sync_catalog
 from api_service.s3_helper import get_s3_client, get_http_client_session, sync_images_by_origin
 
 from api_service.schemas import (
@@ -21,7 +22,7 @@ from api_service.schemas import (
 from api_service.schemas.hubstock_schemas import HubLoadingResponse
 from engine import db
 from models import HUbStock, ProductOrigin, VendorSearchLine, RewardRange
-from parsing.utils import cost_process
+from parsing.utils import reward_engine
 
 hubstock_router = APIRouter(tags=['Hub Stock'])
 
@@ -87,6 +88,7 @@ async def create_hub_loading(payload: HubLoadingData,
                                                           "updated_at": insert_stmt.excluded.updated_at})
     await session.execute(upsert_stmt)
     await session.commit()
+    await sync_catalog(session, origins=[item.origin for item in payload.stocks])
     for item in payload.stocks:
         await sync_images_by_origin(item.origin, session, s3_client, cl_session)
     return HubLoadingResponse(status=True, updated_origins=[item.origin for item in payload.stocks])
@@ -104,6 +106,7 @@ async def rename_hubstock_obj_title(
     obj.title = patch_data.new_title
     session.add(obj)
     await session.commit()
+    await sync_catalog(session, origins=[origin])
     return patch_data
 
 
@@ -122,10 +125,11 @@ async def recalc_hubstock_items(
     result: List[HubItemsChangePriceResponse] = list()
     dt_now_obj = datetime.now()
     parsing_updated_dict = dict()
+    engine = reward_engine(reward_range_obj.ranges) if reward_range_obj else None
     for row in rows:
         new_price = origin_price_map.get(row.origin)
         if reward_range_obj:
-            new_price = cost_process(row.input_price, reward_range_obj.ranges)
+            new_price = engine.apply(row.input_price)
             row.output_price = new_price
             row.profit_range_id = reward_range_obj.id
         else:
@@ -142,6 +146,7 @@ async def recalc_hubstock_items(
     session.add_all(rows)
     await update_parsing_line_prices(session, parsing_updated_dict)
     await session.commit()
+    await sync_catalog(session, origins=list(origin_price_map.keys()))
     return result
 
 
@@ -17,6 +17,7 @@ from api_service.crud.main import get_vendor_and_vsl, get_rr_obj, get_parsing_re
     get_or_create_product_brand, get_or_create_feature, link_origin_to_feature, clear_features_dependencies, \
     add_attributes_values_db, get_product_with_images, get_dependency_images_list, implement_dependency_images_logic
 from api_service.crud.parsing import render_models_structured_db
+from api_service.modulars.catalog.crud import sync_catalog
 from api_service.s3_helper import (get_s3_client, get_http_client_session, sync_images_by_origin,
                                    generate_final_image_payload, build_with_preview)
 from api_service.schemas import (ParsingRequest, ProductOriginUpdate, ProductDependencyUpdate, ProductResponse,
@@ -27,14 +28,16 @@ from api_service.schemas import (ParsingRequest, ProductOriginUpdate, ProductDep
 
 from api_service.schemas.range_reward_schemas import RewardRangeResponseSchema
 from api_service.utils import AppDependencies
+from cache.events import cache_events, feature_changed
 from config import settings
+from http_pool import get_dtube_session
 from engine import db
 
 from models import ParsingLine, ProductOrigin, ProductType, ProductBrand, ProductFeaturesGlobal
 from models.product_dependencies import ProductImage
 from models.vendor import VendorSearchLine
 from parsing.logic import parsing_core, append_info
-from parsing.utils import cost_process
+from parsing.utils import reward_engine
 
 parsing_router = APIRouter(tags=['Service-Parsing'])
 
@@ -105,6 +108,7 @@ async def update_parsing_item(origin: int, data: ProductOriginUpdate,
     if product_origin.title != data.title:
         product_origin.title = data.title
         await session.commit()
+        await sync_catalog(session, origins=[product_origin.origin])
         return {"updated": data.title}
 
 
@@ -119,6 +123,7 @@ async def delete_parsing_items(origins: list[int], session: AsyncSession = Depen
     stmt = update(ProductOrigin).where(ProductOrigin.origin.in_(result)).values(is_deleted=True)
     await session.execute(stmt)
     await session.commit()
+    await sync_catalog(session, origins=result)
 
 
 @parsing_router.post("/delete_from_parsing_line")
@@ -136,15 +141,16 @@ async def delete_from_parsing_line(payload: ParsingLineClearItemsRequest,
 
 
 @parsing_router.get("/get_parsing_items_dependency_list/{origin}")
-async def get_parsing_items_dependency_list(origin: int, session: AsyncSession = Depends(db.scoped_session_dependency)):
+async def get_parsing_items_dependency_list(origin: int,
+                                            session: AsyncSession = Depends(db.scoped_session_dependency),
+                                            client_session: ClientSession = Depends(get_dtube_session)):
     stmt = select(ProductOrigin.title).where(ProductOrigin.origin == origin)
     result = await session.execute(stmt)
     item = result.scalar_one_or_none()
     if not item:
         raise HTTPException(status_code=404, detail="origin не найден")
     await session.close()
-    async with ClientSession() as client_session:
-        data = await get_items_by_params(client_session, item)
+    data = await get_items_by_params(client_session, item)
     return {"items": data or []}
 
 
@@ -178,16 +184,17 @@ async def update_parsing_item_dependency(
     except SQLAlchemyError:
         await session.rollback()
         raise HTTPException(status_code=500, detail="Ошибка при сохранении зависимостей")
+    await sync_catalog(session, origins=[item["origin"] for item in success])
+    await cache_events.emit(session, feature_changed(*(item["model_id"] for item in success)))
     return {"success": success, "errors": errors}
 
 
 @parsing_router.get("/load_dependency_details/{title}", response_model=ProductResponse)
-async def load_dependency_by_title(title: str):
-    async with ClientSession() as session:
-        data = await get_one_by_dtube(session, title=title)
-        if not data:
-            return JSONResponse(status_code=404, content={"detail": "Dependency not found"})
-        return JSONResponse(content=data, media_type="application/json; charset=utf-8")
+async def load_dependency_by_title(title: str, client_session: ClientSession = Depends(get_dtube_session)):
+    data = await get_one_by_dtube(client_session, title=title)
+    if not data:
+        return JSONResponse(status_code=404, content={"detail": "Dependency not found"})
+    return JSONResponse(content=data, media_type="application/json; charset=utf-8")
 
 
 @parsing_router.post("/recalculate_output_prices", response_model=ParsingResultOut)
@@ -198,9 +205,10 @@ async def recalculate_reward(recalc_req: RecalcPricesRequest, deps: AppDependenc
     ranges: RewardRangeResponseSchema = await get_rr_obj(session=deps.session, range_id=recalc_req.range_id)
     stmt = select(ParsingLine).where(ParsingLine.vsl_id == vsl.id)
     lines = await deps.session.execute(stmt)
+    engine = reward_engine(ranges.ranges)
     for line in lines.scalars().all():
         inp = line.input_price or 0
-        line.output_price = cost_process(inp, ranges.ranges)
+        line.output_price = engine.apply(inp)
         line.profit_range_id = recalc_req.range_id
     await deps.session.commit()
     parsed_lines: List[ParsingLinesIn] = await get_parsing_result(session=deps.session, vsl_id=recalc_req.vsl_id)
@@ -255,6 +263,7 @@ async def upload_image_to_origin(
     new_img = ProductImage(origin_id=product.origin, key=filename, source_url=None, is_preview=is_preview)
     session.add(new_img)
     await session.commit()
+    await sync_catalog(session, origins=[product.origin])
     await session.refresh(product)
 
     payload = await generate_final_image_payload(product, s3_client, bucket, prefix)
@@ -338,6 +347,7 @@ async def upload_images_to_origin(
         await session.commit()
         await session.refresh(product)
 
+    await sync_catalog(session, origins=[product.origin])
     payload = await generate_final_image_payload(product, s3_client, bucket, prefix)
 
     return {
@@ -386,6 +396,7 @@ async def delete_image(
                 product.preview = img.source_url if img.source_url else None
                 break
     await session.commit()
+    await sync_catalog(session, origins=[origin])
     payload = await generate_final_image_payload(product, s3_client, bucket, prefix)
     return {"origin": origin, "preview": payload["preview"], "images": payload["images"]}
 
@@ -414,6 +425,7 @@ async def set_preview_image(origin: int, filename: str,
     target_image.is_preview = True
 
     await session.commit()
+    await sync_catalog(session, origins=[origin])
 
     payload = await generate_final_image_payload(
         product, s3_client, settings.s3.bucket_name, f"{settings.s3.s3_hub_prefix}/{origin}/")
@@ -445,6 +457,7 @@ async def clear_product_media(payload: OriginsList, session: AsyncSession = Depe
 async def clear_features_dependencies_endpoint(payload: OriginsPayload,
                                                session: AsyncSession = Depends(db.scoped_session_dependency)):
     deleted = await clear_features_dependencies(session, payload.origins)
+    await sync_catalog(session, origins=deleted)
     return {"deleted": deleted}
 
 
@@ -456,6 +469,7 @@ async def add_attributes_values(payload: AddAttributesValuesRequest,
         origin_obj = await session.get(ProductOrigin, payload.origin)
         if origin_obj: origin_obj.title = payload.title
         await session.commit()
+        await sync_catalog(session, origins=[payload.origin])
         return {"status": True, "origin": payload.origin, "values": payload.values}
     return added
 
@@ -5,8 +5,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from api_service.api_connect import update_product_from_dtube
 from api_service.modulars.product.service import ProductService
-from api_service.s3_helper import get_http_client_session
+from http_pool import get_dtube_session
 from api_service.schemas import TypeModel, UpdateProductFromDTPayload, BrandModel, BrandsBulkList
+from cache.events import cache_events, feature_changed
 from engine import db
 from models import ProductFeaturesGlobal
 
@@ -25,7 +26,7 @@ async def fetch_brands(session: AsyncSession = Depends(db.scoped_session_depende
 
 @product_router.post("/update_product_from_dt")
 async def update_product_from_dt(payload: UpdateProductFromDTPayload,
-                                 cl_session: ClientSession = Depends(get_http_client_session),
+                                 cl_session: ClientSession = Depends(get_dtube_session),
                                  session: AsyncSession = Depends(db.scoped_session_dependency)):
     dtube_data = await update_product_from_dtube(payload, cl_session)
 
@@ -44,6 +45,7 @@ async def update_product_from_dt(payload: UpdateProductFromDTPayload,
 
     await session.commit()
     await session.refresh(product)
+    await cache_events.emit(session, feature_changed(product.id))
 
     return {"updated": True,
             "id": product.id,
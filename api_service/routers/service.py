@@ -1,13 +1,23 @@
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from api_service.schemas import ServiceImageResponse, ServiceImageCreate, ServiceImageUpdate
 from api_service.s3_helper import get_url_from_s3
 from api_service.crud.main import fetch_utils_images, check_service_image
+from api_service.api_connect import dtube_token_provider
+from api_service.dtube_health import dtube_breaker
+from api_service.modulars.outbox.service import outbox_dispatcher
+from api_service.modulars.cache_warmer.service import cache_warmup
+from api_service.modulars.catalog.crud import rebuild_catalog
+from api_v3.logic import menu_index
+from cache import get_cache_manager, get_cache_janitor, cache_metrics
 from config import settings
 from engine import db
+from http_pool import http_pool
+from parsing.browser import browser_pool
 from models import ServiceImage
 
 utils_router = APIRouter(tags=['Service-Utils'])
@@ -72,3 +82,92 @@ async def delete_service_image_endpoint(item_id: int, session: AsyncSession = De
     await session.delete(item)
     await session.commit()
     return {'response': True}
+
+
+@utils_router.get("/http_pool_stats")
+async def http_pool_stats():
+    return http_pool.stats()
+
+
+@utils_router.get("/dtube_token_stats")
+async def dtube_token_stats():
+    return dtube_token_provider.stats()
+
+
+@utils_router.get("/browser_pool_stats")
+async def browser_pool_stats():
+    return browser_pool.stats()
+
+
+@utils_router.get("/dtube_health")
+async def dtube_health():
+    return dtube_breaker.stats()
+
+
+@utils_router.get("/dtube_outbox_stats")
+async def dtube_outbox_stats():
+    return await outbox_dispatcher.stats()
+
+
+@utils_router.post("/dtube_outbox_requeue")
+async def dtube_outbox_requeue(feature_title: str | None = None):
+    return {"requeued": await outbox_dispatcher.requeue(feature_title)}
+
+
+@utils_router.get("/cache_stats")
+async def cache_stats():
+    janitor = get_cache_janitor()
+    return {**get_cache_manager().stats(), "janitor": janitor.stats() if janitor is not None else None}
+
+
+@utils_router.post("/cache_invalidate/{domain}")
+async def cache_invalidate(domain: str):
+    return {"domain": domain, "generation": await get_cache_manager().invalidate(domain)}
+
+
+@utils_router.get("/cache_metrics")
+async def cache_metrics_summary():
+    return cache_metrics.stats()
+
+
+@utils_router.get("/cache_metrics/prometheus", response_class=PlainTextResponse)
+async def cache_metrics_prometheus():
+    manager = get_cache_manager().stats()
+    local = manager.get("local") or {}
+    extra = {"cache_l1_size": local.get("size", 0),
+             "cache_inflight": manager["single_flight"]["inflight"],
+             "cache_refreshing": manager["swr"]["refreshing"]}
+    return PlainTextResponse(cache_metrics.render_prometheus(extra),
+                             media_type="text/plain; version=0.0.4")
+
+
+@utils_router.get("/cache_top_keys")
+async def cache_top_keys(by: str = Query("traffic", pattern="^(traffic|size)$"), limit: int = Query(20, ge=1, le=500)):
+    return cache_metrics.top_keys(by=by, limit=limit)
+
+
+@utils_router.post("/cache_metrics/reset")
+async def cache_metrics_reset():
+    cache_metrics.reset()
+    return {"status": "ok"}
+
+
+@utils_router.post("/cache_warm")
+async def cache_warm():
+    cache_warmup.schedule()
+    return cache_warmup.status()
+
+
+@utils_router.get("/cache_warm_status")
+async def cache_warm_status():
+    return cache_warmup.status()
+
+
+@utils_router.post("/catalog_rebuild")
+async def catalog_rebuild(session: AsyncSession = Depends(db.scoped_session_dependency)):
+    return {"rows": await rebuild_catalog(session)}
+
+
+@utils_router.get("/menu_index_stats")
+async def menu_index_stats():
+    return menu_index.stats()
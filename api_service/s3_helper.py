@@ -6,7 +6,7 @@ from asyncio import gather, create_task
 from typing import List, Dict, Any, AsyncGenerator, Union
 from urllib.parse import urlparse
 from aiobotocore.client import AioBaseClient
-from aiohttp import ClientSession, ClientConnectionError, ClientResponseError, ClientTimeout, ClientError
+from aiohttp import ClientSession, ClientConnectionError, ClientResponseError, ClientError
 from botocore.config import Config
 from botocore.exceptions import ClientError, BotoCoreError, ParamValidationError
 from fastapi import HTTPException
@@ -15,8 +15,10 @@ from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from api_service.modulars.catalog.crud import sync_catalog
 from api_service.schemas import ParsingLinesIn, ImageWithPreview
 from config import settings
+from http_pool import get_s3_session
 from models import ProductOrigin, ProductImage
 
 ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif", ".bmp", ".tiff", ".tif", ".svg"}
@@ -32,10 +34,8 @@ async def get_s3_client() -> AsyncGenerator[AioBaseClient, None]:
         yield client
 
 
-async def get_http_client_session():
-    timeout = ClientTimeout(total=30)
-    async with ClientSession(timeout=timeout) as session:
-        yield session
+async def get_http_client_session() -> ClientSession:
+    return get_s3_session()
 
 
 async def fetch_images_grouped(session: AsyncSession,
@@ -204,6 +204,7 @@ async def sync_images_from_pics(
 
     session.add(product)
     await session.commit()
+    await sync_catalog(session, origins=[product.origin])
 
     keys = set()
     for img in product.images:
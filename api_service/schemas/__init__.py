@@ -45,7 +45,8 @@ from api_service.schemas.formula import FormulaBase, FormulaCreate, FormulaUpdat
 from api_service.schemas.features_schemas import FeaturesDataSet, SetFeaturesHubLevelRequest, SetLevelRoutesResponse, \
     FeaturesElement, FeatureResponseScheme, ProsConsItem, ProsConsItemUpdate, FeatureCategory, \
     UpdateFeatureCategoryRequest, InnerRowRequest, UpdateInnerRowRequest, FeatureIds, TypesAndBrands, \
-    CreateFeaturesGlobal, SetFeaturesFormulaRequest, SetFormulaResponse, InsertBulkParams, FeatureBulkResponseScheme
+    CreateFeaturesGlobal, SetFeaturesFormulaRequest, SetFormulaResponse, InsertBulkParams, FeatureBulkResponseScheme, \
+    FeatureRowOperation, FeatureRowsBatchRequest, FeatureRowOperationResult, FeatureRowsBatchResponse
 
 from api_service.schemas.analytics_schemas import ProductTypeWeightRuleSchema, ProductTypeWeightRuleCreate, \
     ProductTypeWeightRuleDelete, ProductTypeWeightRuleUpdate, ProductTypeWeightRuleSwitch, ProductTypeValueMapScheme, \
@@ -108,7 +109,8 @@ __all__ += ["FeaturesDataSet", "PathRoutes", "SetFeaturesHubLevelRequest", "SetL
             "FeatureResponseScheme", "ProsConsItem", "ProsConsItemUpdate", "FeatureCategory",
             "UpdateFeatureCategoryRequest", "InnerRowRequest", "UpdateInnerRowRequest", "FeatureIds", "TypesAndBrands",
             "CreateFeaturesGlobal", "SetFeaturesFormulaRequest", "SetFormulaResponse", "InsertBulkParams",
-            "FeatureBulkResponseScheme"]
+            "FeatureBulkResponseScheme", "FeatureRowOperation", "FeatureRowsBatchRequest", "FeatureRowOperationResult",
+            "FeatureRowsBatchResponse"]
 
 __all__ += ["ProductTypeWeightRuleSchema", "ProductTypeWeightRuleCreate", "ProductTypeWeightRuleDelete",
             "ProductTypeWeightRuleUpdate", "ProductTypeWeightRuleSwitch", "ProductTypeValueMapScheme",
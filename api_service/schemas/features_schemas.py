@@ -131,3 +131,34 @@ class FeatureCategoryScheme(BaseModel):
 class FeatureProductScheme(BaseModel):
     features_id: int
     features: List[FeatureCategoryScheme]
+
+
+class FeatureRowOperation(BaseModel):
+    op: Literal["add_inner_row", "update_inner_row", "delete_inner_row",
+                "add_pros_cons", "update_pros_cons", "delete_pros_cons"]
+    category_title: Optional[str] = None
+    new_param: Optional[str] = None
+    new_value: Optional[str] = None
+    old_param: Optional[str] = None
+    old_value: Optional[str] = None
+    attribute: Optional[Literal["advantage", "disadvantage"]] = None
+    value: Optional[str] = None
+
+
+class FeatureRowsBatchRequest(BaseModel):
+    id: int
+    operations: List[FeatureRowOperation]
+
+
+class FeatureRowOperationResult(BaseModel):
+    index: int
+    op: str
+    status: bool
+    detail: Optional[str] = None
+
+
+class FeatureRowsBatchResponse(BaseModel):
+    id: int
+    results: List[FeatureRowOperationResult]
+    info: list
+    pros_cons: dict | None = None
@@ -1,59 +1,47 @@
-from sqlalchemy import RowMapping, select, func, case
+from sqlalchemy import RowMapping, select, tuple_, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from models import HUbStock, ProductOrigin, ProductImage, ProductFeaturesLink, ProductFeaturesGlobal, AttributeValue, \
+from api_v3.cursor import ProductCursor
+from models import CatalogItem, ProductOrigin, ProductFeaturesLink, ProductFeaturesGlobal, AttributeValue, \
     AttributeOriginValue, AttributeKey
 
 
-async def fetch_products_cursor_paginated(session: AsyncSession, path_ids: list[int],
-                                          cursor: int | None, limit: int) -> list[RowMapping]:
-    base = (select(HUbStock.id,
-                   HUbStock.origin,
-                   HUbStock.warranty,
-                   HUbStock.output_price,
-                   ProductOrigin.title,
-                   ProductFeaturesGlobal.id.label("feature_id"),
-                   ProductFeaturesGlobal.title.label("model"))
-            .join(ProductOrigin, ProductOrigin.origin == HUbStock.origin)
-            .outerjoin(ProductFeaturesLink, ProductFeaturesLink.origin == ProductOrigin.origin)
-            .outerjoin(ProductFeaturesGlobal, ProductFeaturesGlobal.id == ProductFeaturesLink.feature_id)
-            .where(HUbStock.path_id.in_(path_ids), ProductOrigin.is_deleted.is_(False)))
+def apply_product_keyset(stmt, sort: str, cursor: ProductCursor | None):
+    price, stock_id = CatalogItem.output_price, CatalogItem.stock_id
+    if sort == "newest":
+        if cursor is not None:
+            stmt = stmt.where(stock_id < cursor.id)
+        return stmt.order_by(stock_id.desc())
 
+    descending = sort == "price_desc"
     if cursor is not None:
-        base = base.where(HUbStock.id < cursor)
-
-    base = base.order_by(HUbStock.id.desc()).limit(limit)
-    base_rows = (await session.execute(base)).mappings().all()
-
-    if not base_rows:
-        return []
-
-    origins = [row["origin"] for row in base_rows]
-
-    pics_stmt = (select(ProductImage.origin_id, func.array_agg(ProductImage.key)
-                        .filter(ProductImage.key.isnot(None))
-                        .label("pics"),
-                        func.max(case((ProductImage.is_preview.is_(True), ProductImage.key))).label("preview"),
-                        )
-                 .where(ProductImage.origin_id.in_(origins))
-                 .group_by(ProductImage.origin_id)
-                 )
-    pics_map = {row["origin_id"]: row for row in (await session.execute(pics_stmt)).mappings().all()}
-
-    result = list()
-    for row in base_rows:
-        origin = row["origin"]
-
-        pics_info = pics_map.get(origin, {})
-
-        result.append({
-            **row, "pics": pics_info.get("pics", []), "preview": pics_info.get("preview")
-        })
-
-    result.sort(key=lambda x: x["output_price"] if x["output_price"] is not None else float("inf"))
-
-    return result
+        if cursor.price is None:
+            stmt = stmt.where(price.is_(None), stock_id < cursor.id if descending else stock_id > cursor.id)
+        else:
+            key, after = tuple_(price, stock_id), tuple_(cursor.price, cursor.id)
+            stmt = stmt.where(or_(key < after if descending else key > after, price.is_(None)))
+    if descending:
+        return stmt.order_by(price.desc().nulls_last(), stock_id.desc())
+    return stmt.order_by(price.asc().nulls_last(), stock_id.asc())
+
+
+async def fetch_products_cursor_paginated(session: AsyncSession, path_ids: list[int], cursor: ProductCursor | None,
+                                          limit: int, sort: str = "price_asc") -> list[RowMapping]:
+    base = (select(CatalogItem.stock_id.label("id"),
+                   CatalogItem.origin,
+                   CatalogItem.warranty,
+                   CatalogItem.output_price,
+                   CatalogItem.title,
+                   CatalogItem.feature_id,
+                   CatalogItem.model,
+                   CatalogItem.pics,
+                   CatalogItem.preview)
+            .where(CatalogItem.path_id.in_(path_ids)))
+
+    base = apply_product_keyset(base, sort, cursor).limit(limit + 1)
+    rows = (await session.execute(base)).mappings().all()
+    return [{**row, "pics": row["pics"] or []} for row in rows]
 
 
 async def get_product_full(session, origin: int):
@@ -74,6 +62,36 @@ async def get_product_full(session, origin: int):
     return product_origin
 
 
+async def get_products_full(session, origins: list[int]) -> list[ProductOrigin]:
+    result = await session.execute(
+        select(ProductOrigin)
+        .where(ProductOrigin.origin.in_(origins))
+        .options(
+            selectinload(ProductOrigin.stocks),
+            selectinload(ProductOrigin.features),
+            selectinload(ProductOrigin.images),
+            selectinload(ProductOrigin.attribute_values)
+            .selectinload(AttributeOriginValue.attr_value)
+            .selectinload(AttributeValue.attr_key),
+        )
+    )
+    return list(result.scalars().all())
+
+
+async def get_features_with_type_brand(session, feature_ids: list[int]) -> list[ProductFeaturesGlobal]:
+    if not feature_ids:
+        return []
+    result = await session.execute(
+        select(ProductFeaturesGlobal)
+        .where(ProductFeaturesGlobal.id.in_(feature_ids))
+        .options(
+            selectinload(ProductFeaturesGlobal.type),
+            selectinload(ProductFeaturesGlobal.brand),
+        )
+    )
+    return list(result.scalars().all())
+
+
 async def get_feature_with_type_brand(session, feature_id: int):
     result = await session.execute(
         select(ProductFeaturesGlobal)
@@ -85,7 +103,3 @@ async def get_feature_with_type_brand(session, feature_id: int):
     )
     return result.scalar_one_or_none()
 
-
-async def get_menu_level(session, level_id: int):
-    from models import HUbMenuLevel
-    return await session.scalar(select(HUbMenuLevel).where(HUbMenuLevel.id == level_id))
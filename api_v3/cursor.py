@@ -0,0 +1,42 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from typing import Literal, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import RowMapping
+
+ProductSort = Literal["price_asc", "price_desc", "newest"]
+
+
+@dataclass(frozen=True)
+class ProductCursor:
+    sort: str
+    id: int
+    price: Optional[float] = None
+
+
+def encode_cursor(sort: str, row: RowMapping) -> str:
+    payload = {"s": sort, "i": row["id"]}
+    if sort != "newest":
+        payload["p"] = row["output_price"]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(token: Optional[str], sort: str) -> Optional[ProductCursor]:
+    if not token:
+        return None
+    if token.isdigit() and sort == "newest":
+        return ProductCursor(sort=sort, id=int(token))
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+        cursor = ProductCursor(sort=payload["s"], id=int(payload["i"]),
+                               price=float(payload["p"]) if payload.get("p") is not None else None)
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail="Некорректный курсор")
+    if cursor.sort != sort:
+        raise HTTPException(status_code=400, detail="Курсор не соответствует сортировке")
+    return cursor
@@ -1,7 +1,6 @@
-from typing import List, Dict, Set
+from typing import List, Dict
 
-from fastapi import HTTPException
-from sqlalchemy import select, RowMapping
+from sqlalchemy import RowMapping
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from api_miniapp.crud import fetch_hub_levels
@@ -9,85 +8,34 @@ from api_service.s3_helper import get_url_from_s3
 from api_service.schemas import HubLevelPath, AttributeKeyValueSchema, AttributeKey, BrandModel, TypeModel
 from api_service.schemas.features_schemas import FeatureInnerRow, FeatureCategoryScheme, FeatureProductScheme
 
-from api_v3.crud import get_menu_level, get_feature_with_type_brand
-from api_v3.schemas import HubLevelSchemeV3
-from cache import CacheManager
+from api_v3.crud import get_feature_with_type_brand, get_products_full, get_features_with_type_brand
+from api_v3.cursor import encode_cursor
+from api_v3.menu_index import MenuTreeIndexHolder
+from api_v3.schemas import HubLevelSchemeV3, ProductV3Response
+from cache import CacheManager, get_cache_manager
 from cache.keys.features import feature_key
-from cache.keys.hub import MENU_LEVELS
+from cache.keys.hub import menu_levels_key
 from cache.settings import cache_ttl
-from models import HUbMenuLevel
+from engine import db
 
 
-async def load_menu_tree(session: AsyncSession) -> Dict[int, List[int]]:
-    stmt = select(HUbMenuLevel.id, HUbMenuLevel.parent_id)
-    rows = (await session.execute(stmt)).all()
-
-    tree: Dict[int, List[int]] = {}
-
-    for row in rows:
-        node_id = row.id
-        parent_id = row.parent_id
-
-        if parent_id not in tree:
-            tree[parent_id] = []
-
-        tree[parent_id].append(node_id)
-
-    return tree
-
-
-def collect_descendants(tree: Dict[int, List[int]], node_id: int, result: Set[int]):
-    result.add(node_id)
-    if node_id not in tree:
-        return
-    for child in tree[node_id]:
-        collect_descendants(tree, child, result)
-
-
-async def resolve_menu_levels_to_path_ids(selected_levels: List[int], session: AsyncSession) -> List[int]:
+async def resolve_menu_levels_to_path_ids(selected_levels: List[int]) -> List[int]:
     if not selected_levels:
         return []
+    index = await menu_index.get()
+    return index.descendants_of(selected_levels)
 
-    tree = await load_menu_tree(session)
-
-    result: Set[int] = set()
-
-    for level_id in selected_levels:
-        collect_descendants(tree, level_id, result)
 
-    return list(result)
+def build_cursor_response(rows: list[RowMapping], limit: int, sort: str):
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = encode_cursor(sort, rows[-1]) if has_more else None
+    return rows, next_cursor, has_more
 
 
-def build_cursor_response(rows: list[RowMapping], limit: int):
-    if not rows:
-        return None, False
-
-    last_id = rows[-1]["id"]
-    has_more = len(rows) == limit
-
-    next_cursor = last_id if has_more else None
-
-    return next_cursor, has_more
-
-
-async def build_route(session, leaf_id: int) -> list[HubLevelPath]:
-    route = list()
-    current = leaf_id
-
-    while True:
-        level = await get_menu_level(session, current)
-        if not level:
-            break
-
-        route.append(HubLevelPath(path_id=level.id, label=level.label))
-
-        if level.parent_id == 0 or level.parent_id == level.id:
-            break
-
-        current = level.parent_id
-
-    route.reverse()
-    return route
+async def build_route(leaf_id: int) -> list[HubLevelPath]:
+    index = await menu_index.get()
+    return index.route(leaf_id)
 
 
 def build_images(origin_obj):
@@ -143,84 +91,99 @@ def build_full_specs(feature):
     return FeatureProductScheme(features_id=feature.id, features=categories)
 
 
-async def build_feature_data(session: AsyncSession, cache: CacheManager, origin_obj):
+async def build_feature_data(cache: CacheManager, origin_obj):
     if not origin_obj.features:
         return None, None, None, None
 
-    pf_link = origin_obj.features[0]
-    feature = await get_feature_with_type_brand(session, pf_link.feature_id)
+    feature_id = origin_obj.features[0].feature_id
+
+    async def load():
+        async with db.tg_session() as card_session:
+            feature = await get_feature_with_type_brand(card_session, feature_id)
+        return build_feature_card(feature) if feature else None
 
-    if not feature:
+    card = await cache.get_or_compute(feature_key(feature_id), load,
+                                      ttl=cache_ttl.product_info, stale_ttl=cache_ttl.stale)
+    if not card:
         return None, None, None, None
 
-    type_obj = TypeModel(id=feature.type.id, type=feature.type.type)
-
-    brand_obj = BrandModel(id=feature.brand.id, brand=feature.brand.brand)
-    key = feature_key(feature.id)
-    cached = await cache.get(key)
-
-    if cached:
-        full_specs_data = cached.get("full_specs")
-        full_specs = (FeatureProductScheme.model_validate(full_specs_data)
-                      if full_specs_data else None)
-        pros_cons = cached.get("pros_cons")
-
-    else:
-        full_specs = build_full_specs(feature)
-        pros_cons = build_pros_cons(feature)
-
-        await cache.set(key,
-                        {"full_specs": full_specs, "pros_cons": pros_cons},
-                        ttl=cache_ttl.product_info)
-
-    return type_obj, brand_obj, full_specs, pros_cons
-
-
-async def resolve_slug_path_to_level(slug_path: List[str], cache: CacheManager,
-                                     session: AsyncSession) -> HubLevelSchemeV3:
-    cached = await cache.get(MENU_LEVELS)
-    if cached is None:
-        levels = await fetch_hub_levels(session)
-        raw_levels = [lvl.model_dump() for lvl in levels]
-        await cache.set(MENU_LEVELS, raw_levels, ttl=cache_ttl.menu)
-        levels_data = raw_levels
-    else:
-        levels_data = cached
-
-    levels = [HubLevelSchemeV3(**item) for item in levels_data]
-
-    if not slug_path:
-        raise HTTPException(status_code=400, detail="Slug path is empty")
-
-    slug_map: Dict[str, List[HubLevelSchemeV3]] = {}
-    id_map: Dict[int, HubLevelSchemeV3] = {}
-
-    for lvl in levels:
-        slug_map.setdefault(lvl.slug, []).append(lvl)
-        id_map[lvl.id] = lvl
-
-    current_level: HubLevelSchemeV3 | None = None
-
-    for index, slug in enumerate(slug_path):
-        candidates = slug_map.get(slug)
-        if not candidates:
-            raise HTTPException(status_code=404, detail=f"Slug '{slug}' not found")
-
-        if index == 0:
-            depth0 = [lvl for lvl in candidates if lvl.depth == 0]
-            depth2 = [lvl for lvl in candidates if lvl.depth == 2]
-
-            if depth0:
-                current_level = depth0[0]
-            elif depth2:
-                current_level = depth2[0]
-            else:
-                raise HTTPException(status_code=400, detail=f"Slug '{slug}' cannot be used as first element")
-        else:
-            next_candidates = [lvl for lvl in candidates if lvl.parent_id == current_level.id]
-            if not next_candidates:
-                raise HTTPException(status_code=404,
-                                    detail=f"Slug '{slug}' does not match parent_id={current_level.id}")
-            current_level = next_candidates[0]
-
-    return current_level
+    return feature_card_parts(card)
+
+
+def build_feature_card(feature) -> dict:
+    specs = build_full_specs(feature)
+    return {"type_obj": {"id": feature.type.id, "type": feature.type.type},
+            "brand_obj": {"id": feature.brand.id, "brand": feature.brand.brand},
+            "full_specs": specs.model_dump() if specs else None,
+            "pros_cons": build_pros_cons(feature)}
+
+
+def feature_card_parts(card: dict):
+    full_specs_data = card.get("full_specs")
+    return (TypeModel.model_validate(card["type_obj"]),
+            BrandModel.model_validate(card["brand_obj"]),
+            FeatureProductScheme.model_validate(full_specs_data) if full_specs_data else None,
+            card.get("pros_cons"))
+
+
+async def build_product_cards(session: AsyncSession, cache: CacheManager,
+                              origins: List[int]) -> Dict[int, ProductV3Response | str]:
+    origin_objs = {obj.origin: obj for obj in await get_products_full(session, origins)}
+    feature_ids = {obj.origin: obj.features[0].feature_id for obj in origin_objs.values() if obj.features}
+    key_map = {feature_key(fid): fid for fid in set(feature_ids.values())}
+
+    async def load(keys: List[str]) -> Dict[str, dict]:
+        features = await get_features_with_type_brand(session, [key_map[key] for key in keys])
+        return {feature_key(feature.id): build_feature_card(feature) for feature in features}
+
+    cards = await cache.mget_or_compute(key_map.keys(), load, ttl=cache_ttl.product_info)
+    index = await menu_index.get()
+
+    result: Dict[int, ProductV3Response | str] = dict()
+    for origin in origins:
+        origin_obj = origin_objs.get(origin)
+        if origin_obj is None:
+            result[origin] = "not_found"
+            continue
+        if not origin_obj.stocks:
+            result[origin] = "no_stock"
+            continue
+        hub_stock = origin_obj.stocks[0]
+        card = cards.get(feature_key(feature_ids[origin])) if origin in feature_ids else None
+        type_obj, brand_obj, full_specs, pros_cons = feature_card_parts(card) if card else (None, None, None, None)
+        pics, preview = build_images(origin_obj)
+        result[origin] = ProductV3Response(
+            id=hub_stock.id,
+            origin=origin_obj.origin,
+            route=index.route(hub_stock.path_id),
+            warranty=hub_stock.warranty,
+            output_price=hub_stock.output_price,
+            title=origin_obj.title,
+            updated_at=hub_stock.updated_at,
+            type_obj=type_obj,
+            brand_obj=brand_obj,
+            attrs=build_attrs(origin_obj) or [],
+            pics=pics or [],
+            preview=preview,
+            pros_cons=pros_cons,
+            full_specs=full_specs,
+            duration=0)
+    return result
+
+
+async def load_menu_levels() -> List[dict]:
+    async with db.tg_session() as session:
+        return [lvl.model_dump() for lvl in await fetch_hub_levels(session)]
+
+
+async def cached_menu_levels(cache: CacheManager) -> List[dict]:
+    return await cache.get_or_compute(menu_levels_key(), load_menu_levels, ttl=cache_ttl.menu,
+                                      stale_ttl=cache_ttl.stale, early_refresh=True)
+
+
+async def resolve_slug_path_to_level(slug_path: List[str]) -> HubLevelSchemeV3:
+    index = await menu_index.get()
+    return index.resolve_slug_path(slug_path)
+
+
+menu_index = MenuTreeIndexHolder(lambda: cached_menu_levels(get_cache_manager()), max_age=cache_ttl.menu)
@@ -0,0 +1,144 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from api_service.schemas import HubLevelPath
+from api_v3.schemas import HubLevelSchemeV3
+from cache.keys.namespaces import namespace_versions
+from engine import db
+from models import HUbMenuLevel
+
+
+class MenuTreeIndex:
+    def __init__(self, version: int, rows: Iterable[Tuple[int, int, str]], levels: Iterable[HubLevelSchemeV3]):
+        self.version = version
+        self.built_at = time.monotonic()
+        self.parents: Dict[int, int] = dict()
+        self.labels: Dict[int, str] = dict()
+        self.children: Dict[int, List[int]] = dict()
+        for node_id, parent_id, label in rows:
+            self.parents[node_id] = parent_id
+            self.labels[node_id] = label
+            self.children.setdefault(parent_id, []).append(node_id)
+        self.descendants: Dict[int, FrozenSet[int]] = self._build_descendants()
+        self.routes: Dict[int, Tuple[HubLevelPath, ...]] = {node_id: self._build_route(node_id)
+                                                            for node_id in self.parents}
+        self.levels: Dict[int, HubLevelSchemeV3] = dict()
+        self.slugs = set()
+        self.roots: Dict[str, HubLevelSchemeV3] = dict()
+        self.by_parent_slug: Dict[Tuple[int, str], HubLevelSchemeV3] = dict()
+        for level in levels:
+            self.levels[level.id] = level
+            self.slugs.add(level.slug)
+            self.by_parent_slug.setdefault((level.parent_id, level.slug), level)
+            if level.depth in (0, 2):
+                current = self.roots.get(level.slug)
+                if current is None or (current.depth == 2 and level.depth == 0):
+                    self.roots[level.slug] = level
+
+    def _build_descendants(self) -> Dict[int, FrozenSet[int]]:
+        result: Dict[int, FrozenSet[int]] = dict()
+        for root in self.parents:
+            if root in result:
+                continue
+            stack: List[Tuple[int, bool]] = [(root, False)]
+            while stack:
+                node_id, expanded = stack.pop()
+                if node_id in result:
+                    continue
+                children = [child for child in self.children.get(node_id, ()) if child != node_id]
+                if expanded:
+                    collected = {node_id}
+                    for child in children:
+                        collected |= result.get(child, frozenset((child,)))
+                    result[node_id] = frozenset(collected)
+                    continue
+                stack.append((node_id, True))
+                stack.extend((child, False) for child in children if child not in result)
+        return result
+
+    def _build_route(self, leaf_id: int) -> Tuple[HubLevelPath, ...]:
+        route = list()
+        seen = set()
+        current = leaf_id
+        while current in self.parents and current not in seen:
+            seen.add(current)
+            route.append(HubLevelPath(path_id=current, label=self.labels[current]))
+            parent_id = self.parents[current]
+            if parent_id == 0 or parent_id == current:
+                break
+            current = parent_id
+        route.reverse()
+        return tuple(route)
+
+    def descendants_of(self, level_ids: Iterable[int]) -> List[int]:
+        result = set()
+        for level_id in level_ids:
+            result |= self.descendants.get(level_id, frozenset((level_id,)))
+        return list(result)
+
+    def route(self, leaf_id: int) -> List[HubLevelPath]:
+        return list(self.routes.get(leaf_id, ()))
+
+    def resolve_slug_path(self, slug_path: List[str]) -> HubLevelSchemeV3:
+        if not slug_path:
+            raise HTTPException(status_code=400, detail="Slug path is empty")
+
+        current_level = self.roots.get(slug_path[0])
+        if current_level is None:
+            if slug_path[0] in self.slugs:
+                raise HTTPException(status_code=400,
+                                    detail=f"Slug '{slug_path[0]}' cannot be used as first element")
+            raise HTTPException(status_code=404, detail=f"Slug '{slug_path[0]}' not found")
+
+        for slug in slug_path[1:]:
+            next_level = self.by_parent_slug.get((current_level.id, slug))
+            if next_level is None:
+                if slug not in self.slugs:
+                    raise HTTPException(status_code=404, detail=f"Slug '{slug}' not found")
+                raise HTTPException(status_code=404,
+                                    detail=f"Slug '{slug}' does not match parent_id={current_level.id}")
+            current_level = next_level
+        return current_level
+
+    def stats(self) -> dict:
+        return {"version": self.version,
+                "nodes": len(self.parents),
+                "storefront_levels": len(self.levels),
+                "age": round(time.monotonic() - self.built_at, 1)}
+
+
+class MenuTreeIndexHolder:
+    def __init__(self, levels_loader: Callable[[], Awaitable[List[dict]]], max_age: int):
+        self.levels_loader = levels_loader
+        self.max_age = max_age
+        self.builds = 0
+        self._index: Optional[MenuTreeIndex] = None
+        self._lock = asyncio.Lock()
+
+    def _fresh(self, index: Optional[MenuTreeIndex]) -> bool:
+        return index is not None and index.version == namespace_versions.generation("menu") \
+            and time.monotonic() - index.built_at < self.max_age
+
+    async def get(self) -> MenuTreeIndex:
+        if self._fresh(self._index):
+            return self._index
+        async with self._lock:
+            if not self._fresh(self._index):
+                self._index = await self.build()
+        return self._index
+
+    async def build(self) -> MenuTreeIndex:
+        version = namespace_versions.generation("menu")
+        async with db.tg_session() as session:
+            result = await session.execute(select(HUbMenuLevel.id, HUbMenuLevel.parent_id, HUbMenuLevel.label))
+            rows = result.all()
+        levels = [HubLevelSchemeV3(**item) for item in await self.levels_loader()]
+        self.builds += 1
+        return MenuTreeIndex(version, rows, levels)
+
+    def stats(self) -> dict:
+        return {"builds": self.builds, "index": self._index.stats() if self._index is not None else None}
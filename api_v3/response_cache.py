@@ -0,0 +1,66 @@
+import hashlib
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+from api_v3.filters import generate_filters_hash
+from cache import CacheManager
+from cache.keys.base import build_key
+from cache.keys.namespaces import namespace_versions
+from cache.settings import cache_response
+
+VERSIONED_NAMESPACES = ("menu", "catalog", "responses")
+TIMING_FIELDS = ("duration_ms", "duration")
+
+
+def catalog_data_version() -> str:
+    return ".".join(str(namespace_versions.generation(domain)) for domain in VERSIONED_NAMESPACES)
+
+
+def response_key(route: str, params: Dict[str, Any]) -> str:
+    return build_key("responses", route, catalog_data_version(), generate_filters_hash(params))
+
+
+def cache_control_header() -> str:
+    return (f"public, max-age={cache_response.max_age}, s-maxage={cache_response.s_maxage}, "
+            f"stale-while-revalidate={cache_response.stale_while_revalidate}")
+
+
+def stable_json(model: BaseModel) -> bytes:
+    timings = {field: 0 for field in TIMING_FIELDS if field in type(model).model_fields}
+    return (model.model_copy(update=timings) if timings else model).model_dump_json().encode("utf-8")
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+async def cached_body(cache: CacheManager, route: str, params: Dict[str, Any],
+                      builder: Callable[[], Awaitable[BaseModel | list]]) -> bytes:
+    async def render() -> bytes:
+        result = await builder()
+        if isinstance(result, list):
+            body = b"[" + b",".join(stable_json(item) for item in result) + b"]"
+        else:
+            body = stable_json(result)
+        return f'"{hashlib.sha256(body).hexdigest()[:32]}"'.encode() + b"\n" + body
+
+    return await cache.get_or_compute(response_key(route, params), render, ttl=cache_response.ttl, model=bytes)
+
+
+async def cached_response(request: Request, cache: CacheManager, route: str, params: Dict[str, Any],
+                          builder: Callable[[], Awaitable[BaseModel | list]]) -> Response:
+    started = time.monotonic()
+    entry = await cached_body(cache, route, params, builder)
+    etag, body = entry.split(b"\n", 1)
+    etag = etag.decode()
+    headers = {"ETag": etag, "Cache-Control": cache_control_header(), "Vary": "Accept-Encoding",
+               "Server-Timing": f"app;dur={int((time.monotonic() - started) * 1000)}"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
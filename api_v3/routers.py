@@ -1,56 +1,68 @@
 import time
 from typing import List
 
-from fastapi import APIRouter, Query, Depends, HTTPException
+from fastapi import APIRouter, Query, Depends, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from api_miniapp.crud import fetch_hub_levels
 from api_service.modulars.desc_builder.service import DescBuilder
 
 from api_service.s3_helper import get_url_from_s3
 from api_service.schemas.desc_builder import BlockResponse
 
 from api_v3.crud import fetch_products_cursor_paginated, get_product_full
+from api_v3.cursor import ProductSort, decode_cursor
 from api_v3.logic import resolve_menu_levels_to_path_ids, build_cursor_response, build_route, build_attrs, build_images, \
-    build_feature_data
-from api_v3.schemas import InfiniteProductsResponse, HubProductSchemeExtV3, ProductV3Response, HubLevelSchemeV3
+    build_feature_data, cached_menu_levels, build_product_cards
+from api_v3.response_cache import cached_response
+from api_v3.schemas import InfiniteProductsResponse, HubProductSchemeExtV3, ProductV3Response, HubLevelSchemeV3, \
+    ProductBatchItem, ProductsBatchResponse
 from cache import get_cache_manager, CacheManager
-from cache.keys.hub import MENU_LEVELS
-from cache.settings import cache_ttl
 
 from engine import db
 
 api_v3 = APIRouter(prefix="/api3", tags=["api_v3"])
 
+PRODUCTS_BATCH_LIMIT = 50
+PRODUCTS_PAGE_LIMIT = 24
 
-@api_v3.get("/init_levels", response_model=List[HubLevelSchemeV3])
-async def get_levels(session: AsyncSession = Depends(db.scoped_session_dependency),
-                     cache: CacheManager = Depends(get_cache_manager)):
-    cached = await cache.get(MENU_LEVELS)
-    if cached is not None:
-        return [HubLevelSchemeV3(**item) for item in cached]
 
-    levels = await fetch_hub_levels(session)
-    raw_levels = [item.model_dump() for item in levels]
-    await cache.set(MENU_LEVELS, raw_levels, ttl=cache_ttl.menu)
+@api_v3.get("/init_levels", response_model=List[HubLevelSchemeV3])
+async def get_levels(request: Request, cache: CacheManager = Depends(get_cache_manager)):
+    async def build():
+        levels_data = await cached_menu_levels(cache)
+        return [HubLevelSchemeV3(**item) for item in levels_data]
 
-    return levels
+    return await cached_response(request, cache, "init_levels", {}, build)
 
 
 @api_v3.get("/products",
             response_model=InfiniteProductsResponse,
             description=("Возвращает список товаров, отфильтрованные по уровням меню. "
-                         "Использует курсорную пагинацию, возвращает next_cursor, "
+                         "Использует keyset-пагинацию по (цена, id) с непрозрачным курсором, "
+                         "сортировка: price_asc, price_desc или newest. Возвращает next_cursor, "
                          "флаг has_more, хеш фильтров и время выполнения"))
-async def get_products(cursor: int | None = None,
-                       limit: int = 24,
+async def get_products(request: Request,
+                       cursor: str | None = None,
+                       limit: int = Query(PRODUCTS_PAGE_LIMIT, ge=1, le=200),
+                       sort: ProductSort = "price_asc",
                        menu_levels: List[int] = Query(None),
                        session: AsyncSession = Depends(db.scoped_session_dependency),
                        cache: CacheManager = Depends(get_cache_manager)):
+    return await cached_response(request, cache, "products", products_page_params(cursor, limit, sort, menu_levels),
+                                 lambda: build_products_page(cursor, limit, sort, menu_levels, session, cache))
+
+
+def products_page_params(cursor: str | None, limit: int, sort: str, menu_levels: List[int] | None) -> dict:
+    return {"cursor": cursor, "limit": limit, "sort": sort, "menu_levels": menu_levels}
+
+
+async def build_products_page(cursor: str | None, limit: int, sort: str, menu_levels: List[int] | None,
+                              session: AsyncSession, cache: CacheManager) -> InfiniteProductsResponse:
     start = time.monotonic()
-    path_ids = await resolve_menu_levels_to_path_ids(menu_levels, session)
-    rows = await fetch_products_cursor_paginated(session=session, path_ids=path_ids, cursor=cursor, limit=limit)
-    next_cursor, has_more = build_cursor_response(rows, limit)
+    path_ids = await resolve_menu_levels_to_path_ids(menu_levels)
+    rows = await fetch_products_cursor_paginated(session=session, path_ids=path_ids,
+                                                 cursor=decode_cursor(cursor, sort), limit=limit, sort=sort)
+    rows, next_cursor, has_more = build_cursor_response(rows, limit, sort)
     unique_feature_ids = set()
     for row in rows:
         feature_id = row.get("feature_id")
@@ -84,14 +96,44 @@ async def get_products(cursor: int | None = None,
                                     duration_ms=duration_ms)
 
 
+@api_v3.get("/products/batch",
+            response_model=ProductsBatchResponse,
+            description=("Возвращает карточки товаров по списку origins в порядке запроса. "
+                         "Для отсутствующих товаров возвращается статус not_found или no_stock"))
+async def get_products_batch(origins: List[int] = Query(...),
+                             session: AsyncSession = Depends(db.scoped_session_dependency),
+                             cache: CacheManager = Depends(get_cache_manager)):
+    start = time.monotonic()
+    if len(origins) > PRODUCTS_BATCH_LIMIT:
+        raise HTTPException(422, f"Слишком много origins: максимум {PRODUCTS_BATCH_LIMIT}")
+    cards = await build_product_cards(session, cache, list(dict.fromkeys(origins)))
+    duration_ms = int((time.monotonic() - start) * 1000)
+
+    items: List[ProductBatchItem] = list()
+    for origin in origins:
+        card = cards[origin]
+        if isinstance(card, str):
+            items.append(ProductBatchItem(origin=origin, status=card))
+        else:
+            items.append(ProductBatchItem(origin=origin, status="ok",
+                                          product=card.model_copy(update={"duration": duration_ms})))
+    return ProductsBatchResponse(items=items, duration_ms=duration_ms)
+
+
 @api_v3.get("/product",
             response_model=ProductV3Response,
             description=("Возвращает полную карточку товара по origin: маршрут категории (route), "
                          "базовые данные (цена, гарантия, бренд, тип), атрибуты, изображения, "
                          "а также расширенные характеристики и текстовые преимущества/недостатки, "
                          "если они заданы для модели"))
-async def get_product(origin: int, session: AsyncSession = Depends(db.scoped_session_dependency),
+async def get_product(request: Request, origin: int,
+                      session: AsyncSession = Depends(db.scoped_session_dependency),
                       cache: CacheManager = Depends(get_cache_manager)):
+    return await cached_response(request, cache, "product", {"origin": origin},
+                                 lambda: build_product(origin, session, cache))
+
+
+async def build_product(origin: int, session: AsyncSession, cache: CacheManager) -> ProductV3Response:
     start = time.monotonic()
     origin_obj = await get_product_full(session, origin)
 
@@ -102,8 +144,8 @@ async def get_product(origin: int, session: AsyncSession = Depends(db.scoped_ses
         raise HTTPException(404, "Нет данных о наличии товара")
 
     hub_stock = origin_obj.stocks[0]
-    route = await build_route(session, hub_stock.path_id) or []
-    type_obj, brand_obj, full_specs, pros_cons = await build_feature_data(session, cache, origin_obj)
+    route = await build_route(hub_stock.path_id) or []
+    type_obj, brand_obj, full_specs, pros_cons = await build_feature_data(cache, origin_obj)
     attrs = build_attrs(origin_obj) or []
     pics, preview = build_images(origin_obj)
     pics = pics or []
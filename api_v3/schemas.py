@@ -20,7 +20,7 @@ class HubProductSchemeExtV3(HubProductScheme):
 
 class InfiniteProductsResponse(BaseModel):
     products: list[HubProductSchemeExtV3]
-    next_cursor: int | None = None
+    next_cursor: str | None = None
     has_more: bool
     duration_ms: int
 
@@ -43,6 +43,17 @@ class ProductV3Response(BaseModel):
     duration: int
 
 
+class ProductBatchItem(BaseModel):
+    origin: int
+    status: str
+    product: Optional[ProductV3Response] = None
+
+
+class ProductsBatchResponse(BaseModel):
+    items: List[ProductBatchItem]
+    duration_ms: int
+
+
 class CategoryQuery(BaseModel):
     path: str = Field(..., description="Path like 'smartfony/apple/iphone'")
     page: int = Field(1, ge=1)
@@ -1,12 +1,57 @@
-from fastapi import Depends
+from typing import Optional
 
 from cache.backend import CacheBackend
+from cache.coherence import CacheCoherence
+from cache.janitor import CacheJanitor
+from cache.local import LocalCache
 from cache.serializer import CacheSerializer
 from cache.manager import CacheManager
+from cache.metrics import CacheMetrics
+from cache.settings import cache_local, cache_codec, cache_metrics_settings, cache_janitor
 from config import redis_session
 
+_cache_manager: Optional[CacheManager] = None
+_coherence: Optional[CacheCoherence] = None
+_janitor: Optional[CacheJanitor] = None
+cache_metrics = CacheMetrics(max_keys=cache_metrics_settings.tracked_keys)
 
-def get_cache_manager(redis=Depends(redis_session)) -> CacheManager:
+
+def build_serializer() -> CacheSerializer:
+    return CacheSerializer(compression=cache_codec.compression, threshold=cache_codec.threshold,
+                           level=cache_codec.level)
+
+
+async def start_cache_manager(redis=None) -> CacheManager:
+    global _cache_manager, _coherence, _janitor
+    redis = redis if redis is not None else redis_session()
     backend = CacheBackend(redis)
-    serializer = CacheSerializer()
-    return CacheManager(backend, serializer)
+    local = LocalCache(maxsize=cache_local.maxsize, ttl=cache_local.ttl, on_evict=cache_metrics.evicted)
+    _coherence = CacheCoherence(redis, local)
+    await _coherence.start()
+    _cache_manager = CacheManager(backend, build_serializer(), local=local, coherence=_coherence,
+                                  metrics=cache_metrics)
+    _janitor = CacheJanitor(_cache_manager, backend, interval=cache_janitor.interval, batch=cache_janitor.batch,
+                            pause=cache_janitor.pause)
+    await _janitor.start()
+    return _cache_manager
+
+
+def get_cache_janitor() -> Optional[CacheJanitor]:
+    return _janitor
+
+
+async def stop_cache_manager() -> None:
+    global _coherence, _janitor
+    if _janitor is not None:
+        await _janitor.stop()
+        _janitor = None
+    if _coherence is not None:
+        await _coherence.stop()
+        _coherence = None
+
+
+def get_cache_manager() -> CacheManager:
+    global _cache_manager
+    if _cache_manager is None:
+        _cache_manager = CacheManager(CacheBackend(redis_session()), build_serializer(), metrics=cache_metrics)
+    return _cache_manager
@@ -1,23 +1,29 @@
 from __future__ import annotations
 
+import asyncio
 from typing import Dict, Iterable, Optional
 
 from redis.asyncio import Redis
 
+RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
 
 class CacheBackend:
     def __init__(self, redis: Redis):
         self._redis = redis
 
-    async def get(self, key: str) -> Optional[str]:
+    async def get(self, key: str) -> Optional[bytes]:
         raw = await self._redis.get(key)
-        if raw is None:
-            return None
-        if isinstance(raw, bytes):
-            return raw.decode("utf-8")
+        if isinstance(raw, str):
+            return raw.encode("utf-8")
         return raw
 
-    async def set(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+    async def set(self, key: str, value: bytes, ttl: Optional[int] = None) -> None:
         if ttl is not None and ttl > 0:
             await self._redis.set(key, value, ex=ttl)
         else:
@@ -26,22 +32,34 @@ class CacheBackend:
     async def delete(self, key: str) -> None:
         await self._redis.delete(key)
 
+    async def unlink_many(self, keys: Iterable[str], chunk_size: int = 500) -> int:
+        keys = list(keys)
+        if not keys:
+            return 0
+        pipe = self._redis.pipeline(transaction=False)
+        for i in range(0, len(keys), chunk_size):
+            pipe.unlink(*keys[i:i + chunk_size])
+        removed = await pipe.execute()
+        return sum(removed)
+
+    async def acquire_lock(self, key: str, token: str, ttl_ms: int) -> bool:
+        return bool(await self._redis.set(key, token, nx=True, px=ttl_ms))
+
+    async def release_lock(self, key: str, token: str) -> None:
+        await self._redis.eval(RELEASE_LOCK_SCRIPT, 1, key, token)
+
     async def exists(self, key: str) -> bool:
         return bool(await self._redis.exists(key))
 
-    async def mget(self, keys: Iterable[str]) -> Dict[str, Optional[str]]:
-        raw_values = await self._redis.mget(list(keys))
-        result: Dict[str, Optional[str]] = {}
+    async def mget(self, keys: Iterable[str]) -> Dict[str, Optional[bytes]]:
+        keys = list(keys)
+        raw_values = await self._redis.mget(keys)
+        result: Dict[str, Optional[bytes]] = {}
         for key, raw in zip(keys, raw_values):
-            if raw is None:
-                result[key] = None
-            elif isinstance(raw, bytes):
-                result[key] = raw.decode("utf-8")
-            else:
-                result[key] = raw
+            result[key] = raw.encode("utf-8") if isinstance(raw, str) else raw
         return result
 
-    async def mset(self, mapping: Dict[str, str], ttl: Optional[int] = None) -> None:
+    async def mset(self, mapping: Dict[str, bytes], ttl: Optional[int] = None) -> None:
         if not mapping:
             return
 
@@ -54,12 +72,28 @@ class CacheBackend:
             pipe.execute_command("SET", key, value, "EX", ttl)
         await pipe.execute()
 
-    async def invalidate_prefix(self, prefix: str) -> None:
+    async def load_generations(self, key: str) -> Dict[str, int]:
+        raw = await self._redis.hgetall(key)
+        return {(k.decode() if isinstance(k, bytes) else k): int(v) for k, v in raw.items()}
+
+    async def incr_generation(self, key: str, domain: str) -> int:
+        return int(await self._redis.hincrby(key, domain, 1))
+
+    async def retire(self, retired_key: str, prefix: str) -> None:
+        await self._redis.sadd(retired_key, prefix)
+
+    async def pop_retired(self, retired_key: str) -> Optional[str]:
+        raw = await self._redis.spop(retired_key)
+        return raw.decode() if isinstance(raw, bytes) else raw
+
+    async def unlink_prefix(self, prefix: str, count: int = 500, pause: float = 0.0) -> int:
+        removed = 0
         cursor = 0
-        pattern = f"{prefix}*"
         while True:
-            cursor, keys = await self._redis.scan(cursor=cursor, match=pattern, count=1000)
+            cursor, keys = await self._redis.scan(cursor=cursor, match=f"{prefix}*", count=count)
             if keys:
-                await self._redis.delete(*keys)
+                removed += await self._redis.unlink(*keys)
             if cursor == 0:
-                break
+                return removed
+            if pause:
+                await asyncio.sleep(pause)
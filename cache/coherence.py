@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from typing import Dict, Iterable, Optional
+from uuid import uuid4
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from .keys.base import PROJECT_PREFIX, NAMESPACE_VERSIONS_KEY
+from .keys.namespaces import namespace_versions
+from .local import LocalCache
+
+INVALIDATION_CHANNEL = f"{PROJECT_PREFIX}:cache:invalidate"
+
+
+class CacheCoherence:
+    def __init__(self, redis: Redis, local: LocalCache, channel: str = INVALIDATION_CHANNEL):
+        self._redis = redis
+        self._local = local
+        self.channel = channel
+        self.node_id = uuid4().hex
+        self.sent = 0
+        self.received = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def publish(self, keys: Iterable[str] = (), prefix: Optional[str] = None,
+                      generations: Optional[Dict[str, int]] = None) -> None:
+        message = {"node": self.node_id, "keys": list(keys), "prefix": prefix, "generations": generations}
+        if not message["keys"] and prefix is None and not generations:
+            return
+        try:
+            await self._redis.publish(self.channel, json.dumps(message))
+            self.sent += 1
+        except RedisError as e:
+            logging.warning(f"Cache invalidation publish failed: {e!r}")
+
+    def apply(self, raw: bytes | str) -> None:
+        try:
+            message = json.loads(raw)
+        except (TypeError, ValueError):
+            return
+        if message.get("node") == self.node_id:
+            return
+        self.received += 1
+        if message.get("generations"):
+            namespace_versions.update(message["generations"])
+        self._local.discard(message.get("keys") or ())
+        if message.get("prefix"):
+            self._local.discard_prefix(message["prefix"])
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = self._redis.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                self._local.clear()
+                generations = await self._redis.hgetall(NAMESPACE_VERSIONS_KEY)
+                namespace_versions.update({(k.decode() if isinstance(k, bytes) else k): int(v)
+                                           for k, v in generations.items()})
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self.apply(message.get("data"))
+            except RedisError as e:
+                logging.warning(f"Cache invalidation listener lost connection: {e!r}")
+                self._local.clear()
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
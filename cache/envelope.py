@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from typing import Optional, Tuple
+
+ENVELOPE_MARK = b"\x1eswr:"
+
+
+def wrap(raw: bytes, soft_expires_at: float, delta: float) -> bytes:
+    return ENVELOPE_MARK + f"{soft_expires_at:.3f}:{delta:.4f}\n".encode() + raw
+
+
+def unwrap(raw: Optional[bytes]) -> Tuple[Optional[bytes], Optional[float], float]:
+    if raw is None or not raw.startswith(ENVELOPE_MARK):
+        return raw, None, 0.0
+    header, _, body = raw.partition(b"\n")
+    try:
+        soft, delta = header[len(ENVELOPE_MARK):].split(b":", 1)
+        return body, float(soft), float(delta)
+    except ValueError:
+        return body, None, 0.0
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Iterable, Optional, Set, Tuple
+
+from redis.exceptions import RedisError
+from sqlalchemy import select, or_, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from cache import get_cache_manager
+from cache.keys.features import feature_key, short_specs_key
+from cache.manager import CacheManager
+from models import ProductFeaturesGlobal, SpecsComposer
+
+
+@dataclass(frozen=True)
+class FeatureChanged:
+    feature_ids: Tuple[int, ...]
+
+
+@dataclass(frozen=True)
+class FormulaChanged:
+    formula_id: int
+
+
+@dataclass(frozen=True)
+class SpecPathChanged:
+    formula_id: int
+    source: str
+
+
+@dataclass(frozen=True)
+class ComposerChanged:
+    groups: Tuple[Tuple[int, str], ...]
+
+
+@dataclass(frozen=True)
+class NamespaceChanged:
+    domain: str
+
+
+MENU_CHANGED = NamespaceChanged("menu")
+CATALOG_CHANGED = NamespaceChanged("catalog")
+RESPONSES_CHANGED = NamespaceChanged("responses")
+
+
+def feature_changed(*feature_ids: int) -> FeatureChanged:
+    return FeatureChanged(tuple(fid for fid in feature_ids if fid is not None))
+
+
+class CacheInvalidationBus:
+    def __init__(self, cache: Optional[CacheManager] = None):
+        self._cache = cache
+
+    @property
+    def cache(self) -> CacheManager:
+        return self._cache if self._cache is not None else get_cache_manager()
+
+    @staticmethod
+    async def composer_groups(session: AsyncSession, formula_id: int,
+                              source: Optional[str] = None) -> Set[Tuple[int, str]]:
+        stmt = select(SpecsComposer.type_id, SpecsComposer.source).where(SpecsComposer.formula_id == formula_id)
+        if source is not None:
+            stmt = stmt.where(SpecsComposer.source == source)
+        result = await session.execute(stmt)
+        return {(type_id, src) for type_id, src in result.all()}
+
+    @staticmethod
+    async def group_feature_ids(session: AsyncSession, groups: Iterable[Tuple[int, str]]) -> Set[int]:
+        groups = list(groups)
+        if not groups:
+            return set()
+        condition = or_(*(and_(ProductFeaturesGlobal.type_id == type_id, ProductFeaturesGlobal.source == source)
+                          for type_id, source in groups))
+        result = await session.execute(select(ProductFeaturesGlobal.id).where(condition))
+        return set(result.scalars().all())
+
+    async def resolve_keys(self, session: AsyncSession, events: Iterable[object]) -> Set[str]:
+        keys: Set[str] = set()
+        groups: Set[Tuple[int, str]] = set()
+        for event in events:
+            if isinstance(event, FeatureChanged):
+                for fid in event.feature_ids:
+                    keys.add(feature_key(fid))
+                    keys.add(short_specs_key(fid))
+            elif isinstance(event, FormulaChanged):
+                groups |= await self.composer_groups(session, event.formula_id)
+            elif isinstance(event, SpecPathChanged):
+                groups |= await self.composer_groups(session, event.formula_id, event.source)
+            elif isinstance(event, ComposerChanged):
+                groups |= set(event.groups)
+        for fid in await self.group_feature_ids(session, groups):
+            keys.add(short_specs_key(fid))
+        return keys
+
+    async def emit(self, session: AsyncSession, *events: object) -> int:
+        try:
+            for domain in {event.domain for event in events if isinstance(event, NamespaceChanged)}:
+                await self.cache.invalidate(domain)
+            keys = await self.resolve_keys(session, events)
+            if keys:
+                await self.cache.invalidate(RESPONSES_CHANGED.domain)
+            return await self.cache.delete_many(keys)
+        except RedisError as e:
+            logging.warning(f"Cache invalidation failed for {events}: {e!r}")
+            return 0
+
+
+cache_events = CacheInvalidationBus()
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import time
+from typing import Dict, Optional, Tuple
+
+from fastapi_cache.backends.redis import RedisBackend
+
+from cache.metrics import CacheMetrics
+
+
+class InstrumentedRedisBackend(RedisBackend):
+    def __init__(self, redis, metrics: CacheMetrics):
+        super().__init__(redis)
+        self.metrics = metrics
+        self._misses: Dict[str, float] = dict()
+
+    def _missed(self, key: str) -> None:
+        self.metrics.miss(key)
+        if len(self._misses) >= self.metrics.max_keys:
+            self._misses.clear()
+        self._misses[key] = time.perf_counter()
+
+    async def get_with_ttl(self, key: str) -> Tuple[int, Optional[bytes]]:
+        started = time.perf_counter()
+        try:
+            ttl, value = await super().get_with_ttl(key)
+        except Exception:
+            self.metrics.error(key)
+            raise
+        self.metrics.latency(key, "get", time.perf_counter() - started)
+        if value is None:
+            self._missed(key)
+        else:
+            self.metrics.hit(key, len(value))
+        return ttl, value
+
+    async def get(self, key: str) -> Optional[bytes]:
+        started = time.perf_counter()
+        value = await super().get(key)
+        self.metrics.latency(key, "get", time.perf_counter() - started)
+        if value is None:
+            self._missed(key)
+        else:
+            self.metrics.hit(key, len(value))
+        return value
+
+    async def set(self, key: str, value: bytes, expire: Optional[int] = None) -> None:
+        started = time.perf_counter()
+        try:
+            await super().set(key, value, expire)
+        except Exception:
+            self.metrics.error(key)
+            raise
+        finished = time.perf_counter()
+        self.metrics.latency(key, "set", finished - started)
+        self.metrics.stored(key, len(value))
+        missed_at = self._misses.pop(key, None)
+        if missed_at is not None:
+            self.metrics.computed(key, started - missed_at)
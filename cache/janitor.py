@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Optional
+
+from redis.exceptions import RedisError
+
+from .backend import CacheBackend
+from .keys.base import RETIRED_NAMESPACES_KEY
+from .manager import CacheManager
+
+
+class CacheJanitor:
+    def __init__(self, manager: CacheManager, backend: CacheBackend, interval: float, batch: int, pause: float):
+        self._manager = manager
+        self._backend = backend
+        self.interval = interval
+        self.batch = batch
+        self.pause = pause
+        self.sweeps = 0
+        self.reclaimed = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        try:
+            await self._manager.sync_generations()
+        except RedisError as e:
+            logging.warning(f"Cache generations load failed: {e!r}")
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def sweep(self) -> int:
+        removed = 0
+        while True:
+            prefix = await self._backend.pop_retired(RETIRED_NAMESPACES_KEY)
+            if prefix is None:
+                return removed
+            try:
+                count = await self._backend.unlink_prefix(prefix, count=self.batch, pause=self.pause)
+            except RedisError:
+                await self._backend.retire(RETIRED_NAMESPACES_KEY, prefix)
+                raise
+            removed += count
+            self.sweeps += 1
+            self.reclaimed += count
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self._manager.sync_generations()
+                removed = await self.sweep()
+                if removed:
+                    logging.info(f"Cache janitor reclaimed {removed} keys of retired generations")
+            except RedisError as e:
+                logging.warning(f"Cache janitor failed: {e!r}")
+
+    def stats(self) -> dict:
+        return {"running": self._task is not None and not self._task.done(),
+                "sweeps": self.sweeps,
+                "reclaimed": self.reclaimed}
@@ -1,9 +1,19 @@
-from typing import Any
+from typing import Any, Optional
+
+from cache.keys.namespaces import namespace_versions
 
 PROJECT_PREFIX = "c_webapp"
 CACHE_VERSION = "v3"
+NAMESPACE_VERSIONS_KEY = f"{PROJECT_PREFIX}:{CACHE_VERSION}:ns:generations"
+RETIRED_NAMESPACES_KEY = f"{PROJECT_PREFIX}:{CACHE_VERSION}:ns:retired"
+
+
+def namespace_prefix(domain: str, generation: Optional[int] = None) -> str:
+    if generation is None:
+        generation = namespace_versions.generation(domain)
+    return f"{PROJECT_PREFIX}:{CACHE_VERSION}:{domain}:g{generation}:"
 
 
 def build_key(domain: str, *parts: Any) -> str:
     clean_parts = [str(p) for p in parts if p is not None]
-    return f"{PROJECT_PREFIX}:{CACHE_VERSION}:{domain}:" + ":".join(clean_parts)
+    return namespace_prefix(domain) + ":".join(clean_parts)
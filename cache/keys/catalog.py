@@ -1,2 +1,5 @@
+from cache.keys.base import build_key
+
+
 def catalog_products_key(path: str, filters_hash: str, page: int, limit: int) -> str:
-    return f"catalog:v3:category:{path}:{filters_hash}:page={page}:limit={limit}"
+    return build_key("catalog", "category", path, filters_hash, f"page={page}", f"limit={limit}")
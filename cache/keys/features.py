@@ -6,4 +6,4 @@ def short_specs_key(feature_id: int) -> str:
 
 
 def feature_key(feature_id: int) -> str:
-    return build_key("full_features", feature_id)
+    return build_key("full_features", "card", feature_id)
@@ -1,3 +1,11 @@
+from typing import Iterable
+
 from cache.keys.base import build_key
 
-MENU_LEVELS = build_key("menu", "hub_levels")
+
+def menu_levels_key() -> str:
+    return build_key("menu", "hub_levels")
+
+
+def products_by_path_key(path_ids: Iterable[int]) -> str:
+    return build_key("catalog", "products_by_path", ",".join(map(str, sorted(path_ids))))
@@ -0,0 +1,21 @@
+from typing import Dict, Mapping
+
+
+class NamespaceVersions:
+    def __init__(self):
+        self._generations: Dict[str, int] = dict()
+
+    def generation(self, domain: str) -> int:
+        return self._generations.get(domain, 0)
+
+    def update(self, generations: Mapping[str, int]) -> None:
+        for domain, generation in generations.items():
+            generation = int(generation)
+            if generation > self._generations.get(domain, 0):
+                self._generations[domain] = generation
+
+    def snapshot(self) -> Dict[str, int]:
+        return dict(self._generations)
+
+
+namespace_versions = NamespaceVersions()
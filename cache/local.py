@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+
+class LocalCache:
+    def __init__(self, maxsize: int, ttl: int, on_evict: Optional[Callable[[str], None]] = None):
+        self.maxsize = max(1, maxsize)
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: OrderedDict[str, Tuple[float, bytes]] = OrderedDict()
+
+    def get(self, key: str) -> Optional[bytes]:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, raw = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return raw
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, bytes]:
+        found: Dict[str, bytes] = {}
+        for key in keys:
+            raw = self.get(key)
+            if raw is not None:
+                found[key] = raw
+        return found
+
+    def set(self, key: str, raw: bytes, ttl: Optional[int] = None) -> None:
+        if self.ttl <= 0:
+            return
+        lifetime = self.ttl if ttl is None or ttl <= 0 else min(ttl, self.ttl)
+        self._data[key] = (time.monotonic() + lifetime, raw)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            evicted, _ = self._data.popitem(last=False)
+            self.evictions += 1
+            if self.on_evict is not None:
+                self.on_evict(evicted)
+
+    def discard(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self._data.pop(key, None)
+
+    def discard_prefix(self, prefix: str) -> None:
+        for key in [k for k in self._data if k.startswith(prefix)]:
+            del self._data[key]
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {"size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0}
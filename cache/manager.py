@@ -1,32 +1,113 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Iterable, Optional, Type, TypeVar
+import asyncio
+import logging
+import math
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Type, TypeVar
+from uuid import uuid4
 
 from pydantic import BaseModel
+from redis.exceptions import RedisError
 
 from .backend import CacheBackend
+from .coherence import CacheCoherence
+from .envelope import wrap, unwrap
+from .keys.base import NAMESPACE_VERSIONS_KEY, RETIRED_NAMESPACES_KEY, namespace_prefix
+from .keys.namespaces import namespace_versions
+from .local import LocalCache
+from .metrics import CacheMetrics
 from .serializer import CacheSerializer
 
 T = TypeVar("T", bound=BaseModel)
 
+LOCK_SUFFIX = ":lock"
+
 
 class CacheManager:
-    def __init__(self, backend: CacheBackend, serializer: CacheSerializer):
+    def __init__(self, backend: CacheBackend, serializer: CacheSerializer,
+                 local: Optional[LocalCache] = None, coherence: Optional[CacheCoherence] = None,
+                 metrics: Optional[CacheMetrics] = None):
         self._backend = backend
+        self.metrics = metrics if metrics is not None else CacheMetrics()
         self._serializer = serializer
+        self._local = local
+        self._coherence = coherence
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.coalesced = 0
+        self.computed = 0
+        self.stale_served = 0
+        self.early_refreshes = 0
+        self.refresh_failures = 0
+        self._refresh_tasks: set[asyncio.Task] = set()
+
+    async def _get_raw(self, key: str) -> Optional[bytes]:
+        if self._local is not None:
+            raw = self._local.get(key)
+            if raw is not None:
+                self.metrics.hit(key, len(raw), layer="l1")
+                return raw
+        started = time.perf_counter()
+        try:
+            raw = await self._backend.get(key)
+        except RedisError:
+            self.metrics.error(key)
+            raise
+        self.metrics.latency(key, "get", time.perf_counter() - started)
+        if raw is None:
+            self.metrics.miss(key)
+            return None
+        self.metrics.hit(key, len(raw))
+        if self._local is not None:
+            self._local.set(key, raw)
+        return raw
+
+    async def _drop_local(self, keys: Iterable[str] = (), prefix: Optional[str] = None,
+                          generations: Optional[Dict[str, int]] = None) -> None:
+        keys = list(keys)
+        if self._local is not None:
+            self._local.discard(keys)
+            if prefix is not None:
+                self._local.discard_prefix(prefix)
+        if self._coherence is not None:
+            await self._coherence.publish(keys, prefix, generations)
+
+    def _decode(self, raw: Optional[bytes], model: Optional[Type[T]] = None) -> Optional[Any]:
+        body, _, _ = unwrap(raw)
+        return self._serializer.deserialize(body, model=model)
 
     async def get(self, key: str, *, model: Optional[Type[T]] = None) -> Optional[Any]:
-        raw = await self._backend.get(key)
-        return self._serializer.deserialize(raw, model=model)
+        raw = await self._get_raw(key)
+        return self._decode(raw, model=model)
 
-    async def set(self, key: str, value: Any, *, ttl: Optional[int] = None) -> None:
+    async def set(self, key: str, value: Any, *, ttl: Optional[int] = None,
+                  stale_ttl: Optional[int] = None, delta: float = 0.0) -> None:
         raw = self._serializer.serialize(value)
+        if stale_ttl and ttl:
+            raw = wrap(raw, time.time() + ttl, delta)
+            ttl = ttl + stale_ttl
+        started = time.perf_counter()
         await self._backend.set(key, raw, ttl=ttl)
+        self.metrics.latency(key, "set", time.perf_counter() - started)
+        self.metrics.stored(key, len(raw))
+        await self._drop_local([key])
+        if self._local is not None:
+            self._local.set(key, raw, ttl=ttl)
 
     async def delete(self, key: str) -> None:
         await self._backend.delete(key)
+        await self._drop_local([key])
+
+    async def delete_many(self, keys: Iterable[str]) -> int:
+        keys = list(keys)
+        removed = await self._backend.unlink_many(keys)
+        await self._drop_local(keys)
+        return removed
 
     async def exists(self, key: str) -> bool:
+        if self._local is not None and self._local.get(key) is not None:
+            return True
         return await self._backend.exists(key)
 
     async def mget(
@@ -35,10 +116,26 @@ class CacheManager:
             *,
             model: Optional[Type[T]] = None,
     ) -> Dict[str, Optional[Any]]:
-        raw_map = await self._backend.mget(list(keys))
-        result: Dict[str, Optional[Any]] = {}
+        keys = list(keys)
+        raw_map: Dict[str, Optional[bytes]] = self._local.get_many(keys) if self._local is not None else {}
         for key, raw in raw_map.items():
-            result[key] = self._serializer.deserialize(raw, model=model)
+            self.metrics.hit(key, len(raw), layer="l1")
+        missing = [key for key in keys if key not in raw_map]
+        if missing:
+            started = time.perf_counter()
+            fetched = await self._backend.mget(missing)
+            self.metrics.latency(missing[0], "mget", time.perf_counter() - started)
+            for key, raw in fetched.items():
+                raw_map[key] = raw
+                if raw is None:
+                    self.metrics.miss(key)
+                    continue
+                self.metrics.hit(key, len(raw))
+                if self._local is not None:
+                    self._local.set(key, raw)
+        result: Dict[str, Optional[Any]] = {}
+        for key in keys:
+            result[key] = self._decode(raw_map.get(key), model=model)
         return result
 
     async def mset(
@@ -50,11 +147,235 @@ class CacheManager:
         if not mapping:
             return
 
-        raw_mapping: Dict[str, str] = {}
+        raw_mapping: Dict[str, bytes] = {}
         for key, value in mapping.items():
             raw_mapping[key] = self._serializer.serialize(value)
 
+        started = time.perf_counter()
         await self._backend.mset(raw_mapping, ttl=ttl)
+        self.metrics.latency(next(iter(raw_mapping)), "mset", time.perf_counter() - started)
+        for key, raw in raw_mapping.items():
+            self.metrics.stored(key, len(raw))
+        await self._drop_local(raw_mapping.keys())
+        if self._local is not None:
+            for key, raw in raw_mapping.items():
+                self._local.set(key, raw, ttl=ttl)
+
+    async def get_or_compute(
+            self,
+            key: str,
+            loader: Callable[[], Awaitable[Any]],
+            *,
+            ttl: Optional[int] = None,
+            model: Optional[Type[T]] = None,
+            stale_ttl: Optional[int] = None,
+            early_refresh: bool = False,
+            beta: float = 1.0,
+            lock_timeout: float = 10.0,
+            wait_timeout: float = 5.0,
+    ) -> Optional[Any]:
+        try:
+            raw = await self._get_raw(key)
+        except RedisError as e:
+            logging.warning(f"Cache read {key} failed, computing without cache: {e!r}")
+            return await loader()
+        if raw is not None:
+            body, soft_expires_at, delta = unwrap(raw)
+            value = self._serializer.deserialize(body, model=model)
+            if stale_ttl and soft_expires_at is not None:
+                now = time.time()
+                if now >= soft_expires_at:
+                    self.stale_served += 1
+                    self.metrics.stale(key)
+                    self._schedule_refresh(key, loader, ttl, stale_ttl, lock_timeout)
+                elif early_refresh and delta > 0 and \
+                        now - delta * beta * math.log(random.random() or 1e-12) >= soft_expires_at:
+                    self.early_refreshes += 1
+                    self._schedule_refresh(key, loader, ttl, stale_ttl, lock_timeout)
+            return value
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            value = await asyncio.shield(inflight)
+            if value is not None:
+                return value
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await self._compute_locked(key, loader, ttl, model, lock_timeout, wait_timeout,
+                                               stale_ttl=stale_ttl)
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    def _schedule_refresh(self, key: str, loader: Callable[[], Awaitable[Any]], ttl: Optional[int],
+                          stale_ttl: int, lock_timeout: float) -> None:
+        if key in self._inflight:
+            return
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        task = asyncio.create_task(self._refresh(key, loader, ttl, stale_ttl, lock_timeout, future))
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
 
-    async def invalidate(self, prefix: str) -> None:
-        await self._backend.invalidate_prefix(prefix)
+    async def _refresh(self, key: str, loader: Callable[[], Awaitable[Any]], ttl: Optional[int],
+                       stale_ttl: int, lock_timeout: float, future: asyncio.Future) -> None:
+        try:
+            value = await self._compute_locked(key, loader, ttl, None, lock_timeout, 0.0,
+                                               stale_ttl=stale_ttl, skip_if_locked=True)
+            future.set_result(value)
+        except Exception as e:
+            self.refresh_failures += 1
+            logging.warning(f"Background refresh of {key} failed: {e!r}")
+            future.set_exception(e)
+            future.exception()
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _compute_locked(self, key: str, loader: Callable[[], Awaitable[Any]], ttl: Optional[int],
+                              model: Optional[Type[T]], lock_timeout: float, wait_timeout: float,
+                              stale_ttl: Optional[int] = None, skip_if_locked: bool = False) -> Optional[Any]:
+        lock_key = key + LOCK_SUFFIX
+        token = uuid4().hex
+        try:
+            acquired = await self._backend.acquire_lock(lock_key, token, int(lock_timeout * 1000))
+        except RedisError as e:
+            logging.warning(f"Cache lock {lock_key} unavailable: {e!r}")
+            acquired = False
+        else:
+            if not acquired and skip_if_locked:
+                return None
+            if not acquired:
+                deadline = time.monotonic() + wait_timeout
+                delay = 0.05
+                while time.monotonic() < deadline:
+                    await asyncio.sleep(delay)
+                    try:
+                        cached = await self.get(key, model=model)
+                    except RedisError:
+                        break
+                    if cached is not None:
+                        self.coalesced += 1
+                        return cached
+                    delay = min(delay * 2, 0.4)
+
+        try:
+            self.computed += 1
+            started = time.perf_counter()
+            value = await loader()
+            self.metrics.computed(key, time.perf_counter() - started)
+            if value is not None:
+                try:
+                    await self.set(key, value, ttl=ttl, stale_ttl=stale_ttl, delta=time.perf_counter() - started)
+                except RedisError as e:
+                    self.metrics.error(key)
+                    logging.warning(f"Cache write {key} failed: {e!r}")
+            return value
+        finally:
+            if acquired:
+                try:
+                    await self._backend.release_lock(lock_key, token)
+                except RedisError as e:
+                    logging.warning(f"Cache lock {lock_key} release failed: {e!r}")
+
+    async def mget_or_compute(
+            self,
+            keys: Iterable[str],
+            loader: Callable[[List[str]], Awaitable[Dict[str, Any]]],
+            *,
+            ttl: Optional[int] = None,
+            model: Optional[Type[T]] = None,
+    ) -> Dict[str, Any]:
+        keys = list(dict.fromkeys(keys))
+        try:
+            cached = await self.mget(keys, model=model)
+        except RedisError as e:
+            for key in keys:
+                self.metrics.error(key)
+            logging.warning(f"Cache mget failed, computing {len(keys)} keys without cache: {e!r}")
+            computed = await loader(keys) if keys else {}
+            return {key: computed[key] for key in keys if computed.get(key) is not None}
+        result: Dict[str, Any] = {key: value for key, value in cached.items() if value is not None}
+        missing = [key for key in keys if key not in result]
+        waiting = {key: self._inflight[key] for key in missing if key in self._inflight}
+        owned = [key for key in missing if key not in waiting]
+
+        if owned:
+            loop = asyncio.get_running_loop()
+            futures = {key: loop.create_future() for key in owned}
+            self._inflight.update(futures)
+            try:
+                self.computed += len(owned)
+                started = time.perf_counter()
+                computed = await loader(owned)
+                self.metrics.computed(owned[0], time.perf_counter() - started, count=len(owned))
+                fresh = {key: computed[key] for key in owned if computed.get(key) is not None}
+                try:
+                    await self.mset(fresh, ttl=ttl)
+                except RedisError as e:
+                    for key in fresh:
+                        self.metrics.error(key)
+                    logging.warning(f"Cache mset failed: {e!r}")
+            except Exception as e:
+                for future in futures.values():
+                    future.set_exception(e)
+                    future.exception()
+                raise
+            except BaseException:
+                for future in futures.values():
+                    future.cancel()
+                raise
+            else:
+                for key, future in futures.items():
+                    future.set_result(fresh.get(key))
+                result.update(fresh)
+            finally:
+                for key in owned:
+                    self._inflight.pop(key, None)
+
+        if waiting:
+            self.coalesced += len(waiting)
+            values = await asyncio.gather(*(asyncio.shield(f) for f in waiting.values()))
+            for key, value in zip(waiting, values):
+                if value is not None:
+                    result[key] = value
+        return result
+
+    async def sync_generations(self) -> Dict[str, int]:
+        namespace_versions.update(await self._backend.load_generations(NAMESPACE_VERSIONS_KEY))
+        return namespace_versions.snapshot()
+
+    async def invalidate(self, domain: str) -> int:
+        generation = await self._backend.incr_generation(NAMESPACE_VERSIONS_KEY, domain)
+        retired = namespace_prefix(domain, generation - 1)
+        await self._backend.retire(RETIRED_NAMESPACES_KEY, retired)
+        namespace_versions.update({domain: generation})
+        await self._drop_local(prefix=retired, generations={domain: generation})
+        return generation
+
+    def stats(self) -> dict:
+        result: dict = {"local": self._local.stats() if self._local is not None else None,
+                        "single_flight": {"inflight": len(self._inflight),
+                                          "computed": self.computed,
+                                          "coalesced": self.coalesced},
+                        "swr": {"stale_served": self.stale_served,
+                                "early_refreshes": self.early_refreshes,
+                                "refresh_failures": self.refresh_failures,
+                                "refreshing": len(self._refresh_tasks)},
+                        "generations": namespace_versions.snapshot()}
+        if self._coherence is not None:
+            result["coherence"] = {"node": self._coherence.node_id,
+                                   "sent": self._coherence.sent,
+                                   "received": self._coherence.received}
+        return result
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from cache.keys.base import PROJECT_PREFIX
+
+LATENCY_BUCKETS: Tuple[float, ...] = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+FASTAPI_CACHE_PREFIX = "cache"
+COUNTERS = ("hits", "misses", "l1_hits", "stale", "sets", "evictions", "errors", "computes")
+
+
+def namespace_of(key: str) -> str:
+    parts = key.split(":")
+    if parts[0] == PROJECT_PREFIX and len(parts) > 2:
+        return parts[2]
+    if parts[0] == FASTAPI_CACHE_PREFIX and len(parts) > 1:
+        return f"fastapi:{parts[1] or 'default'}"
+    return parts[0]
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return self.buckets[-1]
+
+    def stats(self) -> dict:
+        return {"count": self.count,
+                "avg_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+                "p50_ms": round(self.quantile(0.5) * 1000, 3),
+                "p95_ms": round(self.quantile(0.95) * 1000, 3),
+                "p99_ms": round(self.quantile(0.99) * 1000, 3)}
+
+
+class NamespaceMetrics:
+    def __init__(self):
+        self.counters: Dict[str, int] = dict.fromkeys(COUNTERS, 0)
+        self.latency: Dict[str, Histogram] = defaultdict(Histogram)
+        self.compute = Histogram()
+        self.bytes_written = 0
+        self.bytes_read = 0
+        self.max_payload = 0
+
+    def stats(self) -> dict:
+        lookups = self.counters["hits"] + self.counters["misses"]
+        writes = self.counters["sets"]
+        return {**self.counters,
+                "hit_ratio": round(self.counters["hits"] / lookups, 4) if lookups else 0.0,
+                "latency": {op: hist.stats() for op, hist in self.latency.items()},
+                "compute": self.compute.stats(),
+                "bytes_written": self.bytes_written,
+                "bytes_read": self.bytes_read,
+                "avg_payload": self.bytes_written // writes if writes else 0,
+                "max_payload": self.max_payload}
+
+
+class KeyStats:
+    __slots__ = ("hits", "misses", "size", "last_seen")
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.size = 0
+        self.last_seen = 0.0
+
+    def as_dict(self, key: str) -> dict:
+        return {"key": key, "hits": self.hits, "misses": self.misses, "size": self.size}
+
+
+class CacheMetrics:
+    def __init__(self, max_keys: int = 1000):
+        self.max_keys = max(1, max_keys)
+        self.started_at = time.time()
+        self.namespaces: Dict[str, NamespaceMetrics] = defaultdict(NamespaceMetrics)
+        self.keys: Dict[str, KeyStats] = dict()
+
+    def _key(self, key: str) -> KeyStats:
+        entry = self.keys.get(key)
+        if entry is None:
+            if len(self.keys) >= self.max_keys:
+                self._trim()
+            entry = self.keys[key] = KeyStats()
+        entry.last_seen = time.monotonic()
+        return entry
+
+    def _trim(self) -> None:
+        ranked = sorted(self.keys.items(), key=lambda item: (item[1].hits + item[1].misses, item[1].last_seen))
+        for key, _ in ranked[:max(1, len(ranked) // 4)]:
+            del self.keys[key]
+
+    def hit(self, key: str, size: int = 0, layer: str = "redis") -> None:
+        ns = self.namespaces[namespace_of(key)]
+        ns.counters["hits"] += 1
+        ns.bytes_read += size
+        if layer == "l1":
+            ns.counters["l1_hits"] += 1
+        entry = self._key(key)
+        entry.hits += 1
+        if size:
+            entry.size = size
+
+    def miss(self, key: str) -> None:
+        self.namespaces[namespace_of(key)].counters["misses"] += 1
+        self._key(key).misses += 1
+
+    def stored(self, key: str, size: int) -> None:
+        ns = self.namespaces[namespace_of(key)]
+        ns.counters["sets"] += 1
+        ns.bytes_written += size
+        ns.max_payload = max(ns.max_payload, size)
+        self._key(key).size = size
+
+    def stale(self, key: str) -> None:
+        self.namespaces[namespace_of(key)].counters["stale"] += 1
+
+    def evicted(self, key: str) -> None:
+        self.namespaces[namespace_of(key)].counters["evictions"] += 1
+
+    def error(self, key: str) -> None:
+        self.namespaces[namespace_of(key)].counters["errors"] += 1
+
+    def latency(self, key: str, op: str, seconds: float) -> None:
+        self.namespaces[namespace_of(key)].latency[op].observe(seconds)
+
+    def computed(self, key: str, seconds: float, count: int = 1) -> None:
+        ns = self.namespaces[namespace_of(key)]
+        ns.counters["computes"] += count
+        ns.compute.observe(seconds)
+
+    def top_keys(self, by: str = "traffic", limit: int = 20) -> List[dict]:
+        if by == "size":
+            rank = lambda item: item[1].size
+        else:
+            rank = lambda item: item[1].hits + item[1].misses
+        ranked = sorted(self.keys.items(), key=rank, reverse=True)[:limit]
+        return [entry.as_dict(key) for key, entry in ranked]
+
+    def stats(self) -> dict:
+        return {"since": self.started_at,
+                "tracked_keys": len(self.keys),
+                "namespaces": {name: ns.stats() for name, ns in sorted(self.namespaces.items())}}
+
+    def reset(self) -> None:
+        self.started_at = time.time()
+        self.namespaces.clear()
+        self.keys.clear()
+
+    def render_prometheus(self, extra: Optional[Dict[str, float]] = None) -> str:
+        lines: List[str] = list()
+        for counter in COUNTERS:
+            name = f"cache_{counter}_total"
+            lines.append(f"# TYPE {name} counter")
+            for ns_name, ns in sorted(self.namespaces.items()):
+                lines.append(f'{name}{{namespace="{ns_name}"}} {ns.counters[counter]}')
+        for name, attr in (("cache_bytes_written_total", "bytes_written"), ("cache_bytes_read_total", "bytes_read")):
+            lines.append(f"# TYPE {name} counter")
+            for ns_name, ns in sorted(self.namespaces.items()):
+                lines.append(f'{name}{{namespace="{ns_name}"}} {getattr(ns, attr)}')
+        lines.append("# TYPE cache_operation_seconds histogram")
+        for ns_name, ns in sorted(self.namespaces.items()):
+            for op, hist in sorted(ns.latency.items()):
+                lines.extend(_histogram_lines("cache_operation_seconds", f'namespace="{ns_name}",op="{op}"', hist))
+        lines.append("# TYPE cache_compute_seconds histogram")
+        for ns_name, ns in sorted(self.namespaces.items()):
+            lines.extend(_histogram_lines("cache_compute_seconds", f'namespace="{ns_name}"', ns.compute))
+        for name, value in (extra or {}).items():
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _histogram_lines(name: str, labels: str, hist: Histogram) -> List[str]:
+    lines = list()
+    cumulative = 0
+    for bound, count in zip(hist.buckets, hist.counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {hist.count}')
+    lines.append(f"{name}_sum{{{labels}}} {round(hist.total, 6)}")
+    lines.append(f"{name}_count{{{labels}}} {hist.count}")
+    return lines
@@ -1,33 +1,75 @@
 from __future__ import annotations
 
+import json
+import zlib
 from typing import Any, Type, TypeVar, Optional
 
-import json
+import orjson
 from pydantic import BaseModel
 
 T = TypeVar("T")
 
+FORMAT_MAGIC = 0xF7
+CODEC_NONE, CODEC_ZLIB = 0, 1
+
+
+def _dumps(value: Any) -> bytes:
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+
 
 class CacheSerializer:
-    @staticmethod
-    def serialize(value: Any) -> str:
-        if isinstance(value, BaseModel):
-            return value.model_dump_json()
+    def __init__(self, compression: str = "zlib", threshold: int = 1024, level: int = 3):
+        self.codec = CODEC_NONE if compression == "none" else CODEC_ZLIB
+        self.threshold = threshold
+        self.level = level
+
+    def _compress(self, payload: bytes) -> tuple[int, bytes]:
+        if self.codec == CODEC_NONE or len(payload) < self.threshold:
+            return CODEC_NONE, payload
+        return CODEC_ZLIB, zlib.compress(payload, self.level)
 
-        if isinstance(value, (dict, list)):
-            return json.dumps(value, ensure_ascii=False)
+    def _decompress(self, codec: int, payload: bytes) -> bytes:
+        if codec == CODEC_NONE:
+            return payload
+        if codec == CODEC_ZLIB:
+            return zlib.decompress(payload)
+        raise ValueError(f"Unknown cache codec {codec}")
 
-        return str(value)
+    def serialize(self, value: Any) -> bytes:
+        if isinstance(value, (bytes, bytearray)):
+            payload = bytes(value)
+        elif isinstance(value, BaseModel):
+            payload = value.model_dump_json().encode("utf-8")
+        elif isinstance(value, (dict, list)):
+            payload = _dumps(value)
+        else:
+            try:
+                payload = _dumps(value)
+            except TypeError:
+                payload = _dumps(str(value))
+        codec, body = self._compress(payload)
+        return bytes((FORMAT_MAGIC, codec)) + body
 
-    @staticmethod
-    def deserialize(raw: Optional[str], model: Optional[Type[T]] = None) -> Optional[T]:
+    def deserialize(self, raw: Optional[bytes | str], model: Optional[Type[T]] = None) -> Optional[T]:
         if raw is None:
             return None
 
+        if isinstance(raw, (bytes, bytearray)) and len(raw) >= 2 and raw[0] == FORMAT_MAGIC:
+            payload = self._decompress(raw[1], bytes(raw[2:]))
+            if model is bytes:
+                return payload
+            if model is not None and issubclass(model, BaseModel):
+                return model.model_validate_json(payload)
+            return orjson.loads(payload)
+
+        if model is bytes:
+            return raw if isinstance(raw, bytes) else raw.encode("utf-8")
+
+        text = raw.decode("utf-8") if isinstance(raw, (bytes, bytearray)) else raw
         if model is not None and issubclass(model, BaseModel):
-            return model.model_validate_json(raw)
+            return model.model_validate_json(text)
 
         try:
-            return json.loads(raw)
+            return json.loads(text)
         except json.JSONDecodeError:
-            return raw
+            return text
@@ -12,6 +12,7 @@ class CacheTTLSettings(BaseSettings):
     filters: int
     formula: int
     product_info: int
+    stale: int = 3600
 
     class Config:
         env_prefix = "CACHE_TTL_"
@@ -19,3 +20,80 @@ class CacheTTLSettings(BaseSettings):
 
 
 cache_ttl = CacheTTLSettings()
+
+
+class CacheLocalSettings(BaseSettings):
+    maxsize: int = 5000
+    ttl: int = 30
+
+    class Config:
+        env_prefix = "CACHE_LOCAL_"
+        env_file = "./cache/.env"
+
+
+cache_local = CacheLocalSettings()
+
+
+class CacheCodecSettings(BaseSettings):
+    compression: str = "zlib"
+    threshold: int = 1024
+    level: int = 3
+
+    class Config:
+        env_prefix = "CACHE_CODEC_"
+        env_file = "./cache/.env"
+
+
+cache_codec = CacheCodecSettings()
+
+
+class CacheJanitorSettings(BaseSettings):
+    interval: float = 300.0
+    batch: int = 500
+    pause: float = 0.05
+
+    class Config:
+        env_prefix = "CACHE_JANITOR_"
+        env_file = "./cache/.env"
+
+
+cache_janitor = CacheJanitorSettings()
+
+
+class CacheResponseSettings(BaseSettings):
+    ttl: int = 600
+    max_age: int = 30
+    s_maxage: int = 120
+    stale_while_revalidate: int = 300
+
+    class Config:
+        env_prefix = "CACHE_RESPONSE_"
+        env_file = "./cache/.env"
+
+
+cache_response = CacheResponseSettings()
+
+
+class CacheMetricsSettings(BaseSettings):
+    tracked_keys: int = 1000
+
+    class Config:
+        env_prefix = "CACHE_METRICS_"
+        env_file = "./cache/.env"
+
+
+cache_metrics_settings = CacheMetricsSettings()
+
+
+class CacheWarmSettings(BaseSettings):
+    on_start: bool = True
+    concurrency: int = 4
+    batch: int = 200
+    top_paths: int = 20
+
+    class Config:
+        env_prefix = "CACHE_WARM_"
+        env_file = "./cache/.env"
+
+
+cache_warm = CacheWarmSettings()
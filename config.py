@@ -52,6 +52,15 @@ class APISettings(CustomConfigSettings):
     cors: Union[str, List[str]] = Field(...)
     api_service_shared_secret: str
     api_service_name: str
+    dtube_concurrency: int = 8
+    dtube_rate_limit: float = 20.0
+    dtube_health_interval: float = 10.0
+    dtube_breaker_threshold: int = 3
+    dtube_breaker_reset: float = 30.0
+    dtube_outbox_interval: float = 2.0
+    dtube_outbox_batch: int = 200
+    dtube_outbox_max_attempts: int = 12
+    dtube_outbox_sent_retention: int = 604800
 
     @field_validator("cors", mode="before")
     def parse_cors_line(cls, value: str) -> list[str] | str:
@@ -66,6 +75,10 @@ class RedisSettings(CustomConfigSettings):
 
 class ParsingSettings(CustomConfigSettings):
     browser_headless: bool
+    browser_pool_size: int = 3
+    browser_context_max_age: int = 1800
+    browser_context_max_uses: int = 50
+    crawl_tabs: int = 4
 
 
 class BotSettings(CustomConfigSettings):
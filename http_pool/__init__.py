@@ -0,0 +1,18 @@
+from aiohttp import ClientSession
+
+from http_pool.pool import HttpPool
+from http_pool.settings import http_pool_settings
+
+http_pool = HttpPool(http_pool_settings)
+
+
+def get_dtube_session() -> ClientSession:
+    return http_pool.session("dtube")
+
+
+def get_s3_session() -> ClientSession:
+    return http_pool.session("s3")
+
+
+def get_microline_session() -> ClientSession:
+    return http_pool.session("microline")
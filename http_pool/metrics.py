@@ -0,0 +1,65 @@
+import asyncio
+from types import SimpleNamespace
+
+from aiohttp import TraceConfig, TraceRequestStartParams, TraceRequestEndParams, TraceRequestExceptionParams, \
+    TraceConnectionQueuedStartParams, TraceConnectionQueuedEndParams
+
+
+class PoolMetrics:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.queued = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def trace_config(self) -> TraceConfig:
+        trace = TraceConfig()
+        trace.on_request_start.append(self.on_request_start)
+        trace.on_request_end.append(self.on_request_end)
+        trace.on_request_exception.append(self.on_request_exception)
+        trace.on_connection_queued_start.append(self.on_queued_start)
+        trace.on_connection_queued_end.append(self.on_queued_end)
+        trace.on_connection_create_end.append(self.on_connection_create)
+        trace.on_connection_reuseconn.append(self.on_connection_reuse)
+        return trace
+
+    async def on_request_start(self, session, ctx: SimpleNamespace, params: TraceRequestStartParams):
+        self.requests += 1
+        self.in_flight += 1
+
+    async def on_request_end(self, session, ctx: SimpleNamespace, params: TraceRequestEndParams):
+        self.in_flight -= 1
+
+    async def on_request_exception(self, session, ctx: SimpleNamespace, params: TraceRequestExceptionParams):
+        self.in_flight -= 1
+        self.errors += 1
+
+    async def on_queued_start(self, session, ctx: SimpleNamespace, params: TraceConnectionQueuedStartParams):
+        self.queued += 1
+        ctx.queued_at = asyncio.get_running_loop().time()
+
+    async def on_queued_end(self, session, ctx: SimpleNamespace, params: TraceConnectionQueuedEndParams):
+        waited = asyncio.get_running_loop().time() - getattr(ctx, "queued_at", 0.0)
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+
+    async def on_connection_create(self, session, ctx: SimpleNamespace, params):
+        self.connections_created += 1
+
+    async def on_connection_reuse(self, session, ctx: SimpleNamespace, params):
+        self.connections_reused += 1
+
+    def snapshot(self) -> dict:
+        return {"requests": self.requests,
+                "errors": self.errors,
+                "in_flight": self.in_flight,
+                "connections_created": self.connections_created,
+                "connections_reused": self.connections_reused,
+                "queued": self.queued,
+                "wait_total_ms": round(self.wait_total * 1000, 2),
+                "wait_avg_ms": round(self.wait_total / self.queued * 1000, 2) if self.queued else 0.0,
+                "wait_max_ms": round(self.wait_max * 1000, 2)}
@@ -0,0 +1,75 @@
+from dataclasses import dataclass
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+
+from http_pool.metrics import PoolMetrics
+from http_pool.settings import HttpPoolSettings
+
+
+@dataclass(frozen=True)
+class UpstreamConfig:
+    limit: int
+    limit_per_host: int
+    timeout: ClientTimeout
+
+
+class HttpPool:
+    def __init__(self, config: HttpPoolSettings):
+        self.config = config
+        self.upstreams: dict[str, UpstreamConfig] = {
+            "dtube": UpstreamConfig(limit=config.dtube_limit,
+                                    limit_per_host=config.dtube_limit_per_host,
+                                    timeout=ClientTimeout(total=config.dtube_timeout)),
+            "s3": UpstreamConfig(limit=config.s3_limit,
+                                 limit_per_host=config.s3_limit_per_host,
+                                 timeout=ClientTimeout(total=config.s3_timeout)),
+            "microline": UpstreamConfig(limit=config.microline_limit,
+                                        limit_per_host=config.microline_limit_per_host,
+                                        timeout=ClientTimeout(total=config.microline_timeout,
+                                                              connect=config.microline_connect_timeout,
+                                                              sock_read=config.microline_timeout))}
+        self.sessions: dict[str, ClientSession] = dict()
+        self.metrics: dict[str, PoolMetrics] = {name: PoolMetrics() for name in self.upstreams}
+
+    def _create(self, name: str) -> ClientSession:
+        upstream = self.upstreams[name]
+        connector = TCPConnector(limit=upstream.limit,
+                                 limit_per_host=upstream.limit_per_host,
+                                 keepalive_timeout=self.config.keepalive_timeout,
+                                 use_dns_cache=True,
+                                 ttl_dns_cache=self.config.dns_ttl)
+        return ClientSession(connector=connector,
+                             timeout=upstream.timeout,
+                             trace_configs=[self.metrics[name].trace_config()])
+
+    async def start(self):
+        for name in self.upstreams:
+            self.session(name)
+
+    def session(self, name: str) -> ClientSession:
+        session = self.sessions.get(name)
+        if session is None or session.closed:
+            session = self._create(name)
+            self.sessions[name] = session
+        return session
+
+    async def close(self):
+        for session in self.sessions.values():
+            if not session.closed:
+                await session.close()
+        self.sessions.clear()
+
+    def stats(self) -> dict[str, dict]:
+        result = dict()
+        for name in self.upstreams:
+            session = self.sessions.get(name)
+            connector = session.connector if session and not session.closed else None
+            in_use = len(getattr(connector, "_acquired", ())) if connector else 0
+            idle = sum(len(conns) for conns in getattr(connector, "_conns", {}).values()) if connector else 0
+            result[name] = {"open": connector is not None,
+                            "limit": self.upstreams[name].limit,
+                            "limit_per_host": self.upstreams[name].limit_per_host,
+                            "in_use": in_use,
+                            "idle": idle,
+                            **self.metrics[name].snapshot()}
+        return result
@@ -0,0 +1,27 @@
+from pydantic_settings import BaseSettings
+
+
+class HttpPoolSettings(BaseSettings):
+    keepalive_timeout: float = 30
+    dns_ttl: int = 300
+
+    dtube_limit: int = 32
+    dtube_limit_per_host: int = 16
+    dtube_timeout: float = 30
+
+    s3_limit: int = 64
+    s3_limit_per_host: int = 32
+    s3_timeout: float = 30
+
+    microline_limit: int = 16
+    microline_limit_per_host: int = 8
+    microline_timeout: float = 1000
+    microline_connect_timeout: float = 10
+
+    class Config:
+        env_prefix = "HTTP_POOL_"
+        env_file = "./http_pool/.env"
+        extra = "ignore"
+
+
+http_pool_settings = HttpPoolSettings()
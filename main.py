@@ -1,35 +1,65 @@
+import asyncio
 import logging
 
 from aiogram.exceptions import TelegramRetryAfter, TelegramNetworkError
 from aiogram_dialog import setup_dialogs
 from fastapi_cache import FastAPICache
 
-from fastapi_cache.backends.redis import RedisBackend
 from starlette.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy.exc import SQLAlchemyError
 
 from api_common.routers import general_router
+from api_service.dtube_health import dtube_health_monitor
+from api_service.modulars.outbox.service import outbox_dispatcher
+from api_service.modulars.cache_warmer.service import cache_warmup
+from api_service.modulars.catalog.crud import ensure_catalog
 from api_miniapp.routers import miniapp_router
 from api_service.routers import service_router
 from api_users.routers import auth_api_router
 from api_v2.routers import api_v2_router
 from api_v3.routers import api_v3
+from cache import start_cache_manager, stop_cache_manager, cache_metrics
+from cache.fastapi_backend import InstrumentedRedisBackend
+from cache.settings import cache_warm
 from bot.bot_main import bot_setup_webhook, bot_fastapi_router, bot, dp
 from bot.crud_bot import get_option_value, add_bot_options
 from config import settings, redis_session
 from engine import db
+from http_pool import http_pool
+from parsing.browser import browser_pool
+
+
+async def prepare_storefront():
+    try:
+        async with db.tg_session() as session:
+            await ensure_catalog(session)
+    except SQLAlchemyError as e:
+        logging.error(f"Catalog projection bootstrap failed: {e!r}")
+    if cache_warm.on_start:
+        cache_warmup.schedule()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     setup_dialogs(dp)
+    storefront_task = None
     try:
         redis = redis_session()
-        FastAPICache.init(RedisBackend(redis), prefix="cache")
+        FastAPICache.init(InstrumentedRedisBackend(redis, cache_metrics), prefix="cache")
         logging.info("FastAPICache initialized")
+        await http_pool.start()
+        await dtube_health_monitor.start(http_pool.session("dtube"), redis)
+        await outbox_dispatcher.start(http_pool.session("dtube"))
+        await start_cache_manager(redis)
+        storefront_task = asyncio.create_task(prepare_storefront())
+        try:
+            await browser_pool.start()
+        except Exception as e:
+            logging.error(f"Browser pool warm-up failed: {e}")
         bot_username = await bot_setup_webhook()
         async with db.tg_session() as session:
             already_add = await get_option_value(session=session, username=bot_username, field='username')
@@ -40,6 +70,15 @@ async def lifespan(app: FastAPI):
         logging.error(f"Lifespan startup failed: {e}")
         yield
     finally:
+        if storefront_task is not None:
+            storefront_task.cancel()
+            await asyncio.gather(storefront_task, return_exceptions=True)
+        await cache_warmup.stop()
+        await stop_cache_manager()
+        await outbox_dispatcher.stop()
+        await dtube_health_monitor.stop()
+        await http_pool.close()
+        await browser_pool.close()
         await bot.session.close()
 
 
@@ -40,12 +40,15 @@ __all__ = (
     "SpecsComposer",
     "VendorApiToken",
     "VendorApiSearchLineLink",
-    "VendorApiSearch")
+    "VendorApiSearch",
+    "DTubeOutbox",
+    "CatalogItem")
 
 from .base import Base
 from .api_v1 import Activity, StockTable, Guests, Sellers, StockTableDependency
 from .desc_builder import DescBuilderFormulaLink, SpecsComposer, SpecPath
 from .hub import HUbMenuLevel, HUbStock
+from .catalog import CatalogItem
 from .parsing import ParsingLine
 from .product_dependencies import (ProductFeaturesLink,
                                    ProductOrigin,
@@ -65,3 +68,4 @@ from .attributes import AttributeLink, AttributeOriginValue, AttributeModelOptio
 
 from .formula import FormulaExpression, FormulaEntityType
 from .analytics import ProductTypeWeightRule, ProductTypeValueMap, ProductMarketSettings
+from .outbox import DTubeOutbox
@@ -0,0 +1,26 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import BigInteger, ForeignKey, Index, String, func
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Mapped, mapped_column
+
+from models import Base
+
+
+class CatalogItem(Base):
+    __tablename__ = "catalog_item"
+    stock_id: Mapped[int] = mapped_column(ForeignKey("hub_stock.id", ondelete="CASCADE"), primary_key=True)
+    origin: Mapped[int] = mapped_column(BigInteger, nullable=False, index=True)
+    path_id: Mapped[int] = mapped_column(nullable=False)
+    warranty: Mapped[Optional[str]]
+    output_price: Mapped[Optional[float]]
+    title: Mapped[str] = mapped_column(nullable=False)
+    feature_id: Mapped[Optional[int]] = mapped_column(index=True)
+    model: Mapped[Optional[str]]
+    preview: Mapped[Optional[str]]
+    pics: Mapped[Optional[list[str]]] = mapped_column(ARRAY(String))
+    refreshed_at: Mapped[datetime] = mapped_column(nullable=False, server_default=func.now())
+
+    __table_args__ = (Index("ix_catalog_item_path_price", "path_id", "output_price", "stock_id"),
+                      Index("ix_catalog_item_path_stock", "path_id", "stock_id"))
@@ -0,0 +1,26 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import BigInteger, Index, func, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from models import Base
+
+
+class DTubeOutbox(Base):
+    __tablename__ = "dtube_outbox"
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    feature_title: Mapped[str] = mapped_column(nullable=False)
+    op: Mapped[str] = mapped_column(nullable=False)
+    payload: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    idempotency_key: Mapped[str] = mapped_column(nullable=False, unique=True)
+    status: Mapped[str] = mapped_column(nullable=False, server_default=text("'pending'"))
+    attempts: Mapped[int] = mapped_column(nullable=False, server_default=text("0"))
+    last_error: Mapped[Optional[str]]
+    next_attempt_at: Mapped[datetime] = mapped_column(nullable=False, server_default=func.now())
+    created_at: Mapped[datetime] = mapped_column(nullable=False, server_default=func.now())
+    sent_at: Mapped[Optional[datetime]]
+
+    __table_args__ = (Index("ix_dtube_outbox_status_id", "status", "id"),
+                      Index("ix_dtube_outbox_feature_title", "feature_title"))
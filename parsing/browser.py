@@ -1,4 +1,11 @@
-from playwright.async_api import Playwright, Browser, async_playwright, Page
+import asyncio
+import logging
+import os
+import time
+from typing import Optional
+
+from playwright.async_api import Playwright, Browser, BrowserContext, async_playwright, Page, \
+    Error as PlaywrightError
 from playwright_stealth import stealth_async
 
 from app_utils import responses
@@ -26,3 +33,154 @@ async def open_page(page: Page, url: str) -> dict:
     if html:
         return responses(html, True, '')
     return responses(f'Error HTML-code in {url}', False)
+
+
+class PooledContext:
+    def __init__(self, context: BrowserContext):
+        self.context = context
+        self.created_at = time.monotonic()
+        self.uses = 0
+
+    def expired(self, max_age: int, max_uses: int) -> bool:
+        return time.monotonic() - self.created_at > max_age or self.uses >= max_uses
+
+    async def healthy(self) -> bool:
+        try:
+            await asyncio.wait_for(self.context.cookies(), timeout=5)
+            return True
+        except (PlaywrightError, asyncio.TimeoutError):
+            return False
+
+    async def close(self):
+        try:
+            await self.context.close()
+        except PlaywrightError:
+            pass
+
+
+class BrowserLease:
+    def __init__(self, pool: "BrowserPool", key: str, pooled: PooledContext):
+        self.pool = pool
+        self.key = key
+        self.pooled = pooled
+        self.released = False
+
+    @property
+    def browser(self) -> Browser:
+        return self.pool.browser
+
+    @property
+    def context(self) -> BrowserContext:
+        return self.pooled.context
+
+    async def renew(self, storage_state: Optional[str] = None) -> BrowserContext:
+        await self.pooled.close()
+        self.pooled = await self.pool.new_context(storage_state)
+        return self.pooled.context
+
+    async def release(self, healthy: bool = True):
+        if self.released:
+            return
+        self.released = True
+        await self.pool.release(self, healthy)
+
+
+class BrowserPool:
+    def __init__(self, size: int, max_age: int, max_uses: int):
+        self.size = max(1, size)
+        self.max_age = max_age
+        self.max_uses = max_uses
+        self.playwright: Optional[Playwright] = None
+        self.browser: Optional[Browser] = None
+        self.idle: dict[str, list[PooledContext]] = dict()
+        self.semaphore = asyncio.Semaphore(self.size)
+        self.leased = 0
+        self._lock = asyncio.Lock()
+
+    async def start(self):
+        async with self._lock:
+            await self._ensure_browser()
+
+    async def _ensure_browser(self):
+        if self.browser is not None and self.browser.is_connected():
+            return
+        await self._drop_idle()
+        if self.playwright is None:
+            self.playwright = await async_playwright().start()
+        self.browser = await create_browser(self.playwright)
+        logging.info("Browser pool: chromium launched")
+
+    async def _drop_idle(self):
+        for contexts in self.idle.values():
+            for pooled in contexts:
+                await pooled.close()
+        self.idle.clear()
+
+    async def new_context(self, storage_state: Optional[str] = None) -> PooledContext:
+        async with self._lock:
+            await self._ensure_browser()
+            state = storage_state if storage_state and os.path.exists(storage_state) else None
+            context = await self.browser.new_context(storage_state=state)
+        await context.set_extra_http_headers(BROWSER_HEADERS)
+        return PooledContext(context)
+
+    async def acquire(self, key: str, storage_state: Optional[str] = None) -> BrowserLease:
+        await self.semaphore.acquire()
+        try:
+            pooled = None
+            contexts = self.idle.get(key, [])
+            while contexts and pooled is None:
+                candidate = contexts.pop()
+                if candidate.expired(self.max_age, self.max_uses) or not await candidate.healthy():
+                    await candidate.close()
+                    continue
+                pooled = candidate
+            if pooled is None:
+                pooled = await self.new_context(storage_state)
+        except BaseException:
+            self.semaphore.release()
+            raise
+        pooled.uses += 1
+        self.leased += 1
+        return BrowserLease(self, key, pooled)
+
+    async def release(self, lease: BrowserLease, healthy: bool = True):
+        try:
+            pooled = lease.pooled
+            for page in list(pooled.context.pages):
+                try:
+                    await page.close()
+                except PlaywrightError:
+                    healthy = False
+            if healthy and not pooled.expired(self.max_age, self.max_uses) and self.browser is not None \
+                    and self.browser.is_connected():
+                self.idle.setdefault(lease.key, []).append(pooled)
+            else:
+                await pooled.close()
+        finally:
+            self.leased -= 1
+            self.semaphore.release()
+
+    async def close(self):
+        async with self._lock:
+            await self._drop_idle()
+            if self.browser is not None:
+                try:
+                    await self.browser.close()
+                except PlaywrightError:
+                    pass
+                self.browser = None
+            if self.playwright is not None:
+                await self.playwright.stop()
+                self.playwright = None
+
+    def stats(self) -> dict:
+        return {"size": self.size,
+                "leased": self.leased,
+                "connected": bool(self.browser and self.browser.is_connected()),
+                "idle": {key: len(contexts) for key, contexts in self.idle.items()}}
+
+
+browser_pool = BrowserPool(size=settings.parsing.browser_pool_size,
+                           max_age=settings.parsing.browser_context_max_age,
+                           max_uses=settings.parsing.browser_context_max_uses)
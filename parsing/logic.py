@@ -27,8 +27,8 @@ async def parsing_core(redis: Redis, session: AsyncSession, s3_client: AioBaseCl
     module = importlib.import_module(module_name)
     parser_class = getattr(module, "BaseParser")
     pars_obj = parser_class(redis, progress, context.vendor, context.vsl.url, session)
-    await pars_obj.run()
     try:
+        await pars_obj.run()
         unclean_parsed_lines: List[ParsingLinesIn] = await pars_obj.get_parsed_lines()
         ranges: RewardRangeResponseSchema = await get_rr_obj(session=session)
         with_added_cost = cost_value_update(items=unclean_parsed_lines, ranges=ranges.ranges)
@@ -39,8 +39,7 @@ async def parsing_core(redis: Redis, session: AsyncSession, s3_client: AioBaseCl
             await session.commit()
             stored_items.is_ok = True
     finally:
-        await pars_obj.browser.close()
-        await pars_obj.playwright.stop()
+        await pars_obj.close()
     await append_info(session=session,
                       data_lines=stored_items.parsing_result,
                       redis=redis,
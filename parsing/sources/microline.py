@@ -1,30 +1,34 @@
 import asyncio
 import json
+import logging
 import os
 import re
 from typing import List, Set, Tuple, Optional, Dict
+from urllib.parse import urljoin
 
 from bs4 import BeautifulSoup, Tag
-from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError, Error as PlaywrightError
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError, Error as PlaywrightError
 from playwright_stealth import stealth_async
 from redis.asyncio import Redis
+from redis.exceptions import RedisError
 from sqlalchemy import select
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 from api_service.schemas import ParsingLinesIn, ParsingResultAttributeResponse, AttributeValueSchema
 from app_utils import safe_int, normalize_pages_list, compute_html_hash, count_message
 
-from config import BROWSER_HEADERS, BASE_DIR
+from config import BASE_DIR, settings
 from models import Vendor, HUbStock, ProductFeaturesLink, AttributeValue, ProductOrigin, AttributeOriginValue
-from parsing.browser import create_browser, open_page
+from parsing.browser import open_page, browser_pool, BrowserLease
 
 this_file_name = os.path.basename(__file__).rsplit('.', 1)[0]
+PAGE_NUMBER_PATTERN = re.compile(r"(page[-=])(\d+)")
 cookie_file = f"{BASE_DIR}/parsing/sources/{this_file_name}.json"
 
 
 class BaseParser:
     def __init__(self, redis: Redis, progress: str, vendor: Vendor, url: str, session: AsyncSession):
-        self.page, self.browser, self.playwright = None, None, None
+        self.page, self.browser, self.lease = None, None, None
         self.pages = list()
         self.progress = progress
         self.url = url
@@ -70,12 +74,11 @@ class BaseParser:
         await self.redis.publish(self.progress, f"Авторизция прошла успешно")
 
     async def run(self):
-        self.playwright = await async_playwright().start()
-        self.browser = await create_browser(self.playwright)
+        self.lease: BrowserLease = await browser_pool.acquire(this_file_name, storage_state=cookie_file)
+        self.browser = self.lease.browser
         await self.redis.publish(self.progress, "data: COUNT=50")
         await self.redis.publish(self.progress, f"Браузер запущен")
-        context = await self.browser.new_context()
-        await context.set_extra_http_headers(BROWSER_HEADERS)
+        context = self.lease.context
         if not os.path.exists(cookie_file):
             self.page = await context.new_page()
             await self.redis.publish(self.progress, f"Нет COOKIE файла")
@@ -83,12 +86,13 @@ class BaseParser:
             await self.page.close()
         else:
             await self.redis.publish(self.progress, f"COOKIE файл присутствует")
-        with open(cookie_file, "r") as file:
-            storage_state = json.load(file)
-        await context.add_cookies(storage_state["cookies"])
         self.page = await context.new_page()
         await stealth_async(self.page)
 
+    async def close(self, healthy: bool = True):
+        if self.lease is not None:
+            await self.lease.release(healthy)
+
     @staticmethod
     async def extract_pic(swiper_wrapper: Tag) -> list | None:
         carousel = swiper_wrapper.find_all('div')
@@ -339,19 +343,151 @@ class BaseParser:
         await self.redis.publish(self.progress, "Авторизация не пройдена, начинаю восстановление сессии")
         await self.authorization()
         await self.page.close()
-        context = await self.browser.new_context()
-        try:
-            with open(cookie_file, "r") as file:
-                storage_state = json.load(file)
-            await context.add_cookies(storage_state["cookies"])
-        except Exception as cookie_error:
-            await self.redis.publish(self.progress, f"Ошибка загрузки cookies: {str(cookie_error)}")
+        context = await self.lease.renew(storage_state=cookie_file)
         self.page = await context.new_page()
         await stealth_async(self.page)
         await self.redis.publish(self.progress, "Сессия восстановлена, продолжаю парсинг")
         opened_page = await open_page(page=self.page, url=self.url)
         return opened_page['soup']
 
+    def page_url_template(self, soup: BeautifulSoup) -> Optional[str]:
+        candidates, _ = self.collect_pagination_candidates(soup=soup, current_number=None, visited=set())
+        for page_num, href in candidates:
+            if not href:
+                continue
+            for m in PAGE_NUMBER_PATTERN.finditer(href):
+                if safe_int(m.group(2)) == page_num:
+                    template = href[:m.start(2)] + "{page}" + href[m.end(2):]
+                    return urljoin(self.url, template.replace("%", "%%").replace("{page}", "%d"))
+        return None
+
+    async def fetch_page_html(self, page, url: str) -> str:
+        last_error: Optional[Exception] = None
+        for attempt in range(3):
+            try:
+                await page.goto(url, wait_until="domcontentloaded")
+                return await page.locator("xpath=//body").inner_html()
+            except PlaywrightError as e:
+                last_error = e
+                await asyncio.sleep(1 + attempt * 2)
+        raise last_error
+
+    async def crawl_pages_concurrently(self, first_html: str, known_max_page: int) -> Optional[List[ParsingLinesIn]]:
+        first_soup = BeautifulSoup(first_html, "lxml")
+        template = self.page_url_template(first_soup)
+        if template is None:
+            return None
+
+        results: Dict[int, List[ParsingLinesIn]] = dict()
+        visited_hashes: Set[str] = set()
+        scheduled: Set[int] = {1}
+        failed: List[int] = list()
+        queue: asyncio.Queue = asyncio.Queue()
+        parse_lock = asyncio.Lock()
+        max_page = known_max_page
+
+        async def publish_safe(message: str):
+            try:
+                await self.redis.publish(self.progress, message)
+            except RedisError as e:
+                logging.warning(f"Microline progress publish failed: {e!r}")
+
+        async def parse(page_num: int, html: str, url: str):
+            nonlocal max_page
+            async with parse_lock:
+                html_hash = compute_html_hash(html)
+                if html_hash in visited_hashes:
+                    await publish_safe(f"Повторяющийся контент на странице {page_num}, пропуск")
+                    return
+                visited_hashes.add(html_hash)
+                soup = BeautifulSoup(html, "lxml")
+                await publish_safe(f"Текущий URL: {url}")
+                try:
+                    results[page_num] = await self.page_data_separation(soup=soup, session=self.session)
+                except (SQLAlchemyError, ConnectionError, TimeoutError, RuntimeError, TypeError, AttributeError) as e:
+                    await publish_safe(f"Ошибка при парсинге данных: {type(e).__name__}")
+                _, dom_max = self.collect_pagination_candidates(soup=soup, current_number=page_num, visited=set())
+                if dom_max > max_page:
+                    max_page = dom_max
+                    await publish_safe(count_message(max_page))
+                for number in range(2, max_page + 1):
+                    if number not in scheduled:
+                        scheduled.add(number)
+                        queue.put_nowait(number)
+
+        async def worker(tab):
+            try:
+                while True:
+                    page_num = await queue.get()
+                    url = template % page_num
+                    try:
+                        html = await self.fetch_page_html(tab, url)
+                        if not await self.check_auth(text=BeautifulSoup(html, "lxml")):
+                            failed.append(page_num)
+                        else:
+                            await parse(page_num, html, url)
+                    except PlaywrightError as e:
+                        failed.append(page_num)
+                        await publish_safe(f"Ошибка загрузки страницы {page_num}: {type(e).__name__}")
+                    except Exception as e:
+                        failed.append(page_num)
+                        logging.warning(f"Microline page {page_num} failed: {e!r}")
+                        await publish_safe(f"Ошибка обработки страницы {page_num}: {type(e).__name__}")
+                    finally:
+                        queue.task_done()
+            finally:
+                try:
+                    await tab.close()
+                except PlaywrightError:
+                    pass
+
+        await parse(1, first_html, self.url)
+        if queue.empty():
+            return results.get(1, [])
+
+        tabs = max(1, min(settings.parsing.crawl_tabs, queue.qsize()))
+        await publish_safe(f"Параллельный обход: {tabs} вкладок")
+        opened_tabs = list()
+        try:
+            for _ in range(tabs):
+                tab = await self.lease.context.new_page()
+                opened_tabs.append(tab)
+                await stealth_async(tab)
+        except PlaywrightError:
+            for tab in opened_tabs:
+                await tab.close()
+            raise
+        workers = [asyncio.create_task(worker(tab)) for tab in opened_tabs]
+        try:
+            await queue.join()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        if failed:
+            await publish_safe(f"Повторная загрузка страниц: {sorted(failed)}")
+            for page_num in sorted(failed):
+                url = template % page_num
+                try:
+                    html = await self.fetch_page_html(self.page, url)
+                except PlaywrightError as e:
+                    await publish_safe(f"Не удалось загрузить страницу {page_num}: {type(e).__name__}")
+                    continue
+                if not await self.check_auth(text=BeautifulSoup(html, "lxml")):
+                    await publish_safe(f"Страница {page_num} без авторизации, пропуск")
+                    continue
+                try:
+                    await parse(page_num, html, url)
+                except Exception as e:
+                    logging.warning(f"Microline page {page_num} failed on retry: {e!r}")
+                    await publish_safe(f"Ошибка обработки страницы {page_num}: {type(e).__name__}")
+
+        result_lines: List[ParsingLinesIn] = list()
+        for page_num in sorted(results):
+            result_lines.extend(results[page_num])
+        return result_lines
+
     async def get_parsed_lines(self) -> List[ParsingLinesIn]:
         result_lines: List[ParsingLinesIn] = list()
         visited_pages: Set[int] = set()
@@ -370,6 +506,17 @@ class BaseParser:
         await self.redis.publish(self.progress, count_message(known_max_page))
         self.pages = normalized_pages
 
+        if known_max_page > 1 and settings.parsing.crawl_tabs > 1:
+            try:
+                first_html = await self.page.locator("xpath=//body").inner_html()
+                crawled = await self.crawl_pages_concurrently(first_html, known_max_page)
+            except PlaywrightError as e:
+                await self.redis.publish(self.progress, f"Параллельный обход прерван: {type(e).__name__}")
+                crawled = None
+            if crawled is not None:
+                return crawled
+            await self.redis.publish(self.progress, "Ссылки на страницы не найдены, переход кликами")
+
         try:
             await self.page.goto(self.url, wait_until="domcontentloaded")
             await stealth_async(self.page)
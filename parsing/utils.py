@@ -1,27 +1,66 @@
 import math
-from typing import List
+from bisect import bisect_right
+from functools import lru_cache
+from typing import List, Iterable, Optional
 
 from api_service.schemas import ParsingLinesIn, RewardRangeLineSchema
 
+RewardLine = tuple[int, int, bool, int]
+
+
+class RewardEngine:
+    __slots__ = ("lines", "active", "starts", "linear")
+
+    def __init__(self, lines: tuple[RewardLine, ...]):
+        self.lines = lines
+        self.active = sorted((line for line in lines if line[0] < line[1]), key=lambda line: line[0])
+        self.starts = [line[0] for line in self.active]
+        self.linear = any(prev[1] > nxt[0] for prev, nxt in zip(self.active, self.active[1:]))
+
+    def match(self, n) -> Optional[RewardLine]:
+        if self.linear:
+            for line in self.lines:
+                if line[0] <= n < line[1]:
+                    return line
+            return None
+        i = bisect_right(self.starts, n) - 1
+        if i >= 0 and n < self.active[i][1]:
+            return self.active[i]
+        return None
+
+    def apply(self, n):
+        if not self.lines:
+            return n
+        line = self.match(n)
+        if line is None:
+            return n
+        _, _, is_percent, reward = line
+        addition = n * reward / 100 if is_percent else reward
+        result = n + addition
+        return math.ceil(result / 100) * 100
+
+    def apply_many(self, prices: Iterable) -> list:
+        return [self.apply(n) for n in prices]
+
+
+@lru_cache(maxsize=128)
+def compile_reward_lines(lines: tuple[RewardLine, ...]) -> RewardEngine:
+    return RewardEngine(lines)
+
+
+def reward_engine(reward_ranges: Optional[List[RewardRangeLineSchema]]) -> RewardEngine:
+    return compile_reward_lines(tuple((r.line_from, r.line_to, r.is_percent, r.reward) for r in reward_ranges or ()))
+
 
 def cost_process(n, reward_ranges: List[RewardRangeLineSchema]):
-    if not reward_ranges:
-        return n
-    for r in reward_ranges:
-        if r.line_from <= n < r.line_to:
-            addition = n * r.reward / 100 if r.is_percent else r.reward
-            result = n + addition
-            return math.ceil(result / 100) * 100
-    return n
+    return reward_engine(reward_ranges).apply(n)
 
 
 def cost_value_update(items: List[ParsingLinesIn], ranges: List[RewardRangeLineSchema]) -> List[ParsingLinesIn]:
-    updated = list()
-    for item in items:
-        if item.origin is not None and item.input_price is not None:
-            updated_item = item.model_copy()
-            updated_item.output_price = cost_process(item.input_price, ranges)
-            updated.append(updated_item)
-        else:
-            updated.append(item)
+    priced = [i for i, item in enumerate(items) if item.origin is not None and item.input_price is not None]
+    prices = reward_engine(ranges).apply_many(items[i].input_price for i in priced)
+    updated = list(items)
+    for i, price in zip(priced, prices):
+        updated[i] = items[i].model_copy()
+        updated[i].output_price = price
     return updated
@@ -0,0 +1,73 @@
+import math
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from parsing.utils import RewardEngine, compile_reward_lines, cost_process, reward_engine
+
+
+def legacy_cost_process(n, reward_ranges):
+    if not reward_ranges:
+        return n
+    for r in reward_ranges:
+        if r.line_from <= n < r.line_to:
+            addition = n * r.reward / 100 if r.is_percent else r.reward
+            result = n + addition
+            return math.ceil(result / 100) * 100
+    return n
+
+
+def random_ranges(rng: random.Random, overlapping: bool) -> list:
+    if overlapping:
+        bounds = [(rng.randint(0, 50000), rng.randint(0, 50000)) for _ in range(rng.randint(0, 8))]
+    else:
+        edges = sorted(rng.sample(range(0, 50000), rng.randint(0, 8) * 2))
+        bounds = list(zip(edges[::2], edges[1::2]))
+        rng.shuffle(bounds)
+    return [SimpleNamespace(line_from=lo, line_to=hi, is_percent=rng.random() < 0.5, reward=rng.randint(0, 40))
+            for lo, hi in bounds]
+
+
+def random_prices(rng: random.Random) -> list:
+    return [rng.randint(-100, 55000) for _ in range(20)] + [rng.uniform(0, 55000) for _ in range(5)]
+
+
+@pytest.fixture(autouse=True)
+def clear_engine_cache():
+    compile_reward_lines.cache_clear()
+    yield
+    compile_reward_lines.cache_clear()
+
+
+@pytest.mark.parametrize("overlapping", [False, True])
+def test_cost_process_matches_legacy(overlapping):
+    rng = random.Random(20240 + overlapping)
+    for _ in range(2000):
+        ranges = random_ranges(rng, overlapping)
+        for price in random_prices(rng):
+            assert cost_process(price, ranges) == legacy_cost_process(price, ranges)
+
+
+@pytest.mark.parametrize("overlapping", [False, True])
+def test_apply_many_matches_legacy(overlapping):
+    rng = random.Random(31337 + overlapping)
+    for _ in range(500):
+        ranges = random_ranges(rng, overlapping)
+        prices = random_prices(rng)
+        assert reward_engine(ranges).apply_many(prices) == [legacy_cost_process(p, ranges) for p in prices]
+
+
+def test_boundaries_and_first_match_wins():
+    ranges = [SimpleNamespace(line_from=0, line_to=1000, is_percent=False, reward=150),
+              SimpleNamespace(line_from=500, line_to=2000, is_percent=True, reward=10),
+              SimpleNamespace(line_from=3000, line_to=3000, is_percent=False, reward=999)]
+    engine = reward_engine(ranges)
+    assert engine.linear
+    for price in (0, 499, 500, 999, 1000, 1999, 2000, 3000):
+        assert engine.apply(price) == legacy_cost_process(price, ranges)
+
+
+def test_empty_ranges_return_price_unchanged():
+    assert RewardEngine(()).apply_many([0, 17, 1234.5]) == [0, 17, 1234.5]
+    assert cost_process(1234, []) == 1234